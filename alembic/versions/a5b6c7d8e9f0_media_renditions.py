@@ -0,0 +1,52 @@
+"""Media renditions and processing marker.
+
+Revision ID: a5b6c7d8e9f0
+Revises: z4a5b6c7d8e9
+Create Date: 2026-10-19
+
+Adds ``media_renditions`` (thumbnails, previews and platform re-encodes keyed by
+the source payload's SHA-256) and ``media_assets.processed_at``. Existing
+assets start unprocessed and are picked up by the media pipeline's sweep.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "a5b6c7d8e9f0"
+down_revision: Union[str, None] = "z4a5b6c7d8e9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    existing = set(inspector.get_table_names())
+
+    if "media_renditions" not in existing:
+        op.create_table(
+            "media_renditions",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("source_sha256", sa.String(64), nullable=False, index=True),
+            sa.Column("variant", sa.String(), nullable=False),
+            sa.Column("mime", sa.String(), nullable=False),
+            sa.Column("width", sa.Integer(), nullable=True),
+            sa.Column("height", sa.Integer(), nullable=True),
+            sa.Column("size_bytes", sa.Integer(), nullable=False),
+            sa.Column("sha256", sa.String(64), nullable=False),
+            sa.Column("content", sa.LargeBinary(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+            sa.UniqueConstraint("source_sha256", "variant", name="uq_media_renditions_source_variant"),
+        )
+
+    if "media_assets" in existing:
+        columns = {c["name"] for c in inspector.get_columns("media_assets")}
+        if "processed_at" not in columns:
+            op.add_column("media_assets", sa.Column("processed_at", sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE media_assets DROP COLUMN IF EXISTS processed_at")
+    op.execute("DROP TABLE IF EXISTS media_renditions")
@@ -0,0 +1,46 @@
+"""Media blob storage backends.
+
+Revision ID: b6c7d8e9f0a1
+Revises: a5b6c7d8e9f0
+Create Date: 2026-10-19
+
+Adds ``media_blobs.backend`` (every existing blob is ``postgres``) and
+``backend_changed_at``, and makes ``media_blobs.content`` nullable — blobs on
+the filesystem backend keep no bytes in the row.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "b6c7d8e9f0a1"
+down_revision: Union[str, None] = "a5b6c7d8e9f0"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if "media_blobs" not in set(inspector.get_table_names()):
+        return
+
+    columns = {c["name"]: c for c in inspector.get_columns("media_blobs")}
+    if "backend" not in columns:
+        op.add_column(
+            "media_blobs",
+            sa.Column("backend", sa.String(), nullable=False, server_default="postgres"),
+        )
+    if "backend_changed_at" not in columns:
+        op.add_column("media_blobs", sa.Column("backend_changed_at", sa.DateTime(), nullable=True))
+    if not columns["content"]["nullable"]:
+        op.alter_column("media_blobs", "content", existing_type=sa.LargeBinary(), nullable=True)
+
+
+def downgrade() -> None:
+    # Blobs moved to the filesystem have no bytes here; move them back with
+    # scripts/migrate_media_storage.py --to postgres before downgrading.
+    op.execute("ALTER TABLE media_blobs ALTER COLUMN content SET NOT NULL")
+    op.execute("ALTER TABLE media_blobs DROP COLUMN IF EXISTS backend_changed_at")
+    op.execute("ALTER TABLE media_blobs DROP COLUMN IF EXISTS backend")
@@ -0,0 +1,34 @@
+"""Media pipeline claim marker.
+
+Revision ID: c7d8e9f0a1b2
+Revises: b6c7d8e9f0a1
+Create Date: 2026-10-19
+
+Adds ``media_assets.processing_started_at``: a worker's media pipeline sets it
+when it claims an unprocessed asset, so the sweeps of other workers skip it.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "c7d8e9f0a1b2"
+down_revision: Union[str, None] = "b6c7d8e9f0a1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if "media_assets" not in set(inspector.get_table_names()):
+        return
+
+    columns = {c["name"] for c in inspector.get_columns("media_assets")}
+    if "processing_started_at" not in columns:
+        op.add_column("media_assets", sa.Column("processing_started_at", sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE media_assets DROP COLUMN IF EXISTS processing_started_at")
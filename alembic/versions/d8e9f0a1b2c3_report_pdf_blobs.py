@@ -0,0 +1,38 @@
+"""Report PDFs as media blobs.
+
+Revision ID: d8e9f0a1b2c3
+Revises: c7d8e9f0a1b2
+Create Date: 2026-10-19
+
+Adds ``report_runs.pdf_sha256``: new report PDFs are stored as ``media_blobs``
+on the configured storage backend instead of inline in ``pdf_bytes``. Existing
+PDFs stay inline until moved with
+``scripts/migrate_media_storage.py --report-pdfs``.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "d8e9f0a1b2c3"
+down_revision: Union[str, None] = "c7d8e9f0a1b2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if "report_runs" not in set(inspector.get_table_names()):
+        return
+
+    columns = {c["name"] for c in inspector.get_columns("report_runs")}
+    if "pdf_sha256" not in columns:
+        op.add_column("report_runs", sa.Column("pdf_sha256", sa.String(64), nullable=True))
+
+
+def downgrade() -> None:
+    # PDFs stored as blobs have no inline bytes; they are lost to the run rows
+    # (the blobs themselves stay in media_blobs).
+    op.execute("ALTER TABLE report_runs DROP COLUMN IF EXISTS pdf_sha256")
@@ -0,0 +1,43 @@
+"""Partial index for the latest-result-per-actor lookup.
+
+Revision ID: n2o3p4q5r6s7
+Revises: m1n2o3p4q5r6
+Create Date: 2026-10-19
+
+``GET /competitors/{id}/results`` now runs ``DISTINCT ON (actor_key)`` ordered by
+``created_at DESC``; this composite partial index lets Postgres walk straight to
+the newest live row per actor instead of sorting every historical result.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "n2o3p4q5r6s7"
+down_revision: Union[str, None] = "m1n2o3p4q5r6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEX_NAME = "ix_results_competitor_actor_created_live"
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if "competitor_analysis_results" not in set(inspector.get_table_names()):
+        return
+    existing = {ix["name"] for ix in inspector.get_indexes("competitor_analysis_results")}
+    if INDEX_NAME in existing:
+        return
+    op.create_index(
+        INDEX_NAME,
+        "competitor_analysis_results",
+        ["competitor_id", "actor_key", sa.text("created_at DESC")],
+        postgresql_where=sa.text("deleted_at IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.execute(f"DROP INDEX IF EXISTS {INDEX_NAME}")
@@ -0,0 +1,50 @@
+"""Cross-brand Apify reuse key on apify_runs.
+
+Revision ID: o3p4q5r6s7t8
+Revises: n2o3p4q5r6s7
+Create Date: 2026-10-19
+
+Adds ``input_hash`` (sha256 of actor id + canonical run input) and
+``reused_from_run_id`` so identical scrapes requested by different brands within
+the freshness window are served from one paid run and logged at zero cost.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "o3p4q5r6s7t8"
+down_revision: Union[str, None] = "n2o3p4q5r6s7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if "apify_runs" not in set(inspector.get_table_names()):
+        return
+
+    cols = {c["name"] for c in inspector.get_columns("apify_runs")}
+    if "input_hash" not in cols:
+        op.add_column("apify_runs", sa.Column("input_hash", sa.String(64), nullable=True))
+    if "reused_from_run_id" not in cols:
+        op.add_column(
+            "apify_runs",
+            sa.Column("reused_from_run_id", sa.Integer(), sa.ForeignKey("apify_runs.id"), nullable=True),
+        )
+
+    indexes = {ix["name"] for ix in inspector.get_indexes("apify_runs")}
+    if "ix_apify_runs_actor_input_finished" not in indexes:
+        op.create_index(
+            "ix_apify_runs_actor_input_finished",
+            "apify_runs",
+            ["actor_key", "input_hash", "finished_at"],
+        )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_apify_runs_actor_input_finished")
+    op.execute("ALTER TABLE apify_runs DROP COLUMN IF EXISTS reused_from_run_id")
+    op.execute("ALTER TABLE apify_runs DROP COLUMN IF EXISTS input_hash")
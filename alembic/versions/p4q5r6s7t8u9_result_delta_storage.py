@@ -0,0 +1,57 @@
+"""Delta storage for competitor_analysis_results.
+
+Revision ID: p4q5r6s7t8u9
+Revises: o3p4q5r6s7t8
+Create Date: 2026-10-19
+
+Adds ``delta`` (diff vs the previous completed run of the same actor),
+``base_result_id`` and ``chain_depth`` so repeated scrapes of a mostly unchanged
+competitor store only what changed, with a full checkpoint every few runs.
+Existing rows keep their full ``data`` and act as checkpoints.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = "p4q5r6s7t8u9"
+down_revision: Union[str, None] = "o3p4q5r6s7t8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if "competitor_analysis_results" not in set(inspector.get_table_names()):
+        return
+
+    cols = {c["name"] for c in inspector.get_columns("competitor_analysis_results")}
+    if "delta" not in cols:
+        op.add_column(
+            "competitor_analysis_results",
+            sa.Column("delta", postgresql.JSONB(), nullable=True),
+        )
+    if "base_result_id" not in cols:
+        op.add_column(
+            "competitor_analysis_results",
+            sa.Column(
+                "base_result_id",
+                sa.Integer(),
+                sa.ForeignKey("competitor_analysis_results.id"),
+                nullable=True,
+            ),
+        )
+    if "chain_depth" not in cols:
+        op.add_column(
+            "competitor_analysis_results",
+            sa.Column("chain_depth", sa.Integer(), nullable=False, server_default="0"),
+        )
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE competitor_analysis_results DROP COLUMN IF EXISTS chain_depth")
+    op.execute("ALTER TABLE competitor_analysis_results DROP COLUMN IF EXISTS base_result_id")
+    op.execute("ALTER TABLE competitor_analysis_results DROP COLUMN IF EXISTS delta")
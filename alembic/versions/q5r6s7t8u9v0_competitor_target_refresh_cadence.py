@@ -0,0 +1,52 @@
+"""Recurring refresh cadence on competitor_targets.
+
+Revision ID: q5r6s7t8u9v0
+Revises: p4q5r6s7t8u9
+Create Date: 2026-10-19
+
+Adds ``refresh_interval_hours`` (NULL = manual runs only) and an indexed
+``next_refresh_at`` that the in-process refresh loop polls for due targets.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "q5r6s7t8u9v0"
+down_revision: Union[str, None] = "p4q5r6s7t8u9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if "competitor_targets" not in set(inspector.get_table_names()):
+        return
+
+    cols = {c["name"] for c in inspector.get_columns("competitor_targets")}
+    if "refresh_interval_hours" not in cols:
+        op.add_column(
+            "competitor_targets",
+            sa.Column("refresh_interval_hours", sa.Integer(), nullable=True),
+        )
+    if "next_refresh_at" not in cols:
+        op.add_column(
+            "competitor_targets",
+            sa.Column("next_refresh_at", sa.DateTime(), nullable=True),
+        )
+
+    indexes = {ix["name"] for ix in inspector.get_indexes("competitor_targets")}
+    if "ix_competitor_targets_next_refresh_at" not in indexes:
+        op.create_index(
+            "ix_competitor_targets_next_refresh_at",
+            "competitor_targets",
+            ["next_refresh_at"],
+        )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_competitor_targets_next_refresh_at")
+    op.execute("ALTER TABLE competitor_targets DROP COLUMN IF EXISTS next_refresh_at")
+    op.execute("ALTER TABLE competitor_targets DROP COLUMN IF EXISTS refresh_interval_hours")
@@ -0,0 +1,154 @@
+"""Incrementally maintained Apify usage counters.
+
+Revision ID: r6s7t8u9v0w1
+Revises: q5r6s7t8u9v0
+Create Date: 2026-10-19
+
+Adds ``apify_usage_monthly`` (brand × month × actor), ``apify_org_usage_monthly``
+(org × month) and ``apify_cost_stats`` (last 10 paid costs per brand × actor,
+plus an all-brands row with ``brand_id = 0``). ``ApifyRunRepository`` keeps them
+current on every ledger write; this migration backfills them from the existing
+``apify_runs`` rows so budget checks and estimates stay correct from day one.
+Backfill only runs when a table is created, so re-running is safe.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "r6s7t8u9v0w1"
+down_revision: Union[str, None] = "q5r6s7t8u9v0"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    existing = set(inspector.get_table_names())
+    has_ledger = "apify_runs" in existing
+
+    if "apify_usage_monthly" not in existing:
+        op.create_table(
+            "apify_usage_monthly",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("brand_id", sa.Integer(), sa.ForeignKey("brands.id"), nullable=False, index=True),
+            sa.Column("period_start", sa.DateTime(), nullable=False),
+            sa.Column("actor_key", sa.String(), nullable=False),
+            sa.Column("compute_units", sa.Numeric(14, 4), nullable=False, server_default="0"),
+            sa.Column("usage_usd", sa.Numeric(12, 4), nullable=False, server_default="0"),
+            sa.Column("runs", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("updated_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+            sa.UniqueConstraint(
+                "brand_id", "period_start", "actor_key",
+                name="uq_apify_usage_monthly_brand_period_actor",
+            ),
+        )
+        if has_ledger:
+            op.execute(
+                """
+                INSERT INTO apify_usage_monthly
+                    (brand_id, period_start, actor_key, compute_units, usage_usd, runs, updated_at)
+                SELECT brand_id,
+                       date_trunc('month', created_at),
+                       actor_key,
+                       COALESCE(SUM(compute_units), 0),
+                       COALESCE(SUM(usage_total_usd), 0),
+                       COUNT(*),
+                       now()
+                  FROM apify_runs
+                 WHERE deleted_at IS NULL
+                 GROUP BY brand_id, date_trunc('month', created_at), actor_key
+                """
+            )
+
+    if "apify_org_usage_monthly" not in existing:
+        op.create_table(
+            "apify_org_usage_monthly",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("organization_id", sa.Integer(), sa.ForeignKey("organizations.id"), nullable=False, index=True),
+            sa.Column("period_start", sa.DateTime(), nullable=False),
+            sa.Column("compute_units", sa.Numeric(14, 4), nullable=False, server_default="0"),
+            sa.Column("usage_usd", sa.Numeric(12, 4), nullable=False, server_default="0"),
+            sa.Column("runs", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("updated_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+            sa.UniqueConstraint(
+                "organization_id", "period_start",
+                name="uq_apify_org_usage_monthly_org_period",
+            ),
+        )
+        if has_ledger:
+            op.execute(
+                """
+                INSERT INTO apify_org_usage_monthly
+                    (organization_id, period_start, compute_units, usage_usd, runs, updated_at)
+                SELECT b.organization_id,
+                       date_trunc('month', r.created_at),
+                       COALESCE(SUM(r.compute_units), 0),
+                       COALESCE(SUM(r.usage_total_usd), 0),
+                       COUNT(*),
+                       now()
+                  FROM apify_runs r
+                  JOIN brands b ON b.id = r.brand_id
+                 WHERE r.deleted_at IS NULL
+                   AND b.organization_id IS NOT NULL
+                 GROUP BY b.organization_id, date_trunc('month', r.created_at)
+                """
+            )
+
+    if "apify_cost_stats" not in existing:
+        op.create_table(
+            "apify_cost_stats",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("brand_id", sa.Integer(), nullable=False),
+            sa.Column("actor_key", sa.String(), nullable=False),
+            sa.Column("samples", sa.dialects.postgresql.JSONB(), nullable=False, server_default=sa.text("'[]'::jsonb")),
+            sa.Column("updated_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+            sa.UniqueConstraint("brand_id", "actor_key", name="uq_apify_cost_stats_brand_actor"),
+        )
+        if has_ledger:
+            # Newest-first [compute_units, usage_usd] pairs of the last 10 paid,
+            # non-reused succeeded runs — per brand, then across all brands (0).
+            paid = """
+                FROM apify_runs
+               WHERE status = 'succeeded'
+                 AND usage_total_usd IS NOT NULL
+                 AND reused_from_run_id IS NULL
+                 AND deleted_at IS NULL
+            """
+            for scope in ("brand_id", "0"):
+                op.execute(
+                    f"""
+                    INSERT INTO apify_cost_stats (brand_id, actor_key, samples, updated_at)
+                    SELECT scope_id,
+                           actor_key,
+                           jsonb_agg(
+                               jsonb_build_array(COALESCE(compute_units, 0), usage_total_usd)
+                               ORDER BY created_at DESC
+                           ),
+                           now()
+                      FROM (
+                        SELECT {scope} AS scope_id,
+                               actor_key,
+                               compute_units,
+                               usage_total_usd,
+                               created_at,
+                               row_number() OVER (
+                                   PARTITION BY {scope}, actor_key ORDER BY created_at DESC
+                               ) AS rn
+                        {paid}
+                      ) ranked
+                     WHERE rn <= 10
+                     GROUP BY scope_id, actor_key
+                    """
+                )
+
+
+def downgrade() -> None:
+    for table in (
+        "apify_cost_stats",
+        "apify_org_usage_monthly",
+        "apify_usage_monthly",
+    ):
+        op.execute(f"DROP TABLE IF EXISTS {table} CASCADE")
@@ -0,0 +1,92 @@
+"""Competitor metric time series.
+
+Revision ID: s7t8u9v0w1x2
+Revises: r6s7t8u9v0w1
+Create Date: 2026-10-19
+
+Adds ``competitor_metric_points`` — one row per (result, metric) for the
+headline numbers in ``competitor_analysis.metrics.TREND_METRICS`` — and
+backfills it from the summaries of existing completed results so trend charts
+have history from day one. Metrics that older summaries don't carry
+(``median_likes``, ``median_plays``, ``unique_total``) start with the next run.
+Backfill only runs when the table is created, so re-running is safe.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "s7t8u9v0w1x2"
+down_revision: Union[str, None] = "r6s7t8u9v0w1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Snapshot of TREND_METRICS at the time of this revision.
+_TREND_METRICS = {
+    "facebook_ads": ("ads_total", "ads_active", "unique_total"),
+    "instagram": ("followers", "posts_count", "median_likes"),
+    "tiktok": ("followers", "videos_count", "total_plays", "median_plays"),
+    "google_places": ("places_count", "average_rating", "total_reviews"),
+    "google_search": ("results_count",),
+    "website": ("pages_count", "total_words"),
+}
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    existing = set(inspector.get_table_names())
+    if "competitor_metric_points" in existing:
+        return
+
+    op.create_table(
+        "competitor_metric_points",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("competitor_id", sa.Integer(), sa.ForeignKey("competitors.id"), nullable=False),
+        sa.Column("brand_id", sa.Integer(), sa.ForeignKey("brands.id"), nullable=False, index=True),
+        sa.Column("result_id", sa.Integer(), sa.ForeignKey("competitor_analysis_results.id"), nullable=False),
+        sa.Column("actor_key", sa.String(), nullable=False),
+        sa.Column("metric", sa.String(), nullable=False),
+        sa.Column("run_at", sa.DateTime(), nullable=False),
+        sa.Column("value", sa.Float(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.UniqueConstraint("result_id", "metric", name="uq_competitor_metric_points_result_metric"),
+    )
+    op.create_index(
+        "ix_competitor_metric_points_series",
+        "competitor_metric_points",
+        ["competitor_id", "actor_key", "metric", "run_at"],
+    )
+
+    if "competitor_analysis_results" not in existing:
+        return
+    pairs = ", ".join(
+        f"('{actor_key}', '{metric}')"
+        for actor_key, metrics in _TREND_METRICS.items()
+        for metric in metrics
+    )
+    op.execute(
+        f"""
+        INSERT INTO competitor_metric_points
+            (competitor_id, brand_id, result_id, actor_key, metric, run_at, value, created_at)
+        SELECT r.competitor_id,
+               r.brand_id,
+               r.id,
+               r.actor_key,
+               m.metric,
+               COALESCE(r.finished_at, r.created_at),
+               (r.summary ->> m.metric)::double precision,
+               now()
+          FROM competitor_analysis_results r
+          JOIN (VALUES {pairs}) AS m(actor_key, metric) ON m.actor_key = r.actor_key
+         WHERE r.status = 'completed'
+           AND r.deleted_at IS NULL
+           AND jsonb_typeof(r.summary -> m.metric) = 'number'
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS competitor_metric_points CASCADE")
@@ -0,0 +1,62 @@
+"""Competitor thumbnail cache.
+
+Revision ID: t8u9v0w1x2y3
+Revises: s7t8u9v0w1x2
+Create Date: 2026-10-19
+
+Adds ``competitor_media_blobs`` (thumbnail bytes keyed by their SHA-256) and
+``competitor_media_urls`` (remote URL seen in a result → cached blob / fetch
+status). Both start empty; they fill as runs complete.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "t8u9v0w1x2y3"
+down_revision: Union[str, None] = "s7t8u9v0w1x2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    existing = set(inspector.get_table_names())
+
+    if "competitor_media_blobs" not in existing:
+        op.create_table(
+            "competitor_media_blobs",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("sha256", sa.String(64), nullable=False, unique=True),
+            sa.Column("mime", sa.String(), nullable=False),
+            sa.Column("size_bytes", sa.Integer(), nullable=False),
+            sa.Column("content", sa.LargeBinary(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        )
+
+    if "competitor_media_urls" not in existing:
+        op.create_table(
+            "competitor_media_urls",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("url_hash", sa.String(64), nullable=False, unique=True),
+            sa.Column("url", sa.Text(), nullable=False),
+            sa.Column(
+                "blob_sha256",
+                sa.String(64),
+                sa.ForeignKey("competitor_media_blobs.sha256"),
+                nullable=True,
+            ),
+            sa.Column("status", sa.String(), nullable=False, server_default="pending"),
+            sa.Column("error", sa.Text(), nullable=True),
+            sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("fetched_at", sa.DateTime(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+            sa.Column("updated_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        )
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS competitor_media_urls CASCADE")
+    op.execute("DROP TABLE IF EXISTS competitor_media_blobs CASCADE")
@@ -0,0 +1,43 @@
+"""Checkpoint columns on competitor analysis results.
+
+Revision ID: u9v0w1x2y3z4
+Revises: t8u9v0w1x2y3
+Create Date: 2026-10-19
+
+Adds ``apify_dataset_id``, ``run_phase`` and ``checkpointed_at`` so an
+in-flight Apify run can be re-attached to after a worker restart. Existing
+rows keep NULLs — they are never resumed.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "u9v0w1x2y3z4"
+down_revision: Union[str, None] = "t8u9v0w1x2y3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+_COLUMNS = (
+    ("apify_dataset_id", sa.String()),
+    ("run_phase", sa.String()),
+    ("checkpointed_at", sa.DateTime()),
+)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if "competitor_analysis_results" not in inspector.get_table_names():
+        return
+    existing = {c["name"] for c in inspector.get_columns("competitor_analysis_results")}
+    for name, type_ in _COLUMNS:
+        if name not in existing:
+            op.add_column("competitor_analysis_results", sa.Column(name, type_, nullable=True))
+
+
+def downgrade() -> None:
+    for name, _ in reversed(_COLUMNS):
+        op.execute(f"ALTER TABLE competitor_analysis_results DROP COLUMN IF EXISTS {name}")
@@ -0,0 +1,102 @@
+"""NOTIFY on scheduled-post and report-schedule due-time changes.
+
+Revision ID: v0w1x2y3z4a5
+Revises: u9v0w1x2y3z4
+Create Date: 2026-10-19
+
+Row triggers on ``scheduled_posts`` and ``report_schedules`` send
+``pg_notify('schedule_changes', {"table", "id", "at"})`` whenever a row's due
+time appears, moves or goes away — ``at`` is the new due time, or null when
+the row is no longer due. The publisher and report loops sleep on these
+instead of polling.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "v0w1x2y3z4a5"
+down_revision: Union[str, None] = "u9v0w1x2y3z4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+_POST_FUNCTION = """
+CREATE OR REPLACE FUNCTION notify_scheduled_post_change() RETURNS trigger AS $$
+DECLARE
+    due timestamp;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        PERFORM pg_notify('schedule_changes', json_build_object(
+            'table', TG_TABLE_NAME, 'id', OLD.id, 'at', NULL)::text);
+        RETURN OLD;
+    END IF;
+    IF TG_OP = 'UPDATE'
+       AND NEW.status IS NOT DISTINCT FROM OLD.status
+       AND NEW.scheduled_at IS NOT DISTINCT FROM OLD.scheduled_at
+       AND NEW.deleted_at IS NOT DISTINCT FROM OLD.deleted_at THEN
+        RETURN NEW;
+    END IF;
+    IF NEW.status = 'scheduled' AND NEW.deleted_at IS NULL THEN
+        due := NEW.scheduled_at;
+    END IF;
+    IF TG_OP = 'INSERT' AND due IS NULL THEN
+        RETURN NEW;
+    END IF;
+    PERFORM pg_notify('schedule_changes', json_build_object(
+        'table', TG_TABLE_NAME, 'id', NEW.id, 'at', due)::text);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+_REPORT_FUNCTION = """
+CREATE OR REPLACE FUNCTION notify_report_schedule_change() RETURNS trigger AS $$
+DECLARE
+    due timestamp;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        PERFORM pg_notify('schedule_changes', json_build_object(
+            'table', TG_TABLE_NAME, 'id', OLD.id, 'at', NULL)::text);
+        RETURN OLD;
+    END IF;
+    IF TG_OP = 'UPDATE'
+       AND NEW.next_sent_at IS NOT DISTINCT FROM OLD.next_sent_at
+       AND NEW.deleted_at IS NOT DISTINCT FROM OLD.deleted_at THEN
+        RETURN NEW;
+    END IF;
+    IF NEW.deleted_at IS NULL THEN
+        due := NEW.next_sent_at;
+    END IF;
+    PERFORM pg_notify('schedule_changes', json_build_object(
+        'table', TG_TABLE_NAME, 'id', NEW.id, 'at', due)::text);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+_TRIGGERS = (
+    ("scheduled_posts", "scheduled_posts_notify_change", "notify_scheduled_post_change", _POST_FUNCTION),
+    ("report_schedules", "report_schedules_notify_change", "notify_report_schedule_change", _REPORT_FUNCTION),
+)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    existing = set(sa.inspect(bind).get_table_names())
+    for table, trigger, function, body in _TRIGGERS:
+        if table not in existing:
+            continue
+        op.execute(body)
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger} ON {table}")
+        op.execute(
+            f"CREATE TRIGGER {trigger} AFTER INSERT OR UPDATE OR DELETE ON {table} "
+            f"FOR EACH ROW EXECUTE FUNCTION {function}()"
+        )
+
+
+def downgrade() -> None:
+    for table, trigger, function, _ in _TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger} ON {table}")
+        op.execute(f"DROP FUNCTION IF EXISTS {function}()")
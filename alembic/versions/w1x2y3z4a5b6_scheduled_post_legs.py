@@ -0,0 +1,35 @@
+"""Per-platform leg state on scheduled posts.
+
+Revision ID: w1x2y3z4a5b6
+Revises: v0w1x2y3z4a5
+Create Date: 2026-10-19
+
+Adds ``platform_legs_json`` so a partially failed post retries only the
+platforms that failed. Existing rows keep NULL — their legs are derived from
+``platform_post_ids_json`` on the next publish attempt.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+
+
+revision: str = "w1x2y3z4a5b6"
+down_revision: Union[str, None] = "v0w1x2y3z4a5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if "scheduled_posts" not in inspector.get_table_names():
+        return
+    existing = {c["name"] for c in inspector.get_columns("scheduled_posts")}
+    if "platform_legs_json" not in existing:
+        op.add_column("scheduled_posts", sa.Column("platform_legs_json", JSONB(), nullable=True))
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE scheduled_posts DROP COLUMN IF EXISTS platform_legs_json")
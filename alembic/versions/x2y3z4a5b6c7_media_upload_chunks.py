@@ -0,0 +1,49 @@
+"""Chunked media ingestion.
+
+Revision ID: x2y3z4a5b6c7
+Revises: w1x2y3z4a5b6
+Create Date: 2026-10-19
+
+Adds ``media_upload_chunks`` (staging for uploads being streamed into
+``media_assets.content``; empty outside an upload's transaction) and
+``media_assets.sha256``, the digest computed while ingesting. Existing assets
+keep a NULL digest.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "x2y3z4a5b6c7"
+down_revision: Union[str, None] = "w1x2y3z4a5b6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    existing = set(inspector.get_table_names())
+
+    if "media_upload_chunks" not in existing:
+        op.create_table(
+            "media_upload_chunks",
+            sa.Column("upload_id", sa.String(32), primary_key=True),
+            sa.Column("seq", sa.Integer(), primary_key=True),
+            sa.Column("data", sa.LargeBinary(), nullable=False),
+        )
+
+    if "media_assets" in existing:
+        columns = {c["name"] for c in inspector.get_columns("media_assets")}
+        if "sha256" not in columns:
+            op.add_column("media_assets", sa.Column("sha256", sa.String(64), nullable=True))
+        indexes = {i["name"] for i in inspector.get_indexes("media_assets")}
+        if "ix_media_assets_sha256" not in indexes:
+            op.create_index("ix_media_assets_sha256", "media_assets", ["sha256"])
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_media_assets_sha256")
+    op.execute("ALTER TABLE media_assets DROP COLUMN IF EXISTS sha256")
+    op.execute("DROP TABLE IF EXISTS media_upload_chunks")
@@ -0,0 +1,33 @@
+"""Content hash for brand logos.
+
+Revision ID: y3z4a5b6c7d8
+Revises: x2y3z4a5b6c7
+Create Date: 2026-10-19
+
+Adds ``brand_identities.logo_sha256``, the logo endpoint's ETag. Set on upload;
+existing logos are hashed (in Postgres) the first time they are served.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "y3z4a5b6c7d8"
+down_revision: Union[str, None] = "x2y3z4a5b6c7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if "brand_identities" not in inspector.get_table_names():
+        return
+    existing = {c["name"] for c in inspector.get_columns("brand_identities")}
+    if "logo_sha256" not in existing:
+        op.add_column("brand_identities", sa.Column("logo_sha256", sa.String(64), nullable=True))
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE brand_identities DROP COLUMN IF EXISTS logo_sha256")
@@ -0,0 +1,89 @@
+"""Content-addressed media blobs.
+
+Revision ID: z4a5b6c7d8e9
+Revises: y3z4a5b6c7d8
+Create Date: 2026-10-19
+
+Adds ``media_blobs`` (one payload per SHA-256, reference-counted) and makes
+``media_assets.content`` nullable. Existing payloads are hashed and moved into
+blobs — duplicates collapse into one — and their inline copies cleared. Each
+step only touches rows not yet migrated, so re-running is safe.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "z4a5b6c7d8e9"
+down_revision: Union[str, None] = "y3z4a5b6c7d8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    existing = set(inspector.get_table_names())
+
+    if "media_blobs" not in existing:
+        op.create_table(
+            "media_blobs",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("sha256", sa.String(64), nullable=False, unique=True),
+            sa.Column("size_bytes", sa.Integer(), nullable=False),
+            sa.Column("ref_count", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("content", sa.LargeBinary(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+            sa.Column("unreferenced_since", sa.DateTime(), nullable=True),
+        )
+
+    if "media_assets" not in existing:
+        return
+    op.alter_column("media_assets", "content", existing_type=sa.LargeBinary(), nullable=True)
+
+    op.execute(
+        "UPDATE media_assets SET sha256 = encode(sha256(content), 'hex') "
+        "WHERE sha256 IS NULL AND content IS NOT NULL"
+    )
+    op.execute(
+        """
+        INSERT INTO media_blobs (sha256, size_bytes, ref_count, content, created_at)
+        SELECT DISTINCT ON (sha256) sha256, octet_length(content), 0, content, now()
+          FROM media_assets
+         WHERE content IS NOT NULL
+         ORDER BY sha256, id
+        ON CONFLICT (sha256) DO NOTHING
+        """
+    )
+    op.execute(
+        """
+        UPDATE media_assets a SET content = NULL
+          FROM media_blobs b
+         WHERE a.content IS NOT NULL AND a.sha256 = b.sha256
+        """
+    )
+    op.execute(
+        """
+        UPDATE media_blobs b
+           SET ref_count = (
+                   SELECT count(*) FROM media_assets a
+                    WHERE a.sha256 = b.sha256 AND a.deleted_at IS NULL
+               )
+        """
+    )
+    op.execute(
+        "UPDATE media_blobs SET unreferenced_since = now() "
+        "WHERE ref_count = 0 AND unreferenced_since IS NULL"
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        """
+        UPDATE media_assets a SET content = b.content
+          FROM media_blobs b
+         WHERE a.content IS NULL AND a.sha256 = b.sha256
+        """
+    )
+    op.execute("DROP TABLE IF EXISTS media_blobs")
@@ -60,6 +60,39 @@ class Settings(BaseSettings):
 
     # Apify (Competitor Analysis)
     apify_api_token: str = ""
+    # Cross-brand scrape reuse: a run whose actor input matches a run that
+    # finished within this window reuses that run's dataset instead of paying
+    # for a new actor run. 0 disables reuse.
+    apify_reuse_window_minutes: int = 360
+    # Copy the source run's normalised result when it is brand-independent,
+    # skipping the dataset download + normalise step entirely.
+    apify_reuse_copy_normalized: bool = True
+    # Recurring competitor refresh. Caps count every pending/running scrape,
+    # manual ones included, so scheduled runs only use spare Apify capacity.
+    competitor_refresh_enabled: bool = True
+    competitor_refresh_poll_seconds: int = 60
+    competitor_refresh_max_concurrency: int = 4
+    competitor_refresh_max_per_org: int = 2
+    # Competitor thumbnail cache: after a run, referenced images are
+    # downscaled into Postgres (content-addressed) and served from
+    # /competitors/media. Sources past max_bytes aren't downloaded at all.
+    competitor_media_cache_enabled: bool = True
+    competitor_media_fetch_concurrency: int = 8
+    competitor_media_fetch_timeout_seconds: int = 15
+    competitor_media_max_bytes: int = 8 * 1024 * 1024
+    competitor_media_thumb_max_side: int = 640
+    # Carousel children (Facebook photos, Instagram child containers) uploaded
+    # in parallel per post.
+    publisher_upload_concurrency: int = 4
+    # Media pipeline: dimensions, previews and platform renditions, computed
+    # in a process pool after upload.
+    media_pipeline_enabled: bool = True
+    media_pipeline_workers: int = 2
+    # Where new media payloads are stored: "postgres" (BYTEA) or "filesystem"
+    # (files under media_storage_root, served with sendfile). Existing blobs
+    # are moved with scripts/migrate_media_storage.py.
+    media_storage_backend: str = "postgres"
+    media_storage_root: str = "./media_store"
     
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -3,9 +3,17 @@ from app.models.competitor import CompetitorModel
 from app.models.competitor_analysis_job import CompetitorAnalysisJobModel
 from app.models.competitor_analysis_result import CompetitorAnalysisResultModel
 from app.models.competitor_target import CompetitorTargetModel
+from app.models.competitor_metric import CompetitorMetricPointModel
+from app.models.competitor_media import CompetitorMediaBlobModel, CompetitorMediaUrlModel
 from app.models.apify_run import ApifyRunModel
+from app.models.apify_usage import ApifyCostStatsModel, ApifyOrgUsageMonthlyModel, ApifyUsageMonthlyModel
 from app.models.campaign_tag import CampaignTagModel, PostCampaignTagModel
-from app.models.media_asset import MediaAssetModel
+from app.models.media_asset import (
+    MediaAssetModel,
+    MediaBlobModel,
+    MediaRenditionModel,
+    MediaUploadChunkModel,
+)
 from app.models.scheduled_post import ScheduledPostModel
 from app.models.report_schedule import ReportScheduleModel
 from app.models.report_run import ReportRunModel
@@ -18,10 +26,19 @@ __all__ = [
     "CompetitorAnalysisJobModel",
     "CompetitorAnalysisResultModel",
     "CompetitorTargetModel",
+    "CompetitorMetricPointModel",
+    "CompetitorMediaBlobModel",
+    "CompetitorMediaUrlModel",
     "ApifyRunModel",
+    "ApifyUsageMonthlyModel",
+    "ApifyOrgUsageMonthlyModel",
+    "ApifyCostStatsModel",
     "CampaignTagModel",
     "PostCampaignTagModel",
     "MediaAssetModel",
+    "MediaBlobModel",
+    "MediaRenditionModel",
+    "MediaUploadChunkModel",
     "ScheduledPostModel",
     "ReportScheduleModel",
     "ReportRunModel",
@@ -24,6 +24,7 @@ class ApifyRunModel(Base):
     __tablename__ = "apify_runs"
     __table_args__ = (
         Index("ix_apify_runs_brand_created", "brand_id", "created_at"),
+        Index("ix_apify_runs_actor_input_finished", "actor_key", "input_hash", "finished_at"),
     )
 
     id = Column(Integer, primary_key=True, index=True)
@@ -35,6 +36,12 @@ class ApifyRunModel(Base):
     apify_run_id = Column(String, nullable=True, index=True)
     status = Column(String, nullable=False, default=APIFY_RUN_STATUS_RUNNING)
 
+    # sha256 of (actor id, canonical run input) — the cross-brand reuse key.
+    input_hash = Column(String(64), nullable=True)
+    # Set when this run reused another run's dataset instead of calling Apify;
+    # such rows cost nothing and never act as a reuse source themselves.
+    reused_from_run_id = Column(Integer, ForeignKey("apify_runs.id"), nullable=True)
+
     compute_units = Column(Numeric(12, 4), nullable=True)
     usage_total_usd = Column(Numeric(10, 4), nullable=True)
     dataset_id = Column(String, nullable=True)
@@ -0,0 +1,99 @@
+from datetime import datetime
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    ForeignKey,
+    Integer,
+    Numeric,
+    String,
+    UniqueConstraint,
+)
+from sqlalchemy.dialects.postgresql import JSONB
+
+from app.database import Base
+
+
+# ``ApifyCostStatsModel.brand_id`` value for the cross-brand row each actor
+# also keeps — the fallback estimate for brands with no history of their own.
+ALL_BRANDS_STATS_ID = 0
+
+# How many recent costs the rolling stats keep per (brand, actor).
+ROLLING_COST_WINDOW = 10
+
+
+class ApifyUsageMonthlyModel(Base):
+    """Running totals of the Apify ledger per brand × calendar month × actor.
+
+    Maintained by ``ApifyRunRepository`` in the same transaction as the ledger
+    row it summarises (``runs`` on start, cost on finalize, both taken back
+    out when the row is soft-deleted), so budget checks
+    and the usage page read a handful of rows instead of summing
+    ``apify_runs``. Buckets by the ledger row's ``created_at`` month to match
+    the historical scan.
+    """
+
+    __tablename__ = "apify_usage_monthly"
+    __table_args__ = (
+        UniqueConstraint("brand_id", "period_start", "actor_key", name="uq_apify_usage_monthly_brand_period_actor"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    brand_id = Column(Integer, ForeignKey("brands.id"), index=True, nullable=False)
+    period_start = Column(DateTime, nullable=False)
+    actor_key = Column(String, nullable=False)
+
+    compute_units = Column(Numeric(14, 4), nullable=False, default=0)
+    usage_usd = Column(Numeric(12, 4), nullable=False, default=0)
+    runs = Column(Integer, nullable=False, default=0)
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<ApifyUsageMonthly brand={self.brand_id} period={self.period_start:%Y-%m} actor={self.actor_key} cu={self.compute_units}>"
+
+
+class ApifyOrgUsageMonthlyModel(Base):
+    """Running totals of the Apify ledger per organization × calendar month."""
+
+    __tablename__ = "apify_org_usage_monthly"
+    __table_args__ = (
+        UniqueConstraint("organization_id", "period_start", name="uq_apify_org_usage_monthly_org_period"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    organization_id = Column(Integer, ForeignKey("organizations.id"), index=True, nullable=False)
+    period_start = Column(DateTime, nullable=False)
+
+    compute_units = Column(Numeric(14, 4), nullable=False, default=0)
+    usage_usd = Column(Numeric(12, 4), nullable=False, default=0)
+    runs = Column(Integer, nullable=False, default=0)
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<ApifyOrgUsageMonthly org={self.organization_id} period={self.period_start:%Y-%m} cu={self.compute_units}>"
+
+
+class ApifyCostStatsModel(Base):
+    """Last ``ROLLING_COST_WINDOW`` paid run costs per (brand, actor).
+
+    ``samples`` is a newest-first list of ``[compute_units, usage_usd]`` pairs;
+    the pre-run estimate averages it instead of querying the ledger. Rows with
+    ``brand_id = ALL_BRANDS_STATS_ID`` hold the same window across all brands.
+    """
+
+    __tablename__ = "apify_cost_stats"
+    __table_args__ = (
+        UniqueConstraint("brand_id", "actor_key", name="uq_apify_cost_stats_brand_actor"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    brand_id = Column(Integer, nullable=False)  # not an FK: 0 = all brands
+    actor_key = Column(String, nullable=False)
+    samples = Column(JSONB, nullable=False, default=list)
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<ApifyCostStats brand={self.brand_id} actor={self.actor_key} n={len(self.samples or [])}>"
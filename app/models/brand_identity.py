@@ -26,6 +26,7 @@ class BrandIdentityModel(Base):
     logo_bytes = Column(LargeBinary, nullable=True)
     logo_mime = Column(String, nullable=True)
     logo_filename = Column(String, nullable=True)
+    logo_sha256 = Column(String(64), nullable=True)  # hex digest of ``logo_bytes``; the logo's ETag
 
     primary_color = Column(String, nullable=False, default="#6366f1")
     secondary_color = Column(String, nullable=False, default="#0ea5e9")
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text, UniqueConstraint
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text, UniqueConstraint
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 
@@ -12,6 +12,14 @@ RESULT_STATUS_RUNNING = "running"
 RESULT_STATUS_COMPLETED = "completed"
 RESULT_STATUS_FAILED = "failed"
 
+# Checkpointed progress of the Apify run behind a result, so a run interrupted
+# by a restart can be re-attached instead of failed (competitor_analysis.resume).
+RUN_PHASE_STARTED = "started"              # actor run started; apify_run_id known
+RUN_PHASE_DATASET_READY = "dataset_ready"  # run succeeded; dataset id known
+RUN_PHASE_NORMALISED = "normalised"        # items normalised, not yet stored
+RUN_PHASE_PERSISTED = "persisted"          # result stored
+RESUMABLE_RUN_PHASES = (RUN_PHASE_STARTED, RUN_PHASE_DATASET_READY, RUN_PHASE_NORMALISED)
+
 ACTOR_FACEBOOK_ADS = "facebook_ads"
 ACTOR_WEBSITE = "website"
 ACTOR_GOOGLE_SEARCH = "google_search"
@@ -46,9 +54,17 @@ class CompetitorAnalysisResultModel(Base):
     status = Column(String, nullable=False, default=RESULT_STATUS_PENDING)
 
     apify_run_id = Column(String, nullable=True)
+    apify_dataset_id = Column(String, nullable=True)
+    run_phase = Column(String, nullable=True)  # RUN_PHASE_*; NULL before the actor run starts
+    checkpointed_at = Column(DateTime, nullable=True)  # last checkpoint / heartbeat of the owning worker
 
+    # Full normalised payload on checkpoint rows; NULL on delta rows, which are
+    # rebuilt from ``base_result_id`` + ``delta`` (see competitor_analysis.deltas).
     data = Column(JSONB, nullable=True)
     summary = Column(JSONB, nullable=True)
+    delta = Column(JSONB, nullable=True)  # vs the previous completed run; ids-only summary on checkpoints
+    base_result_id = Column(Integer, ForeignKey("competitor_analysis_results.id"), nullable=True)
+    chain_depth = Column(Integer, nullable=False, default=0)
     error = Column(Text, nullable=True)
 
     started_at = Column(DateTime, nullable=True)
@@ -61,3 +77,14 @@ class CompetitorAnalysisResultModel(Base):
 
     def __repr__(self) -> str:
         return f"<CompetitorAnalysisResult job={self.job_id} actor={self.actor_key} status={self.status}>"
+
+
+# Serves the "latest result per actor" lookup
+# (DISTINCT ON actor_key ... ORDER BY created_at DESC) over live rows only.
+Index(
+    "ix_results_competitor_actor_created_live",
+    CompetitorAnalysisResultModel.competitor_id,
+    CompetitorAnalysisResultModel.actor_key,
+    CompetitorAnalysisResultModel.created_at.desc(),
+    postgresql_where=CompetitorAnalysisResultModel.deleted_at.is_(None),
+)
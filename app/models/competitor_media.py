@@ -0,0 +1,58 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, LargeBinary, String, Text
+
+from app.database import Base
+
+
+MEDIA_STATUS_PENDING = "pending"
+MEDIA_STATUS_CACHED = "cached"
+MEDIA_STATUS_FAILED = "failed"
+MEDIA_STATUS_TOO_LARGE = "too_large"
+
+
+class CompetitorMediaBlobModel(Base):
+    """A cached competitor thumbnail, stored inline like ``media_assets`` and
+    keyed by the SHA-256 of its bytes — the same creative referenced by many
+    ads or runs is stored once."""
+
+    __tablename__ = "competitor_media_blobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    sha256 = Column(String(64), unique=True, nullable=False)
+    mime = Column(String, nullable=False)
+    size_bytes = Column(Integer, nullable=False)
+    content = Column(LargeBinary, nullable=False)
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<CompetitorMediaBlob {self.sha256[:12]} {self.mime} {self.size_bytes}B>"
+
+
+class CompetitorMediaUrlModel(Base):
+    """Remote image URL seen in a normalised competitor result → its cached blob.
+
+    ``url_hash`` (SHA-256 of the URL) is the lookup key for the media proxy.
+    Rows start ``pending`` and end ``cached`` (``blob_sha256`` set),
+    ``too_large`` or ``failed``; the proxy redirects to ``url`` for anything
+    not cached.
+    """
+
+    __tablename__ = "competitor_media_urls"
+
+    id = Column(Integer, primary_key=True, index=True)
+    url_hash = Column(String(64), unique=True, nullable=False)
+    url = Column(Text, nullable=False)
+    blob_sha256 = Column(String(64), ForeignKey("competitor_media_blobs.sha256"), nullable=True)
+
+    status = Column(String, nullable=False, default=MEDIA_STATUS_PENDING)
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    fetched_at = Column(DateTime, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<CompetitorMediaUrl {self.url_hash[:12]} status={self.status}>"
@@ -0,0 +1,45 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Index, Integer, String, UniqueConstraint
+
+from app.database import Base
+
+
+class CompetitorMetricPointModel(Base):
+    """One headline number from one completed run, for trend charts.
+
+    Written next to the result row when a scrape completes (see
+    ``competitor_analysis.metrics.TREND_METRICS`` for which summary keys are
+    kept per actor), so a trend over months of runs reads a few hundred narrow
+    rows instead of every historical ``data`` / ``summary`` blob.
+    """
+
+    __tablename__ = "competitor_metric_points"
+    __table_args__ = (
+        UniqueConstraint("result_id", "metric", name="uq_competitor_metric_points_result_metric"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    competitor_id = Column(Integer, ForeignKey("competitors.id"), nullable=False)
+    brand_id = Column(Integer, ForeignKey("brands.id"), index=True, nullable=False)
+    result_id = Column(Integer, ForeignKey("competitor_analysis_results.id"), nullable=False)
+
+    actor_key = Column(String, nullable=False)
+    metric = Column(String, nullable=False)
+    run_at = Column(DateTime, nullable=False)
+    value = Column(Float, nullable=False)
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<CompetitorMetricPoint competitor={self.competitor_id} {self.actor_key}.{self.metric}={self.value} at={self.run_at}>"
+
+
+# Serves the trend query: many competitors × a few metrics, ordered by time.
+Index(
+    "ix_competitor_metric_points_series",
+    CompetitorMetricPointModel.competitor_id,
+    CompetitorMetricPointModel.actor_key,
+    CompetitorMetricPointModel.metric,
+    CompetitorMetricPointModel.run_at,
+)
@@ -27,6 +27,10 @@ ALL_TARGET_TYPES = (
     TARGET_TYPE_PAGE_NAME,
 )
 
+# ± fraction of the refresh interval each next run is jittered by, so targets
+# on the same cadence drift apart instead of firing together.
+REFRESH_JITTER_FRACTION = 0.1
+
 
 class CompetitorTargetModel(Base):
     """Per-actor scrape target for a competitor.
@@ -55,6 +59,10 @@ class CompetitorTargetModel(Base):
     last_run_at = Column(DateTime, nullable=True)
     last_cost_usd = Column(Numeric(10, 4), nullable=True)
 
+    # Recurring refresh. NULL interval = manual runs only.
+    refresh_interval_hours = Column(Integer, nullable=True)
+    next_refresh_at = Column(DateTime, nullable=True, index=True)
+
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     deleted_at = Column(DateTime, nullable=True, default=None)
@@ -1,9 +1,12 @@
-"""Media asset stored INLINE in Postgres as BYTEA (no S3, per deployment constraint)."""
+"""Media asset stored INLINE in Postgres as BYTEA (no S3, per deployment constraint).
+
+Payloads are content-addressed: an asset row points at a ``media_blobs`` row by
+SHA-256, so the same file uploaded to many drafts is stored once."""
 from __future__ import annotations
 
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, LargeBinary, String
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, LargeBinary, String, UniqueConstraint
 
 from app.database import Base
 
@@ -16,8 +19,9 @@ class MediaAssetModel(Base):
     """Image or video asset uploaded by a brand user, stored inline in Postgres.
 
     No external object store. The composer references assets by ID; the publisher
-    loop reads ``content`` and either base64-uploads or temp-files it before sending
-    to the platform API.
+    loop reads the bytes (``storage.open_payload``) before sending to the platform API.
+    The bytes live on the ``media_blobs`` row named by ``sha256``; ``content`` only
+    holds payloads of rows written before blobs existed.
     """
 
     __tablename__ = "media_assets"
@@ -30,12 +34,76 @@ class MediaAssetModel(Base):
     filename = Column(String, nullable=False)
     mime = Column(String, nullable=False)
     size_bytes = Column(Integer, nullable=False, default=0)
-    content = Column(LargeBinary, nullable=False)  # the actual file payload
+    content = Column(LargeBinary, nullable=True)  # legacy inline payload; see ``sha256``
+    sha256 = Column(String(64), nullable=True, index=True)  # hex digest of ``content``
 
     width = Column(Integer, nullable=True)
     height = Column(Integer, nullable=True)
     duration_seconds = Column(Integer, nullable=True)
+    processed_at = Column(DateTime, nullable=True)  # set by ``media_pipeline``
+    processing_started_at = Column(DateTime, nullable=True)  # ``media_pipeline`` claim
 
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     deleted_at = Column(DateTime, nullable=True, default=None)
+
+
+class MediaBlobModel(Base):
+    """One stored payload, shared by every asset with the same SHA-256.
+
+    ``ref_count`` counts the live (not soft-deleted) assets pointing at it;
+    ``unreferenced_since`` is set when it drops to zero, and the purge loop
+    deletes blobs that stay unreferenced past a grace period.
+
+    ``backend`` names the ``blob_backends`` backend holding the bytes;
+    ``content`` is only set for the ``postgres`` backend.
+    """
+
+    __tablename__ = "media_blobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    sha256 = Column(String(64), unique=True, nullable=False)
+    size_bytes = Column(Integer, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0)
+    backend = Column(String, nullable=False, default="postgres")
+    content = Column(LargeBinary, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    unreferenced_since = Column(DateTime, nullable=True)
+    backend_changed_at = Column(DateTime, nullable=True)  # set by ``blob_migration``
+
+
+class MediaRenditionModel(Base):
+    """A derived version of a payload — a thumbnail, the composer preview or a
+    platform-optimised re-encode — generated by ``media_pipeline``. Keyed by
+    the source's SHA-256, so assets sharing a blob share its renditions."""
+
+    __tablename__ = "media_renditions"
+    __table_args__ = (
+        UniqueConstraint("source_sha256", "variant", name="uq_media_renditions_source_variant"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    source_sha256 = Column(String(64), nullable=False, index=True)
+    variant = Column(String, nullable=False)
+    mime = Column(String, nullable=False)
+    width = Column(Integer, nullable=True)
+    height = Column(Integer, nullable=True)
+    size_bytes = Column(Integer, nullable=False)
+    sha256 = Column(String(64), nullable=False)
+    content = Column(LargeBinary, nullable=False)
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class MediaUploadChunkModel(Base):
+    """One chunk of an upload being ingested. ``storage.store`` writes the
+    chunks and assembles them into a ``media_blobs`` row inside a single
+    transaction, so rows here never outlive (or are visible outside) the
+    upload that wrote them."""
+
+    __tablename__ = "media_upload_chunks"
+
+    upload_id = Column(String(32), primary_key=True)
+    seq = Column(Integer, primary_key=True)
+    data = Column(LargeBinary, nullable=False)
@@ -1,4 +1,6 @@
-"""Single generated report — PDF + CSV bytes stored inline in Postgres."""
+"""Single generated report — its PDF stored as a media blob (``pdf_sha256``,
+see ``storage.store_report_pdf``); runs from before that keep ``pdf_bytes``
+inline until moved by ``scripts/migrate_media_storage.py --report-pdfs``."""
 from __future__ import annotations
 
 from datetime import datetime
@@ -28,7 +30,8 @@ class ReportRunModel(Base):
     period_start = Column(DateTime, nullable=False)
     period_end = Column(DateTime, nullable=False)
 
-    pdf_bytes = Column(LargeBinary, nullable=True)
+    pdf_sha256 = Column(String(64), nullable=True)  # -> media_blobs.sha256
+    pdf_bytes = Column(LargeBinary, nullable=True)  # legacy inline PDF
     csv_bytes = Column(LargeBinary, nullable=True)
     error_message = Column(Text, nullable=True)
 
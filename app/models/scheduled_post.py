@@ -26,6 +26,12 @@ ALL_STATUSES = (
     STATUS_FAILED,
 )
 
+# Status of one platform leg in ``platform_legs_json``.
+LEG_PENDING = "pending"          # not attempted yet, or waiting for its retry
+LEG_PUBLISHING = "publishing"    # platform call in progress
+LEG_PUBLISHED = "published"      # done — never attempted again
+LEG_FAILED = "failed"            # retries exhausted (or interrupted mid-call)
+
 
 class ScheduledPostModel(Base):
     """A post that lives in OUR DB before being pushed to one or more platforms.
@@ -37,6 +43,10 @@ class ScheduledPostModel(Base):
     ``{ "facebook": {"text": "..."}, "instagram": {"text": "..."} }``.
     ``platform_post_ids_json`` is filled in by the publisher loop on success:
     ``{ "facebook": "123_456", "instagram": "789..." }``.
+    ``platform_legs_json`` tracks each platform separately so a retry only
+    re-runs the legs that failed; shape is ``{ "facebook": {"status": ...,
+    "attempts": 1, "post_id": ..., "error": ..., "next_attempt_at": ...,
+    "idempotency_key": ...} }`` — see ``publisher.legs``.
     """
 
     __tablename__ = "scheduled_posts"
@@ -60,6 +70,7 @@ class ScheduledPostModel(Base):
 
     published_at = Column(DateTime, nullable=True)
     platform_post_ids_json = Column(JSONB, nullable=True)
+    platform_legs_json = Column(JSONB, nullable=True)
 
     attempt_count = Column(Integer, nullable=False, default=0)
     error_message = Column(Text, nullable=True)
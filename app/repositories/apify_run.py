@@ -1,7 +1,8 @@
 from datetime import datetime, timedelta
 from decimal import Decimal
 
-from sqlalchemy import func
+from sqlalchemy import func, literal, literal_column, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
 from app.models.apify_run import (
@@ -10,9 +11,21 @@ from app.models.apify_run import (
     APIFY_RUN_STATUS_SUCCEEDED,
     ApifyRunModel,
 )
+from app.models.apify_usage import (
+    ALL_BRANDS_STATS_ID,
+    ROLLING_COST_WINDOW,
+    ApifyCostStatsModel,
+    ApifyOrgUsageMonthlyModel,
+    ApifyUsageMonthlyModel,
+)
+from app.models.brand import BrandModel
 from app.repositories.base import BaseRepository
 
 
+def _month_start(when: datetime) -> datetime:
+    return datetime(when.year, when.month, 1)
+
+
 class ApifyRunRepository(BaseRepository[ApifyRunModel]):
     def __init__(self, db: Session):
         super().__init__(ApifyRunModel, db)
@@ -25,17 +38,48 @@ class ApifyRunRepository(BaseRepository[ApifyRunModel]):
         competitor_id: int | None = None,
         result_id: int | None = None,
         apify_run_id: str | None = None,
+        input_hash: str | None = None,
     ) -> ApifyRunModel:
+        now = datetime.utcnow()
         run = ApifyRunModel(
             brand_id=brand_id,
             competitor_id=competitor_id,
             result_id=result_id,
             actor_key=actor_key,
             apify_run_id=apify_run_id,
+            input_hash=input_hash,
             status=APIFY_RUN_STATUS_RUNNING,
-            started_at=datetime.utcnow(),
+            started_at=now,
+            created_at=now,
+        )
+        self.db.add(run)
+        self._bump_usage(run, runs=1)
+        self.db.commit()
+        self.db.refresh(run)
+        return run
+
+    def attach_run(self, run_pk: int, apify_run_id: str) -> None:
+        """Record the Apify run id as soon as the run starts."""
+        row = self.get(run_pk)
+        if not row:
+            return
+        row.apify_run_id = apify_run_id
+        row.updated_at = datetime.utcnow()
+        self.db.commit()
+
+    def running_for_result(self, result_id: int) -> ApifyRunModel | None:
+        """The open ledger row of a result's run — what a resumed run
+        finalizes."""
+        return (
+            self.db.query(ApifyRunModel)
+            .filter(
+                ApifyRunModel.result_id == result_id,
+                ApifyRunModel.status == APIFY_RUN_STATUS_RUNNING,
+                ApifyRunModel.deleted_at.is_(None),
+            )
+            .order_by(ApifyRunModel.created_at.desc())
+            .first()
         )
-        return self.create(run)
 
     def finalize_success(
         self,
@@ -49,13 +93,15 @@ class ApifyRunRepository(BaseRepository[ApifyRunModel]):
         row = self.get(run_pk)
         if not row:
             return
+        # A resumed or retried run can finalize the same row again; its cost
+        # enters the rolling window only the first time.
+        first_success = row.status != APIFY_RUN_STATUS_SUCCEEDED
         row.status = APIFY_RUN_STATUS_SUCCEEDED
         if apify_run_id and not row.apify_run_id:
             row.apify_run_id = apify_run_id
-        if compute_units is not None:
-            row.compute_units = Decimal(str(compute_units))
-        if usage_total_usd is not None:
-            row.usage_total_usd = Decimal(str(usage_total_usd))
+        self._record_cost(row, compute_units, usage_total_usd)
+        if usage_total_usd is not None and first_success:
+            self._push_cost_sample(row)
         if dataset_id:
             row.dataset_id = dataset_id
         row.finished_at = datetime.utcnow()
@@ -76,10 +122,179 @@ class ApifyRunRepository(BaseRepository[ApifyRunModel]):
         row.status = APIFY_RUN_STATUS_FAILED
         if apify_run_id and not row.apify_run_id:
             row.apify_run_id = apify_run_id
+        self._record_cost(row, compute_units, usage_total_usd)
+        row.finished_at = datetime.utcnow()
+        row.updated_at = datetime.utcnow()
+        self.db.commit()
+
+    def soft_delete(self, id: int) -> bool:
+        """Soft-delete a ledger row and take its run and cost back out of
+        the monthly counters. Its sample stays in the rolling cost window,
+        which only feeds estimates and ages out on its own."""
+        row = self.get(id)
+        if not row:
+            return False
+        self._bump_usage(
+            row,
+            runs=-1,
+            compute_units=-(row.compute_units or Decimal("0")),
+            usage_usd=-(row.usage_total_usd or Decimal("0")),
+        )
+        row.deleted_at = datetime.utcnow()
+        row.updated_at = datetime.utcnow()
+        self.db.commit()
+        return True
+
+    # ── Usage counters (same transaction as the ledger write) ─────────────
+
+    def _record_cost(
+        self,
+        row: ApifyRunModel,
+        compute_units: float | None,
+        usage_total_usd: float | None,
+    ) -> None:
+        """Set the row's cost and add the change to the monthly counters.
+
+        Applies the difference from what the row already carried, so
+        finalizing a row twice never double-counts.
+        """
+        old_cu = row.compute_units or Decimal("0")
+        old_usd = row.usage_total_usd or Decimal("0")
         if compute_units is not None:
             row.compute_units = Decimal(str(compute_units))
         if usage_total_usd is not None:
             row.usage_total_usd = Decimal(str(usage_total_usd))
+        self._bump_usage(
+            row,
+            compute_units=(row.compute_units or Decimal("0")) - old_cu,
+            usage_usd=(row.usage_total_usd or Decimal("0")) - old_usd,
+        )
+
+    def _bump_usage(
+        self,
+        row: ApifyRunModel,
+        *,
+        runs: int = 0,
+        compute_units: Decimal = Decimal("0"),
+        usage_usd: Decimal = Decimal("0"),
+    ) -> None:
+        """Atomically add to the brand × month × actor and org × month
+        counters. Does not commit — the caller commits with the ledger row."""
+        if not (runs or compute_units or usage_usd):
+            return
+        period = _month_start(row.created_at or datetime.utcnow())
+        now = datetime.utcnow()
+
+        brand_stmt = pg_insert(ApifyUsageMonthlyModel).values(
+            brand_id=row.brand_id,
+            period_start=period,
+            actor_key=row.actor_key,
+            compute_units=compute_units,
+            usage_usd=usage_usd,
+            runs=runs,
+            updated_at=now,
+        )
+        self.db.execute(brand_stmt.on_conflict_do_update(
+            constraint="uq_apify_usage_monthly_brand_period_actor",
+            set_={
+                "compute_units": ApifyUsageMonthlyModel.compute_units + brand_stmt.excluded.compute_units,
+                "usage_usd": ApifyUsageMonthlyModel.usage_usd + brand_stmt.excluded.usage_usd,
+                "runs": ApifyUsageMonthlyModel.runs + brand_stmt.excluded.runs,
+                "updated_at": now,
+            },
+        ))
+
+        # The org row is keyed through the brand in the same statement, so no
+        # separate lookup; brands without an organization insert nothing.
+        org_rows = (
+            select(
+                BrandModel.organization_id,
+                literal(period).label("period_start"),
+                literal(compute_units).label("compute_units"),
+                literal(usage_usd).label("usage_usd"),
+                literal(runs).label("runs"),
+                literal(now).label("updated_at"),
+            )
+            .where(BrandModel.id == row.brand_id, BrandModel.organization_id.isnot(None))
+        )
+        org_stmt = pg_insert(ApifyOrgUsageMonthlyModel).from_select(
+            ["organization_id", "period_start", "compute_units", "usage_usd", "runs", "updated_at"],
+            org_rows,
+        )
+        self.db.execute(org_stmt.on_conflict_do_update(
+            constraint="uq_apify_org_usage_monthly_org_period",
+            set_={
+                "compute_units": ApifyOrgUsageMonthlyModel.compute_units + org_stmt.excluded.compute_units,
+                "usage_usd": ApifyOrgUsageMonthlyModel.usage_usd + org_stmt.excluded.usage_usd,
+                "runs": ApifyOrgUsageMonthlyModel.runs + org_stmt.excluded.runs,
+                "updated_at": now,
+            },
+        ))
+
+    def _push_cost_sample(self, row: ApifyRunModel) -> None:
+        """Prepend the row's cost to the brand's and the all-brands rolling
+        window for its actor, trimmed to ``ROLLING_COST_WINDOW`` in SQL."""
+        sample = [float(row.compute_units or 0), float(row.usage_total_usd or 0)]
+        trim = literal_column(f"'$[0 to {ROLLING_COST_WINDOW - 1}]'::jsonpath")
+        now = datetime.utcnow()
+        for brand_id in (row.brand_id, ALL_BRANDS_STATS_ID):
+            stmt = pg_insert(ApifyCostStatsModel).values(
+                brand_id=brand_id,
+                actor_key=row.actor_key,
+                samples=[sample],
+                updated_at=now,
+            )
+            self.db.execute(stmt.on_conflict_do_update(
+                constraint="uq_apify_cost_stats_brand_actor",
+                set_={
+                    "samples": func.jsonb_path_query_array(
+                        stmt.excluded.samples.op("||")(ApifyCostStatsModel.samples),
+                        trim,
+                    ),
+                    "updated_at": now,
+                },
+            ))
+
+    def find_reusable(
+        self,
+        *,
+        actor_key: str,
+        input_hash: str,
+        finished_after: datetime,
+        exclude_pk: int | None = None,
+    ) -> ApifyRunModel | None:
+        """Newest succeeded, paid run with the same input that finished after
+        ``finished_after`` and still has a dataset to read.
+
+        Reused rows are never returned — freshness is always measured from the
+        run that actually scraped, so chained reuse can't keep stale data alive.
+        """
+        query = (
+            self.db.query(ApifyRunModel)
+            .filter(
+                ApifyRunModel.actor_key == actor_key,
+                ApifyRunModel.input_hash == input_hash,
+                ApifyRunModel.status == APIFY_RUN_STATUS_SUCCEEDED,
+                ApifyRunModel.finished_at >= finished_after,
+                ApifyRunModel.dataset_id.isnot(None),
+                ApifyRunModel.reused_from_run_id.is_(None),
+                ApifyRunModel.deleted_at.is_(None),
+            )
+        )
+        if exclude_pk is not None:
+            query = query.filter(ApifyRunModel.id != exclude_pk)
+        return query.order_by(ApifyRunModel.finished_at.desc()).first()
+
+    def finalize_reused(self, run_pk: int, source: ApifyRunModel) -> None:
+        """Close a ledger row served from ``source``'s dataset at zero cost."""
+        row = self.get(run_pk)
+        if not row:
+            return
+        row.status = APIFY_RUN_STATUS_SUCCEEDED
+        row.reused_from_run_id = source.id
+        row.apify_run_id = source.apify_run_id
+        row.dataset_id = source.dataset_id
+        self._record_cost(row, 0, 0)
         row.finished_at = datetime.utcnow()
         row.updated_at = datetime.utcnow()
         self.db.commit()
@@ -92,41 +307,54 @@ class ApifyRunRepository(BaseRepository[ApifyRunModel]):
         """Sum compute units and USD for the brand within the period.
 
         Returns ``{compute_units, usage_usd, runs, by_actor: {actor_key: {...}}}``.
+        Month-aligned periods (the default: current month) read the monthly
+        counters; any other start falls back to scanning the ledger.
         """
         if period_start is None:
-            now = datetime.utcnow()
-            period_start = datetime(now.year, now.month, 1)
+            period_start = _month_start(datetime.utcnow())
+        if period_start != _month_start(period_start):
+            return self._scan_usage_for_brand(brand_id, period_start)
 
-        base = (
-            self.db.query(ApifyRunModel)
-            .filter(
-                ApifyRunModel.brand_id == brand_id,
-                ApifyRunModel.deleted_at.is_(None),
-                ApifyRunModel.created_at >= period_start,
+        by_actor_rows = (
+            self.db.query(
+                ApifyUsageMonthlyModel.actor_key,
+                func.sum(ApifyUsageMonthlyModel.compute_units),
+                func.sum(ApifyUsageMonthlyModel.usage_usd),
+                func.sum(ApifyUsageMonthlyModel.runs),
             )
-        )
-
-        totals_row = (
-            base.with_entities(
-                func.coalesce(func.sum(ApifyRunModel.compute_units), 0),
-                func.coalesce(func.sum(ApifyRunModel.usage_total_usd), 0),
-                func.count(ApifyRunModel.id),
+            .filter(
+                ApifyUsageMonthlyModel.brand_id == brand_id,
+                ApifyUsageMonthlyModel.period_start >= period_start,
             )
-            .one()
+            .group_by(ApifyUsageMonthlyModel.actor_key)
+            .all()
         )
-        cu_total, usd_total, run_count = totals_row
+        return self._usage_payload(by_actor_rows, period_start)
 
+    def _scan_usage_for_brand(
+        self,
+        brand_id: int,
+        period_start: datetime,
+    ) -> dict[str, float | int | dict[str, float]]:
         by_actor_rows = (
-            base.with_entities(
+            self.db.query(
                 ApifyRunModel.actor_key,
                 func.coalesce(func.sum(ApifyRunModel.compute_units), 0),
                 func.coalesce(func.sum(ApifyRunModel.usage_total_usd), 0),
                 func.count(ApifyRunModel.id),
             )
+            .filter(
+                ApifyRunModel.brand_id == brand_id,
+                ApifyRunModel.deleted_at.is_(None),
+                ApifyRunModel.created_at >= period_start,
+            )
             .group_by(ApifyRunModel.actor_key)
             .all()
         )
+        return self._usage_payload(by_actor_rows, period_start)
 
+    @staticmethod
+    def _usage_payload(by_actor_rows, period_start: datetime) -> dict[str, float | int | dict[str, float]]:
         by_actor: dict[str, dict[str, float | int]] = {}
         for actor_key, cu, usd, count in by_actor_rows:
             by_actor[actor_key] = {
@@ -136,68 +364,76 @@ class ApifyRunRepository(BaseRepository[ApifyRunModel]):
             }
 
         return {
-            "compute_units": float(cu_total or 0),
-            "usage_usd": float(usd_total or 0),
-            "runs": int(run_count or 0),
+            "compute_units": sum(a["compute_units"] for a in by_actor.values()),
+            "usage_usd": sum(a["usage_usd"] for a in by_actor.values()),
+            "runs": sum(a["runs"] for a in by_actor.values()),
             "by_actor": by_actor,
             "period_start": period_start,
         }
 
+    def monthly_usage_for_org(
+        self,
+        organization_id: int,
+        period_start: datetime | None = None,
+    ) -> dict[str, float | int]:
+        """Organization-wide usage for the month starting at ``period_start``
+        (default: current month), read from the org counters."""
+        if period_start is None:
+            period_start = _month_start(datetime.utcnow())
+        row = (
+            self.db.query(ApifyOrgUsageMonthlyModel)
+            .filter(
+                ApifyOrgUsageMonthlyModel.organization_id == organization_id,
+                ApifyOrgUsageMonthlyModel.period_start == _month_start(period_start),
+            )
+            .first()
+        )
+        return {
+            "compute_units": float(row.compute_units or 0) if row else 0.0,
+            "usage_usd": float(row.usage_usd or 0) if row else 0.0,
+            "runs": int(row.runs or 0) if row else 0,
+            "period_start": _month_start(period_start),
+        }
+
     def rolling_avg_cost(
         self,
         brand_id: int,
         actor_key: str,
-        n: int = 10,
+        n: int = ROLLING_COST_WINDOW,
     ) -> dict[str, float | int | None]:
-        """Return rolling-average cost from the last ``n`` succeeded runs.
+        """Return rolling-average cost from the last ``n`` succeeded runs
+        (at most ``ROLLING_COST_WINDOW``, the size of the stored window).
 
-        Falls back to a global per-actor average if the brand has no history.
+        Falls back to the all-brands window if the brand has no history.
+        Zero-cost reused runs never enter the window — they say nothing about
+        what the next real scrape will cost.
         """
         rows = (
-            self.db.query(
-                ApifyRunModel.compute_units,
-                ApifyRunModel.usage_total_usd,
-            )
+            self.db.query(ApifyCostStatsModel.brand_id, ApifyCostStatsModel.samples)
             .filter(
-                ApifyRunModel.brand_id == brand_id,
-                ApifyRunModel.actor_key == actor_key,
-                ApifyRunModel.status == APIFY_RUN_STATUS_SUCCEEDED,
-                ApifyRunModel.usage_total_usd.isnot(None),
-                ApifyRunModel.deleted_at.is_(None),
+                ApifyCostStatsModel.actor_key == actor_key,
+                ApifyCostStatsModel.brand_id.in_([brand_id, ALL_BRANDS_STATS_ID]),
             )
-            .order_by(ApifyRunModel.created_at.desc())
-            .limit(n)
             .all()
         )
+        windows = {row_brand: samples or [] for row_brand, samples in rows}
 
+        samples = windows.get(brand_id) or []
         basis = "rolling-avg"
-        if not rows:
-            rows = (
-                self.db.query(
-                    ApifyRunModel.compute_units,
-                    ApifyRunModel.usage_total_usd,
-                )
-                .filter(
-                    ApifyRunModel.actor_key == actor_key,
-                    ApifyRunModel.status == APIFY_RUN_STATUS_SUCCEEDED,
-                    ApifyRunModel.usage_total_usd.isnot(None),
-                    ApifyRunModel.deleted_at.is_(None),
-                )
-                .order_by(ApifyRunModel.created_at.desc())
-                .limit(n)
-                .all()
-            )
+        if not samples:
+            samples = windows.get(ALL_BRANDS_STATS_ID) or []
             basis = "global-avg"
+        samples = samples[:n]
 
-        if not rows:
+        if not samples:
             return {"avg_compute_units": None, "avg_usage_usd": None, "samples": 0, "basis": "no-data"}
 
-        cu_values = [float(r[0] or 0) for r in rows]
-        usd_values = [float(r[1] or 0) for r in rows]
+        cu_values = [float(s[0] or 0) for s in samples]
+        usd_values = [float(s[1] or 0) for s in samples]
         return {
             "avg_compute_units": sum(cu_values) / len(cu_values),
             "avg_usage_usd": sum(usd_values) / len(usd_values),
-            "samples": len(rows),
+            "samples": len(samples),
             "basis": basis,
         }
 
@@ -39,6 +39,32 @@ class CompetitorAnalysisJobRepository(BaseRepository[CompetitorAnalysisJobModel]
             .first()
         )
 
+    def latest_for_competitors(
+        self,
+        competitor_ids: list[int],
+    ) -> dict[int, CompetitorAnalysisJobModel]:
+        """Latest job per competitor in one ``DISTINCT ON`` query.
+
+        Batched counterpart of :meth:`latest_for_competitor` for list pages —
+        keyed by ``competitor_id``; competitors with no jobs are absent.
+        """
+        if not competitor_ids:
+            return {}
+        rows = (
+            self.db.query(CompetitorAnalysisJobModel)
+            .filter(
+                CompetitorAnalysisJobModel.competitor_id.in_(competitor_ids),
+                CompetitorAnalysisJobModel.deleted_at.is_(None),
+            )
+            .distinct(CompetitorAnalysisJobModel.competitor_id)
+            .order_by(
+                CompetitorAnalysisJobModel.competitor_id,
+                CompetitorAnalysisJobModel.created_at.desc(),
+            )
+            .all()
+        )
+        return {row.competitor_id: row for row in rows}
+
     def latest_completed_for_competitor(self, competitor_id: int) -> CompetitorAnalysisJobModel | None:
         return (
             self.db.query(CompetitorAnalysisJobModel)
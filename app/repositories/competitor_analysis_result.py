@@ -1,12 +1,16 @@
 from datetime import datetime, timedelta
 
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, func
+from sqlalchemy.orm import Session, defer
 
+from app.models.brand import BrandModel
 from app.models.competitor_analysis_job import (
     JOB_TERMINAL_STATUSES,
     CompetitorAnalysisJobModel,
 )
 from app.models.competitor_analysis_result import (
+    RESUMABLE_RUN_PHASES,
+    RUN_PHASE_PERSISTED,
     RESULT_STATUS_COMPLETED,
     RESULT_STATUS_FAILED,
     RESULT_STATUS_PENDING,
@@ -14,11 +18,18 @@ from app.models.competitor_analysis_result import (
     CompetitorAnalysisResultModel,
 )
 from app.repositories.base import BaseRepository
+from app.repositories.competitor_analysis_job import CompetitorAnalysisJobRepository
 
 
 # A scraper that's been "running" longer than this is dead — mark it failed so
 # the user can re-run it instead of being blocked by the 409 gate.
 STUCK_RESULT_AGE = timedelta(minutes=8)
+# A checkpointed run whose worker hasn't heartbeated for this long is treated
+# as orphaned and re-attached by another worker (competitor_analysis.resume).
+RESUME_STALE_AFTER = timedelta(minutes=3)
+# Checkpointed runs older than this are given up on rather than resumed.
+RESUME_GIVE_UP_AFTER = timedelta(hours=2)
+
 STUCK_ERROR_MESSAGE = (
     "Run was interrupted (likely a server restart) before it could finish. "
     "Run the scraper again to retry."
@@ -40,6 +51,109 @@ class CompetitorAnalysisResultRepository(BaseRepository[CompetitorAnalysisResult
             .all()
         )
 
+    def summaries_by_job(
+        self,
+        job_ids: list[int],
+    ) -> dict[int, dict[str, dict]]:
+        """``{job_id: {actor_key: summary}}`` for many jobs in one query.
+
+        Selects only the summary columns so the heavy ``data`` JSONB never
+        leaves the database. Rows without a summary are skipped.
+        """
+        if not job_ids:
+            return {}
+        rows = (
+            self.db.query(
+                CompetitorAnalysisResultModel.job_id,
+                CompetitorAnalysisResultModel.actor_key,
+                CompetitorAnalysisResultModel.summary,
+            )
+            .filter(
+                CompetitorAnalysisResultModel.job_id.in_(job_ids),
+                CompetitorAnalysisResultModel.deleted_at.is_(None),
+            )
+            .order_by(CompetitorAnalysisResultModel.actor_key.asc())
+            .all()
+        )
+        out: dict[int, dict[str, dict]] = {}
+        for job_id, actor_key, summary in rows:
+            if summary:
+                out.setdefault(job_id, {})[actor_key] = summary
+        return out
+
+    def latest_per_actor(
+        self,
+        competitor_id: int,
+    ) -> dict[str, CompetitorAnalysisResultModel]:
+        """Newest result row per actor for the competitor, keyed by actor key.
+
+        ``DISTINCT ON (actor_key)`` backed by
+        ``ix_results_competitor_actor_created_live`` — one row per actor no
+        matter how many historical runs exist. ``data`` is deferred so the
+        heavy JSONB is only fetched if a caller touches it.
+        """
+        rows = (
+            self.db.query(CompetitorAnalysisResultModel)
+            .options(defer(CompetitorAnalysisResultModel.data))
+            .filter(
+                CompetitorAnalysisResultModel.competitor_id == competitor_id,
+                CompetitorAnalysisResultModel.deleted_at.is_(None),
+            )
+            .distinct(CompetitorAnalysisResultModel.actor_key)
+            .order_by(
+                CompetitorAnalysisResultModel.actor_key,
+                CompetitorAnalysisResultModel.created_at.desc(),
+            )
+            .all()
+        )
+        return {row.actor_key: row for row in rows}
+
+    def latest_completed_for_competitors(
+        self,
+        competitor_ids: list[int],
+        actor_keys: list[str],
+    ) -> list[CompetitorAnalysisResultModel]:
+        """Newest *completed* row per (competitor, actor) for many competitors
+        in one ``DISTINCT ON`` query (includes ``data``)."""
+        if not competitor_ids or not actor_keys:
+            return []
+        return (
+            self.db.query(CompetitorAnalysisResultModel)
+            .filter(
+                CompetitorAnalysisResultModel.competitor_id.in_(competitor_ids),
+                CompetitorAnalysisResultModel.actor_key.in_(actor_keys),
+                CompetitorAnalysisResultModel.status == RESULT_STATUS_COMPLETED,
+                CompetitorAnalysisResultModel.deleted_at.is_(None),
+            )
+            .distinct(
+                CompetitorAnalysisResultModel.competitor_id,
+                CompetitorAnalysisResultModel.actor_key,
+            )
+            .order_by(
+                CompetitorAnalysisResultModel.competitor_id,
+                CompetitorAnalysisResultModel.actor_key,
+                CompetitorAnalysisResultModel.created_at.desc(),
+            )
+            .all()
+        )
+
+    def latest_for_actor(
+        self,
+        competitor_id: int,
+        actor_key: str,
+    ) -> CompetitorAnalysisResultModel | None:
+        """Newest result row for one actor across all jobs (includes ``data``)."""
+        return (
+            self.db.query(CompetitorAnalysisResultModel)
+            .filter(
+                CompetitorAnalysisResultModel.competitor_id == competitor_id,
+                CompetitorAnalysisResultModel.actor_key == actor_key,
+                CompetitorAnalysisResultModel.deleted_at.is_(None),
+            )
+            .order_by(CompetitorAnalysisResultModel.created_at.desc())
+            .first()
+        )
+
     def get_by_job_and_actor(
         self,
         job_id: int,
@@ -81,17 +195,152 @@ class CompetitorAnalysisResultRepository(BaseRepository[CompetitorAnalysisResult
             row.apify_run_id = apify_run_id
         self.db.commit()
 
+    def checkpoint(
+        self,
+        result_id: int,
+        phase: str | None = None,
+        *,
+        apify_run_id: str | None = None,
+        dataset_id: str | None = None,
+    ) -> None:
+        """Record run progress (or, with no arguments, just heartbeat)."""
+        values: dict = {CompetitorAnalysisResultModel.checkpointed_at: datetime.utcnow()}
+        if phase:
+            values[CompetitorAnalysisResultModel.run_phase] = phase
+        if apify_run_id:
+            values[CompetitorAnalysisResultModel.apify_run_id] = apify_run_id
+        if dataset_id:
+            values[CompetitorAnalysisResultModel.apify_dataset_id] = dataset_id
+        (
+            self.db.query(CompetitorAnalysisResultModel)
+            .filter(CompetitorAnalysisResultModel.id == result_id)
+            .update(values, synchronize_session=False)
+        )
+        self.db.commit()
+
+    def has_resumable_checkpoint(self, result_id: int) -> bool:
+        return (
+            self.db.query(CompetitorAnalysisResultModel.id)
+            .filter(
+                CompetitorAnalysisResultModel.id == result_id,
+                CompetitorAnalysisResultModel.status == RESULT_STATUS_RUNNING,
+                resumable_checkpoint(),
+            )
+            .first()
+            is not None
+        )
+
+    def orphaned_checkpoints(self, now: datetime, limit: int) -> list[CompetitorAnalysisResultModel]:
+        """Running rows with a resumable checkpoint whose worker stopped
+        heartbeating, oldest checkpoint first."""
+        return (
+            self.db.query(CompetitorAnalysisResultModel)
+            .options(defer(CompetitorAnalysisResultModel.data))
+            .filter(
+                CompetitorAnalysisResultModel.deleted_at.is_(None),
+                CompetitorAnalysisResultModel.status == RESULT_STATUS_RUNNING,
+                resumable_checkpoint(),
+                CompetitorAnalysisResultModel.checkpointed_at < now - RESUME_STALE_AFTER,
+                CompetitorAnalysisResultModel.checkpointed_at >= now - RESUME_GIVE_UP_AFTER,
+            )
+            .order_by(CompetitorAnalysisResultModel.checkpointed_at.asc())
+            .limit(limit)
+            .all()
+        )
+
+    def claim_checkpoint(self, row: CompetitorAnalysisResultModel, now: datetime) -> bool:
+        """Take over an orphaned run. Conditional on the checkpoint still being
+        stale and resumable in the database, so only one worker re-attaches —
+        ``row``'s own attributes may have been reloaded after an earlier claim's
+        commit and show another worker's fresh heartbeat."""
+        claimed = (
+            self.db.query(CompetitorAnalysisResultModel)
+            .filter(
+                CompetitorAnalysisResultModel.id == row.id,
+                CompetitorAnalysisResultModel.status == RESULT_STATUS_RUNNING,
+                resumable_checkpoint(),
+                CompetitorAnalysisResultModel.checkpointed_at < now - RESUME_STALE_AFTER,
+            )
+            .update(
+                {CompetitorAnalysisResultModel.checkpointed_at: now},
+                synchronize_session=False,
+            )
+        )
+        self.db.commit()
+        return claimed == 1
+
+    def get_including_deleted(self, result_id: int) -> CompetitorAnalysisResultModel | None:
+        """Fetch by id regardless of ``deleted_at`` — delta chains must stay
+        readable even if an older link was soft-deleted."""
+        return (
+            self.db.query(CompetitorAnalysisResultModel)
+            .options(defer(CompetitorAnalysisResultModel.data))
+            .filter(CompetitorAnalysisResultModel.id == result_id)
+            .first()
+        )
+
+    def previous_completed(
+        self,
+        row: CompetitorAnalysisResultModel,
+    ) -> CompetitorAnalysisResultModel | None:
+        """The completed result this row's delta is taken against: newest
+        earlier completed run for the same (competitor, actor)."""
+        return (
+            self.db.query(CompetitorAnalysisResultModel)
+            .options(defer(CompetitorAnalysisResultModel.data))
+            .filter(
+                CompetitorAnalysisResultModel.competitor_id == row.competitor_id,
+                CompetitorAnalysisResultModel.actor_key == row.actor_key,
+                CompetitorAnalysisResultModel.status == RESULT_STATUS_COMPLETED,
+                CompetitorAnalysisResultModel.id != row.id,
+                CompetitorAnalysisResultModel.created_at <= row.created_at,
+                CompetitorAnalysisResultModel.deleted_at.is_(None),
+            )
+            .order_by(CompetitorAnalysisResultModel.created_at.desc())
+            .first()
+        )
+
+    def latest_delta_for_actor(
+        self,
+        competitor_id: int,
+        actor_key: str,
+    ) -> CompetitorAnalysisResultModel | None:
+        """Newest completed row for the actor with ``data`` deferred — for
+        "what's new since last scrape" reads that only need ``delta``."""
+        return (
+            self.db.query(CompetitorAnalysisResultModel)
+            .options(defer(CompetitorAnalysisResultModel.data))
+            .filter(
+                CompetitorAnalysisResultModel.competitor_id == competitor_id,
+                CompetitorAnalysisResultModel.actor_key == actor_key,
+                CompetitorAnalysisResultModel.status == RESULT_STATUS_COMPLETED,
+                CompetitorAnalysisResultModel.deleted_at.is_(None),
+            )
+            .order_by(CompetitorAnalysisResultModel.created_at.desc())
+            .first()
+        )
+
     def mark_completed(
         self,
         result_id: int,
         data: list | dict,
         summary: dict,
+        *,
+        delta: dict | None = None,
+        base_result_id: int | None = None,
+        chain_depth: int = 0,
     ) -> None:
+        """Complete the row. With ``base_result_id`` the row is stored as a
+        delta only (``data`` NULL); otherwise ``data`` is a full checkpoint."""
         row = self.get(result_id)
         if not row:
             return
         row.status = RESULT_STATUS_COMPLETED
-        row.data = data
+        row.run_phase = RUN_PHASE_PERSISTED
+        row.data = None if base_result_id else data
+        row.delta = delta
+        row.base_result_id = base_result_id
+        row.chain_depth = chain_depth if base_result_id else 0
         row.summary = summary
         row.finished_at = datetime.utcnow()
         row.updated_at = datetime.utcnow()
@@ -107,6 +356,49 @@ class CompetitorAnalysisResultRepository(BaseRepository[CompetitorAnalysisResult
         row.updated_at = datetime.utcnow()
         self.db.commit()
 
+    def active_counts_by_org(self) -> tuple[int, dict[int | None, int]]:
+        """Pending/running scrapes younger than the stuck threshold: overall
+        count and per-organization counts (``None`` = brand without an org)."""
+        cutoff = datetime.utcnow() - STUCK_RESULT_AGE
+        rows = (
+            self.db.query(BrandModel.organization_id, func.count(CompetitorAnalysisResultModel.id))
+            .join(BrandModel, BrandModel.id == CompetitorAnalysisResultModel.brand_id)
+            .filter(
+                CompetitorAnalysisResultModel.deleted_at.is_(None),
+                CompetitorAnalysisResultModel.status.in_(
+                    [RESULT_STATUS_PENDING, RESULT_STATUS_RUNNING]
+                ),
+                func.coalesce(
+                    CompetitorAnalysisResultModel.started_at,
+                    CompetitorAnalysisResultModel.created_at,
+                ) >= cutoff,
+            )
+            .group_by(BrandModel.organization_id)
+            .all()
+        )
+        by_org = {org_id: int(n) for org_id, n in rows}
+        return sum(by_org.values()), by_org
+
+    def has_active_for_actor(self, competitor_id: int, actor_key: str) -> bool:
+        cutoff = datetime.utcnow() - STUCK_RESULT_AGE
+        return (
+            self.db.query(CompetitorAnalysisResultModel.id)
+            .filter(
+                CompetitorAnalysisResultModel.competitor_id == competitor_id,
+                CompetitorAnalysisResultModel.actor_key == actor_key,
+                CompetitorAnalysisResultModel.deleted_at.is_(None),
+                CompetitorAnalysisResultModel.status.in_(
+                    [RESULT_STATUS_PENDING, RESULT_STATUS_RUNNING]
+                ),
+                func.coalesce(
+                    CompetitorAnalysisResultModel.started_at,
+                    CompetitorAnalysisResultModel.created_at,
+                ) >= cutoff,
+            )
+            .first()
+            is not None
+        )
+
     def heal_stuck_for_competitor(self, competitor_id: int) -> int:
         """Mark any running/pending result row failed if its parent job is
         already terminal or the row has been "running" longer than the stale
@@ -114,8 +406,14 @@ class CompetitorAnalysisResultRepository(BaseRepository[CompetitorAnalysisResult
 
         Called inline whenever results are read so a dead worker can't block
         re-runs forever (the 409 gate would otherwise refuse to start a new
-        run while a stale row still says running).
+        run while a stale row still says running). Like a failed scrape, each
+        healed row counts as a failed actor of its job, the job is finalized
+        once none of its rows is still active, and a progress event goes out
+        on the same transaction so open job streams see it.
         """
+        # Imported here: the competitor_analysis package imports this module.
+        from app.services.competitor_analysis.events import notify
+
         cutoff = datetime.utcnow() - STUCK_RESULT_AGE
         stuck_rows = (
             self.db.query(CompetitorAnalysisResultModel, CompetitorAnalysisJobModel)
@@ -136,17 +434,68 @@ class CompetitorAnalysisResultRepository(BaseRepository[CompetitorAnalysisResult
             return 0
         now = datetime.utcnow()
         updated = 0
+        open_jobs: set[int] = set()
         for row, job in stuck_rows:
             job_terminal = job.status in JOB_TERMINAL_STATUSES
             started = row.started_at or row.created_at
             too_old = started is not None and started < cutoff
+            if too_old and not job_terminal and _awaiting_resume(row, now):
+                continue
             if not (job_terminal or too_old):
                 continue
             row.status = RESULT_STATUS_FAILED
             row.error = STUCK_ERROR_MESSAGE
             row.finished_at = now
             row.updated_at = now
+            if not job_terminal:
+                job.actors_failed = (job.actors_failed or 0) + 1
+                job.updated_at = now
+                open_jobs.add(job.id)
+            notify(self.db, job_id=job.id, result_id=row.id, status=RESULT_STATUS_FAILED)
             updated += 1
-        if updated:
-            self.db.commit()
+        if not updated:
+            return 0
+        self.db.flush()
+        job_repo = CompetitorAnalysisJobRepository(self.db)
+        for job_id in open_jobs:
+            if not self._has_active_rows(job_id):
+                job_repo.finalize(job_id)
+        self.db.commit()
         return updated
+
+    def _has_active_rows(self, job_id: int) -> bool:
+        return (
+            self.db.query(CompetitorAnalysisResultModel.id)
+            .filter(
+                CompetitorAnalysisResultModel.job_id == job_id,
+                CompetitorAnalysisResultModel.deleted_at.is_(None),
+                CompetitorAnalysisResultModel.status.in_(
+                    [RESULT_STATUS_PENDING, RESULT_STATUS_RUNNING]
+                ),
+            )
+            .first()
+            is not None
+        )
+
+
+def resumable_checkpoint():
+    """SQL filter for rows whose Apify run is checkpointed and can be
+    re-attached to — excluded from the restart / shutdown reapers."""
+    # Every column is NULL-checked so the negation is safe too.
+    return and_(
+        CompetitorAnalysisResultModel.run_phase.isnot(None),
+        CompetitorAnalysisResultModel.run_phase.in_(RESUMABLE_RUN_PHASES),
+        CompetitorAnalysisResultModel.apify_run_id.isnot(None),
+        CompetitorAnalysisResultModel.checkpointed_at.isnot(None),
+    )
+
+
+def _awaiting_resume(row: CompetitorAnalysisResultModel, now: datetime) -> bool:
+    """A checkpointed Apify run that a worker is following (or will re-attach
+    to) — long-running by design, not stuck."""
+    return (
+        row.run_phase in RESUMABLE_RUN_PHASES
+        and row.apify_run_id is not None
+        and row.checkpointed_at is not None
+        and row.checkpointed_at >= now - RESUME_GIVE_UP_AFTER
+    )
@@ -0,0 +1,119 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import or_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.models.competitor_media import (
+    MEDIA_STATUS_CACHED,
+    MEDIA_STATUS_FAILED,
+    MEDIA_STATUS_PENDING,
+    CompetitorMediaBlobModel,
+    CompetitorMediaUrlModel,
+)
+from app.repositories.base import BaseRepository
+
+
+# Failed downloads (CDN hiccups, expired signatures) are retried by later runs
+# that reference the same URL, at most this often and this many times.
+FAILED_RETRY_AFTER = timedelta(hours=6)
+MAX_FETCH_ATTEMPTS = 3
+
+
+class CompetitorMediaRepository(BaseRepository[CompetitorMediaUrlModel]):
+    """URL → blob mapping of the competitor thumbnail cache. Cache rows are
+    never soft-deleted; an uncached URL simply falls back to the source."""
+
+    def __init__(self, db: Session):
+        super().__init__(CompetitorMediaUrlModel, db)
+
+    def register(self, urls: dict[str, str]) -> list[tuple[str, str]]:
+        """Record ``{url_hash: url}`` and return the ``(url_hash, url)`` pairs
+        that still need downloading (new, or failed and due for a retry)."""
+        if not urls:
+            return []
+        now = datetime.utcnow()
+        stmt = pg_insert(CompetitorMediaUrlModel).values([
+            {
+                "url_hash": url_hash,
+                "url": url,
+                "status": MEDIA_STATUS_PENDING,
+                "attempts": 0,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for url_hash, url in urls.items()
+        ])
+        self.db.execute(stmt.on_conflict_do_nothing(index_elements=["url_hash"]))
+        self.db.commit()
+
+        rows = (
+            self.db.query(CompetitorMediaUrlModel.url_hash, CompetitorMediaUrlModel.url)
+            .filter(
+                CompetitorMediaUrlModel.url_hash.in_(list(urls)),
+                or_(
+                    CompetitorMediaUrlModel.status == MEDIA_STATUS_PENDING,
+                    (CompetitorMediaUrlModel.status == MEDIA_STATUS_FAILED)
+                    & (CompetitorMediaUrlModel.attempts < MAX_FETCH_ATTEMPTS)
+                    & (CompetitorMediaUrlModel.fetched_at < now - FAILED_RETRY_AFTER),
+                ),
+            )
+            .all()
+        )
+        return [(url_hash, url) for url_hash, url in rows]
+
+    def get_by_hash(self, url_hash: str) -> CompetitorMediaUrlModel | None:
+        return (
+            self.db.query(CompetitorMediaUrlModel)
+            .filter(CompetitorMediaUrlModel.url_hash == url_hash)
+            .first()
+        )
+
+    def get_blob(self, sha256: str) -> CompetitorMediaBlobModel | None:
+        return (
+            self.db.query(CompetitorMediaBlobModel)
+            .filter(CompetitorMediaBlobModel.sha256 == sha256)
+            .first()
+        )
+
+    def store(self, url_hash: str, sha256: str, mime: str, content: bytes) -> None:
+        """Insert the blob unless identical bytes are already cached, then
+        point the URL at it."""
+        blob = pg_insert(CompetitorMediaBlobModel).values(
+            sha256=sha256,
+            mime=mime,
+            size_bytes=len(content),
+            content=content,
+            created_at=datetime.utcnow(),
+        )
+        self.db.execute(blob.on_conflict_do_nothing(index_elements=["sha256"]))
+        self._finish(url_hash, MEDIA_STATUS_CACHED, blob_sha256=sha256)
+
+    def mark(self, url_hash: str, status: str, error: str | None = None) -> None:
+        self._finish(url_hash, status, error=error)
+
+    def _finish(
+        self,
+        url_hash: str,
+        status: str,
+        *,
+        blob_sha256: str | None = None,
+        error: str | None = None,
+    ) -> None:
+        now = datetime.utcnow()
+        (
+            self.db.query(CompetitorMediaUrlModel)
+            .filter(CompetitorMediaUrlModel.url_hash == url_hash)
+            .update(
+                {
+                    CompetitorMediaUrlModel.status: status,
+                    CompetitorMediaUrlModel.blob_sha256: blob_sha256,
+                    CompetitorMediaUrlModel.error: (error or "")[:500] or None,
+                    CompetitorMediaUrlModel.attempts: CompetitorMediaUrlModel.attempts + 1,
+                    CompetitorMediaUrlModel.fetched_at: now,
+                    CompetitorMediaUrlModel.updated_at: now,
+                },
+                synchronize_session=False,
+            )
+        )
+        self.db.commit()
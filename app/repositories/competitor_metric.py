@@ -0,0 +1,74 @@
+from datetime import datetime
+
+from sqlalchemy import and_, or_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.models.competitor_analysis_result import CompetitorAnalysisResultModel
+from app.models.competitor_metric import CompetitorMetricPointModel
+from app.repositories.base import BaseRepository
+
+
+class CompetitorMetricRepository(BaseRepository[CompetitorMetricPointModel]):
+    """Trend points are append-only facts about a completed run — no soft
+    delete; they're read through the competitors that own them."""
+
+    def __init__(self, db: Session):
+        super().__init__(CompetitorMetricPointModel, db)
+
+    def record(
+        self,
+        result: CompetitorAnalysisResultModel,
+        points: dict[str, float],
+        run_at: datetime,
+    ) -> None:
+        """Upsert one point per metric for ``result`` (re-recording a result
+        overwrites its values)."""
+        if not points:
+            return
+        stmt = pg_insert(CompetitorMetricPointModel).values([
+            {
+                "competitor_id": result.competitor_id,
+                "brand_id": result.brand_id,
+                "result_id": result.id,
+                "actor_key": result.actor_key,
+                "metric": metric,
+                "run_at": run_at,
+                "value": value,
+                "created_at": datetime.utcnow(),
+            }
+            for metric, value in points.items()
+        ])
+        self.db.execute(stmt.on_conflict_do_update(
+            constraint="uq_competitor_metric_points_result_metric",
+            set_={"value": stmt.excluded.value, "run_at": stmt.excluded.run_at},
+        ))
+        self.db.commit()
+
+    def series(
+        self,
+        competitor_ids: list[int],
+        metrics: list[tuple[str, str]],
+        since: datetime | None = None,
+    ) -> list[tuple[int, str, str, datetime, float]]:
+        """``(competitor_id, actor_key, metric, run_at, value)`` rows for every
+        requested competitor × ``(actor_key, metric)`` pair, oldest first
+        within each series — one query over ``ix_competitor_metric_points_series``.
+        """
+        if not competitor_ids or not metrics:
+            return []
+        m = CompetitorMetricPointModel
+        query = (
+            self.db.query(m.competitor_id, m.actor_key, m.metric, m.run_at, m.value)
+            .filter(
+                m.competitor_id.in_(competitor_ids),
+                or_(*(and_(m.actor_key == actor_key, m.metric == metric) for actor_key, metric in metrics)),
+            )
+        )
+        if since is not None:
+            query = query.filter(m.run_at >= since)
+        return (
+            query
+            .order_by(m.competitor_id, m.actor_key, m.metric, m.run_at)
+            .all()
+        )
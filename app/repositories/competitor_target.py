@@ -1,12 +1,31 @@
-from datetime import datetime
+import random
+from datetime import datetime, timedelta
 from decimal import Decimal
 
 from sqlalchemy.orm import Session
 
-from app.models.competitor_target import CompetitorTargetModel
+from app.models.brand import BrandModel
+from app.models.competitor import CompetitorModel
+from app.models.competitor_target import REFRESH_JITTER_FRACTION, CompetitorTargetModel
 from app.repositories.base import BaseRepository
 
 
+# ``upsert(refresh_interval_hours=KEEP_REFRESH)``: leave an existing target's
+# cadence as it is (a new target gets none).
+KEEP_REFRESH = object()
+
+
+def _first_refresh_at(interval_hours: int, now: datetime) -> datetime:
+    """Place a newly scheduled target uniformly inside its first interval so
+    targets configured at the same moment don't all come due together."""
+    return now + timedelta(hours=interval_hours * random.random())
+
+
+def _next_refresh_at(interval_hours: int, now: datetime) -> datetime:
+    jitter = random.uniform(-REFRESH_JITTER_FRACTION, REFRESH_JITTER_FRACTION)
+    return now + timedelta(hours=interval_hours * (1 + jitter))
+
+
 class CompetitorTargetRepository(BaseRepository[CompetitorTargetModel]):
     def __init__(self, db: Session):
         super().__init__(CompetitorTargetModel, db)
@@ -22,6 +41,30 @@ class CompetitorTargetRepository(BaseRepository[CompetitorTargetModel]):
             .all()
         )
 
+    def list_for_competitors(
+        self,
+        competitor_ids: list[int],
+    ) -> dict[int, list[CompetitorTargetModel]]:
+        """Targets for many competitors in one ``IN`` query, keyed by competitor."""
+        if not competitor_ids:
+            return {}
+        rows = (
+            self.db.query(CompetitorTargetModel)
+            .filter(
+                CompetitorTargetModel.competitor_id.in_(competitor_ids),
+                CompetitorTargetModel.deleted_at.is_(None),
+            )
+            .order_by(
+                CompetitorTargetModel.competitor_id.asc(),
+                CompetitorTargetModel.actor_key.asc(),
+            )
+            .all()
+        )
+        out: dict[int, list[CompetitorTargetModel]] = {}
+        for row in rows:
+            out.setdefault(row.competitor_id, []).append(row)
+        return out
+
     def get_for_competitor(
         self,
         competitor_id: int,
@@ -46,17 +89,33 @@ class CompetitorTargetRepository(BaseRepository[CompetitorTargetModel]):
         target_value: str,
         target_type: str,
         is_enabled: bool = True,
+        refresh_interval_hours: int | None | object = KEEP_REFRESH,
     ) -> CompetitorTargetModel:
+        """Create or update the competitor's target for ``actor_key``. The
+        refresh cadence only changes when ``refresh_interval_hours`` is
+        passed; ``None`` turns scheduled refreshes off."""
+        now = datetime.utcnow()
         existing = self.get_for_competitor(competitor_id, actor_key)
         if existing:
             existing.target_value = target_value
             existing.target_type = target_type
             existing.is_enabled = is_enabled
-            existing.updated_at = datetime.utcnow()
+            if (
+                refresh_interval_hours is not KEEP_REFRESH
+                and existing.refresh_interval_hours != refresh_interval_hours
+            ):
+                existing.refresh_interval_hours = refresh_interval_hours
+                existing.next_refresh_at = (
+                    _first_refresh_at(refresh_interval_hours, now)
+                    if refresh_interval_hours else None
+                )
+            existing.updated_at = now
             self.db.commit()
             self.db.refresh(existing)
             return existing
 
+        if refresh_interval_hours is KEEP_REFRESH:
+            refresh_interval_hours = None
         target = CompetitorTargetModel(
             brand_id=brand_id,
             competitor_id=competitor_id,
@@ -64,6 +123,11 @@ class CompetitorTargetRepository(BaseRepository[CompetitorTargetModel]):
             target_value=target_value,
             target_type=target_type,
             is_enabled=is_enabled,
+            refresh_interval_hours=refresh_interval_hours,
+            next_refresh_at=(
+                _first_refresh_at(refresh_interval_hours, now)
+                if refresh_interval_hours else None
+            ),
         )
         return self.create(target)
 
@@ -93,5 +157,66 @@ class CompetitorTargetRepository(BaseRepository[CompetitorTargetModel]):
         target.last_run_at = now
         if cost_usd is not None:
             target.last_cost_usd = Decimal(str(cost_usd))
+        if target.refresh_interval_hours:
+            # Any completed run — manual or scheduled — restarts the cadence.
+            target.next_refresh_at = _next_refresh_at(target.refresh_interval_hours, now)
         target.updated_at = now
         self.db.commit()
+
+    # ── Recurring refresh ─────────────────────────────────────────────────
+
+    def due_for_refresh(
+        self,
+        now: datetime,
+        limit: int,
+    ) -> list[tuple[CompetitorTargetModel, int | None]]:
+        """Enabled, scheduled targets whose ``next_refresh_at`` has passed,
+        paired with their brand's organization id. Stalest data first (never
+        run, then oldest ``last_run_at``)."""
+        return (
+            self.db.query(CompetitorTargetModel, BrandModel.organization_id)
+            .join(CompetitorModel, CompetitorModel.id == CompetitorTargetModel.competitor_id)
+            .join(BrandModel, BrandModel.id == CompetitorTargetModel.brand_id)
+            .filter(
+                CompetitorTargetModel.deleted_at.is_(None),
+                CompetitorTargetModel.is_enabled.is_(True),
+                CompetitorTargetModel.refresh_interval_hours.isnot(None),
+                CompetitorTargetModel.next_refresh_at <= now,
+                CompetitorModel.deleted_at.is_(None),
+                BrandModel.deleted_at.is_(None),
+            )
+            .order_by(
+                CompetitorTargetModel.last_run_at.asc().nullsfirst(),
+                CompetitorTargetModel.next_refresh_at.asc(),
+            )
+            .limit(limit)
+            .all()
+        )
+
+    def advance_refresh(self, target: CompetitorTargetModel, now: datetime) -> bool:
+        """Push ``next_refresh_at`` one jittered interval past ``now``.
+
+        Conditional on the target still being due in the database, so when
+        several workers see the same due target exactly one wins — the return
+        value is the claim. Due-ness is re-checked in SQL rather than trusted
+        from ``target``: after an earlier commit in the same tick its
+        attributes are expired and reload whatever a winning worker wrote.
+        """
+        updated = (
+            self.db.query(CompetitorTargetModel)
+            .filter(
+                CompetitorTargetModel.id == target.id,
+                CompetitorTargetModel.next_refresh_at == target.next_refresh_at,
+                CompetitorTargetModel.next_refresh_at <= now,
+            )
+            .update(
+                {
+                    CompetitorTargetModel.next_refresh_at: _next_refresh_at(
+                        target.refresh_interval_hours, now,
+                    ),
+                },
+                synchronize_session=False,
+            )
+        )
+        self.db.commit()
+        return updated == 1
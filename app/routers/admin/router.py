@@ -8,6 +8,7 @@ Endpoints:
   PATCH  /admin/users/{id}/role                    – change a user's role (NORMAL ↔ ORG_ADMIN)
   POST   /admin/users/{id}/force-signout           – rotate target's session_key
   DELETE /admin/users/{id}                         – remove a user from the org
+  GET    /admin/publisher/metrics                  – scheduled-post backlog, lag and pool usage
 """
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
@@ -20,6 +21,7 @@ from app.repositories.invitation import InvitationRepository
 from app.database import get_session_local
 from app.dependencies import require_super, require_admin_or_super
 from app.models.user import UserRole
+from app.services.publisher.loop import publisher_metrics
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 
@@ -406,3 +408,10 @@ async def remove_user(user_id: int, current_user=Depends(require_admin_or_super)
         user_repo.db.close()
         om_repo.db.close()
         ub_repo.db.close()
+
+
+@router.get("/publisher/metrics")
+async def get_publisher_metrics(_user=Depends(require_super)):
+    """Scheduled-post backlog and lag behind ``scheduled_at`` (all workers),
+    plus this worker's in-flight posts, outcome counters and platform pools."""
+    return {"success": True, "data": publisher_metrics()}
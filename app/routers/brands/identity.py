@@ -1,21 +1,24 @@
 """Brand-identity router — logo + colours + white-label subdomain.
 
 Logo is uploaded as multipart and stored inline as BYTEA on ``brand_identities``;
-served back via ``GET /brands/{id}/identity/logo``. Used by the reports PDF header
+served back via ``GET /brands/{id}/identity/logo`` (chunked, with ``Range`` and
+ETag revalidation). Used by the reports PDF header
 and (later) the FE chrome when a client_view user signs in.
 """
 from __future__ import annotations
 
+import hashlib
 from datetime import datetime
 from typing import Any
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, status
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Request, UploadFile, status
 from pydantic import BaseModel, ConfigDict, Field
+from sqlalchemy import func, update
 
 from app.database import get_session_local
 from app.dependencies import require_brand
 from app.models.brand_identity import BrandIdentityModel
+from app.services import byte_serving
 
 router = APIRouter(prefix="/brands/identity", tags=["Brand Identity"])
 
@@ -108,6 +111,7 @@ async def update_identity(
             row.logo_bytes = data
             row.logo_mime = logo.content_type or "image/png"
             row.logo_filename = logo.filename or "logo"
+            row.logo_sha256 = hashlib.sha256(data).hexdigest()
 
         row.updated_at = datetime.utcnow()
         db.commit()
@@ -118,26 +122,46 @@ async def update_identity(
 
 
 @router.get("/logo")
-async def stream_logo(brand=Depends(require_brand)) -> Any:
-    """Stream the brand's logo bytes back to the client."""
+async def stream_logo(request: Request, brand=Depends(require_brand)) -> Any:
+    """Stream the brand's logo bytes back to the client. The logo can be
+    replaced at the same URL, so clients revalidate with its ETag."""
     db = get_session_local()()
     try:
         row = (
-            db.query(BrandIdentityModel)
+            db.query(
+                BrandIdentityModel.id,
+                BrandIdentityModel.logo_mime,
+                BrandIdentityModel.logo_filename,
+                BrandIdentityModel.logo_sha256,
+                func.octet_length(BrandIdentityModel.logo_bytes).label("logo_size"),
+            )
             .filter(
                 BrandIdentityModel.brand_id == brand.id,
                 BrandIdentityModel.deleted_at.is_(None),
             )
             .first()
         )
-        if not row or not row.logo_bytes:
+        if not row or not row.logo_size:
             raise HTTPException(status_code=404, detail="No logo set for this brand")
-        bytes_, mime, filename = row.logo_bytes, row.logo_mime or "image/png", row.logo_filename or "logo"
+        sha256 = row.logo_sha256
+        if not sha256:
+            # Logos uploaded before digests were recorded — hash once, in Postgres.
+            sha256 = db.execute(
+                update(BrandIdentityModel)
+                .where(BrandIdentityModel.id == row.id)
+                .values(logo_sha256=byte_serving.sha256_sql(BrandIdentityModel.logo_bytes))
+                .returning(BrandIdentityModel.logo_sha256)
+            ).scalar()
+            db.commit()
     finally:
         db.close()
 
-    return StreamingResponse(
-        iter([bytes_]),
-        media_type=mime,
-        headers={"Content-Disposition": f'inline; filename="{filename}"'},
+    return byte_serving.serve_bytes(
+        request,
+        read=byte_serving.column_range_reader(BrandIdentityModel.logo_bytes, BrandIdentityModel.id, row.id),
+        size=row.logo_size,
+        sha256=sha256,
+        mime=row.logo_mime or "image/png",
+        filename=row.logo_filename or "logo",
+        cache_control=byte_serving.REVALIDATE_CACHE_CONTROL,
     )
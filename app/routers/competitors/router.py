@@ -1,14 +1,18 @@
 """Competitor Analysis HTTP router."""
+import asyncio
+import json
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Any
 
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, status
+from fastapi.responses import RedirectResponse, Response, StreamingResponse
 
 from app.database import get_session_local
 from app.dependencies import require_brand
-from app.models.competitor_analysis_job import JOB_ACTIVE_STATUSES
+from app.models.competitor_analysis_job import JOB_ACTIVE_STATUSES, JOB_TERMINAL_STATUSES
 from app.models.competitor_analysis_result import ALL_ACTOR_KEYS
+from app.models.competitor_media import MEDIA_STATUS_CACHED
 from app.models.competitor_target import (
     ALL_TARGET_TYPES,
     CompetitorTargetModel,
@@ -17,9 +21,13 @@ from app.repositories.apify_run import ApifyRunRepository
 from app.repositories.competitor import CompetitorRepository, normalize_slug
 from app.repositories.competitor_analysis_job import CompetitorAnalysisJobRepository
 from app.repositories.competitor_analysis_result import CompetitorAnalysisResultRepository
-from app.repositories.competitor_target import CompetitorTargetRepository
+from app.repositories.competitor_media import CompetitorMediaRepository
+from app.repositories.competitor_metric import CompetitorMetricRepository
+from app.repositories.competitor_target import KEEP_REFRESH, CompetitorTargetRepository
 from app.routers.competitors.schemas import (
     ActorResultOut,
+    ActorResultsPageOut,
+    ActorResultsQuery,
     ActorSummaryRequest,
     BudgetSnapshot,
     CompetitorCreateRequest,
@@ -30,20 +38,47 @@ from app.routers.competitors.schemas import (
     JobCreatedOut,
     JobStatusOut,
     JobSummary,
+    MetricPointOut,
+    MetricSeriesOut,
 )
+from app.services import byte_serving
 from app.services.budget import check_budget, is_super
 from app.services.competitor_analysis.actor_inputs import (
     ALLOWED_TARGET_TYPES,
     DEFAULT_TARGET_TYPES,
 )
-from app.services.competitor_analysis.aggregations import summarize
+from app.services.competitor_analysis.aggregations import (
+    PageQueryError,
+    page_items,
+    split_items,
+    summarize,
+)
+from app.services.competitor_analysis.benchmark import BENCHMARK_ACTORS, build_benchmark
 from app.services.competitor_analysis.cost_estimator import estimate
+from app.services.competitor_analysis import events as scrape_events
+from app.services.competitor_analysis.deltas import (
+    checkpoint_added_rows,
+    is_checkpoint_summary,
+    load_data,
+)
+from app.services.competitor_analysis.media_cache import media_key
+from app.services.competitor_analysis.metrics import TREND_METRICS
 from app.services.competitor_analysis.scheduler import enqueue_target_run
 
 
 router = APIRouter(prefix="/competitors", tags=["Competitor Analysis"])
 logger = logging.getLogger(__name__)
 
+# Most competitors one trends / benchmark request covers.
+MAX_COMPARED_COMPETITORS = 50
+
+# Cached thumbnails are content-addressed, so they never change under an ETag.
+MEDIA_CACHE_CONTROL = "public, max-age=31536000, immutable"
+MEDIA_REDIRECT_CACHE_CONTROL = "public, max-age=300"
+
+# Idle gap after which the job event stream sends a keepalive comment.
+SSE_KEEPALIVE_SECONDS = 15
+
 
 # ── Helpers ───────────────────────────────────────────────────────────────────
 
@@ -85,14 +120,185 @@ def _validate_target(actor_key: str, target_type: str) -> None:
         )
 
 
-def _build_summaries(results: list) -> dict[str, dict[str, Any]]:
-    out: dict[str, dict[str, Any]] = {}
-    for r in results:
-        if r.summary:
-            out[r.actor_key] = r.summary
+def _competitors_to_out(db, competitors: list) -> list[CompetitorOut]:
+    """Build ``CompetitorOut`` rows for a page of competitors.
+
+    Runs a constant three queries regardless of page size — latest job per
+    competitor, summaries for those jobs, and targets — instead of three per
+    competitor, so ``list_competitors`` costs four queries in total
+    (``tests/test_competitor_list_queries.py``).
+    """
+    competitor_ids = [c.id for c in competitors]
+    last_jobs = CompetitorAnalysisJobRepository(db).latest_for_competitors(competitor_ids)
+    summaries_by_job = CompetitorAnalysisResultRepository(db).summaries_by_job(
+        [j.id for j in last_jobs.values()]
+    )
+    targets_by_competitor = CompetitorTargetRepository(db).list_for_competitors(competitor_ids)
+
+    out: list[CompetitorOut] = []
+    for comp in competitors:
+        last_job = last_jobs.get(comp.id)
+        out.append(_competitor_to_out(
+            comp,
+            last_job=last_job,
+            targets=targets_by_competitor.get(comp.id),
+            summaries=summaries_by_job.get(last_job.id) if last_job else None,
+        ))
     return out
 
 
+# ── Trends, benchmark & media ─────────────────────────────────────────────────
+
+# Declared before ``/{competitor_id}`` so "trends" / "benchmark" / "media"
+# never parse as ids.
+@router.get("/trends", status_code=200)
+async def get_metric_trends(
+    brand=Depends(require_brand),
+    competitor_ids: str | None = Query(None, description="Comma-separated; defaults to every competitor of the brand"),
+    actor_key: str | None = Query(None, description="Only this actor's metrics"),
+    metrics: str | None = Query(None, description="Comma-separated metric names, e.g. followers,median_plays"),
+    days: int = Query(180, ge=1, le=730),
+) -> dict[str, Any]:
+    """Per-run headline metrics over time for many competitors at once.
+
+    Reads the narrow ``competitor_metric_points`` rows recorded as each scrape
+    completes — one indexed query, no historical payloads.
+    """
+    brand_id = _require_brand_id(brand)
+    if actor_key is not None and actor_key not in TREND_METRICS:
+        raise HTTPException(status_code=422, detail=f"Unknown actor key: {actor_key}")
+
+    wanted_metrics = {m.strip() for m in metrics.split(",") if m.strip()} if metrics else None
+    pairs = [
+        (key, metric)
+        for key, names in TREND_METRICS.items()
+        if actor_key is None or key == actor_key
+        for metric in names
+        if wanted_metrics is None or metric in wanted_metrics
+    ]
+    if wanted_metrics and not pairs:
+        raise HTTPException(status_code=422, detail="None of the requested metrics are tracked")
+
+    requested_ids: set[int] | None = None
+    if competitor_ids:
+        try:
+            requested_ids = {int(x) for x in competitor_ids.split(",") if x.strip()}
+        except ValueError:
+            raise HTTPException(status_code=422, detail="competitor_ids must be comma-separated integers")
+
+    db = get_session_local()()
+    try:
+        owned = [c.id for c in CompetitorRepository(db).list_by_brand(brand_id)]
+        ids = [cid for cid in owned if requested_ids is None or cid in requested_ids]
+        if len(ids) > MAX_COMPARED_COMPETITORS:
+            raise HTTPException(
+                status_code=422,
+                detail=f"At most {MAX_COMPARED_COMPETITORS} competitors per request",
+            )
+
+        rows = CompetitorMetricRepository(db).series(
+            ids, pairs, since=datetime.utcnow() - timedelta(days=days),
+        )
+    finally:
+        db.close()
+
+    series: dict[tuple[int, str, str], MetricSeriesOut] = {}
+    for competitor_id, key, metric, run_at, value in rows:
+        out = series.get((competitor_id, key, metric))
+        if out is None:
+            out = series[(competitor_id, key, metric)] = MetricSeriesOut(
+                competitor_id=competitor_id, actor_key=key, metric=metric,
+            )
+        out.points.append(MetricPointOut(run_at=run_at, value=value))
+
+    return {
+        "success": True,
+        "data": {
+            "competitor_ids": ids,
+            "days": days,
+            "series": [s.model_dump(mode="json") for s in series.values()],
+        },
+    }
+
+
+@router.get("/benchmark", status_code=200)
+async def get_benchmark(
+    brand=Depends(require_brand),
+    self_competitor_id: int | None = Query(
+        None, description="Competitor entry that tracks the brand itself (brand row of share of voice)",
+    ),
+) -> dict[str, Any]:
+    """Side-by-side metric matrix for all of the brand's competitors.
+
+    Loads the latest completed Instagram / TikTok / Facebook Ads result of
+    every competitor in one query and computes engagement, cadence, medians,
+    active ads, hashtag overlap, per-metric ranks and share of voice in one
+    vectorised pass — replacing a ``/summary`` call per competitor per actor.
+    """
+    brand_id = _require_brand_id(brand)
+    db = get_session_local()()
+    try:
+        competitors = CompetitorRepository(db).list_by_brand(brand_id)[:MAX_COMPARED_COMPETITORS]
+        if self_competitor_id is not None and self_competitor_id not in {c.id for c in competitors}:
+            raise HTTPException(status_code=404, detail="Competitor not found")
+
+        res_repo = CompetitorAnalysisResultRepository(db)
+        payloads = {
+            (row.competitor_id, row.actor_key): load_data(res_repo, row)
+            for row in res_repo.latest_completed_for_competitors(
+                [c.id for c in competitors], list(BENCHMARK_ACTORS),
+            )
+        }
+        payload = build_benchmark(
+            [(c.id, c.name) for c in competitors],
+            payloads,
+            brand_name=brand.name,
+            self_competitor_id=self_competitor_id,
+        )
+    finally:
+        db.close()
+
+    return {"success": True, "data": payload}
+
+
+@router.get("/media", status_code=200)
+async def get_cached_media(
+    request: Request,
+    url: str = Query(..., max_length=4000, description="Image URL exactly as it appears in a result payload"),
+) -> Response:
+    """Serve a competitor thumbnail from the local cache.
+
+    Unauthenticated so ``<img>`` tags can use it directly: it only answers for
+    URLs that scraped results referenced and never fetches on demand. Cached
+    images carry their content hash as a long-lived ETag; URLs not (yet)
+    cached redirect to the source.
+    """
+    db = get_session_local()()
+    try:
+        repo = CompetitorMediaRepository(db)
+        row = repo.get_by_hash(media_key(url))
+        if not row:
+            raise HTTPException(status_code=404, detail="Media not found")
+        if row.status != MEDIA_STATUS_CACHED or not row.blob_sha256:
+            return RedirectResponse(
+                row.url,
+                status_code=307,
+                headers={"Cache-Control": MEDIA_REDIRECT_CACHE_CONTROL},
+            )
+        # Blobs are named by their hash, so revalidation never loads the bytes.
+        etag = f'"{row.blob_sha256}"'
+        headers = {"ETag": etag, "Cache-Control": MEDIA_CACHE_CONTROL}
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and byte_serving.etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+        blob = repo.get_blob(row.blob_sha256)
+        if blob is None:
+            raise HTTPException(status_code=404, detail="Media not found")
+        return Response(content=blob.content, media_type=blob.mime, headers=headers)
+    finally:
+        db.close()
+
+
 # ── List / get / create / delete ──────────────────────────────────────────────
 
 @router.get("", status_code=200)
@@ -100,23 +306,8 @@ async def list_competitors(brand=Depends(require_brand)) -> dict[str, Any]:
     brand_id = _require_brand_id(brand)
     db = get_session_local()()
     try:
-        comp_repo = CompetitorRepository(db)
-        job_repo = CompetitorAnalysisJobRepository(db)
-        res_repo = CompetitorAnalysisResultRepository(db)
-        target_repo = CompetitorTargetRepository(db)
-
-        competitors = comp_repo.list_by_brand(brand_id)
-        out: list[CompetitorOut] = []
-        for comp in competitors:
-            last_job = job_repo.latest_for_competitor(comp.id)
-            summaries: dict[str, dict[str, Any]] | None = None
-            if last_job:
-                results = res_repo.list_by_job(last_job.id)
-                summaries = _build_summaries(results) or None
-            targets = target_repo.list_for_competitor(comp.id)
-            out.append(_competitor_to_out(
-                comp, last_job=last_job, targets=targets, summaries=summaries,
-            ))
+        competitors = CompetitorRepository(db).list_by_brand(brand_id)
+        out = _competitors_to_out(db, competitors)
 
         return {
             "success": True,
@@ -162,6 +353,7 @@ async def create_competitor(
                 target_value=t.target_value.strip(),
                 target_type=t.target_type,
                 is_enabled=t.is_enabled,
+                refresh_interval_hours=t.refresh_interval_hours,
             )
 
         targets = target_repo.list_for_competitor(competitor.id)
@@ -182,29 +374,14 @@ async def get_competitor(
     brand_id = _require_brand_id(brand)
     db = get_session_local()()
     try:
-        comp_repo = CompetitorRepository(db)
-        job_repo = CompetitorAnalysisJobRepository(db)
-        res_repo = CompetitorAnalysisResultRepository(db)
-        target_repo = CompetitorTargetRepository(db)
-
-        competitor = comp_repo.get_for_brand(brand_id, competitor_id)
+        competitor = CompetitorRepository(db).get_for_brand(brand_id, competitor_id)
         if not competitor:
             raise HTTPException(status_code=404, detail="Competitor not found")
 
-        last_job = job_repo.latest_for_competitor(competitor.id)
-        summaries = None
-        if last_job:
-            summaries = _build_summaries(res_repo.list_by_job(last_job.id)) or None
-        targets = target_repo.list_for_competitor(competitor.id)
-
+        (payload,) = _competitors_to_out(db, [competitor])
         return {
             "success": True,
-            "data": _competitor_to_out(
-                competitor,
-                last_job=last_job,
-                targets=targets,
-                summaries=summaries,
-            ).model_dump(mode="json"),
+            "data": payload.model_dump(mode="json"),
         }
     finally:
         db.close()
@@ -287,6 +464,12 @@ async def upsert_target(
             target_value=payload.target_value.strip(),
             target_type=payload.target_type,
             is_enabled=payload.is_enabled,
+            # Omitted: keep the current schedule; explicit null: turn it off.
+            refresh_interval_hours=(
+                payload.refresh_interval_hours
+                if "refresh_interval_hours" in payload.model_fields_set
+                else KEEP_REFRESH
+            ),
         )
         return {
             "success": True,
@@ -474,7 +657,7 @@ async def actor_summary(
             return {"success": True, "data": {"actor_key": actor_key, "summary": {}}}
 
         result = res_repo.get_by_job_and_actor(job.id, actor_key)
-        raw = result.data if result else None
+        raw = load_data(res_repo, result)
     finally:
         db.close()
 
@@ -506,17 +689,7 @@ async def get_actor_results(
 
         # Find the latest result row for THIS actor across all jobs (not just
         # the latest job — the latest job may be for a different actor).
-        from app.models.competitor_analysis_result import CompetitorAnalysisResultModel
-        result = (
-            db.query(CompetitorAnalysisResultModel)
-            .filter(
-                CompetitorAnalysisResultModel.competitor_id == competitor.id,
-                CompetitorAnalysisResultModel.actor_key == actor_key,
-                CompetitorAnalysisResultModel.deleted_at.is_(None),
-            )
-            .order_by(CompetitorAnalysisResultModel.created_at.desc())
-            .first()
-        )
+        result = res_repo.latest_for_actor(competitor.id, actor_key)
         job = job_repo.latest_for_competitor(competitor.id)
         result_payload: ActorResultOut
         if not result:
@@ -526,7 +699,7 @@ async def get_actor_results(
                 actor_key=result.actor_key,
                 status=result.status,
                 summary=result.summary,
-                data=result.data,
+                data=load_data(res_repo, result),
                 error=result.error,
                 started_at=result.started_at,
                 finished_at=result.finished_at,
@@ -544,6 +717,152 @@ async def get_actor_results(
         db.close()
 
 
+def _encode_cursor(result_id: int, offset: int) -> str:
+    return f"{result_id}:{offset}"
+
+
+def _decode_cursor(cursor: str | None, result_id: int) -> int:
+    """Cursor → offset. Cursors are pinned to one result row so a new run
+    landing mid-pagination restarts the client instead of mixing snapshots."""
+    if not cursor:
+        return 0
+    try:
+        cursor_result, offset = (int(part) for part in cursor.split(":", 1))
+    except ValueError:
+        raise HTTPException(status_code=422, detail="Malformed cursor")
+    if cursor_result != result_id:
+        raise HTTPException(
+            status_code=409,
+            detail="Results were refreshed since this cursor was issued. Reload from the first page.",
+        )
+    if offset < 0:
+        raise HTTPException(status_code=422, detail="Malformed cursor")
+    return offset
+
+
+@router.post("/{competitor_id}/results/{actor_key}", status_code=200)
+async def query_actor_results(
+    competitor_id: int,
+    actor_key: str,
+    payload: ActorResultsQuery,
+    brand=Depends(require_brand),
+) -> dict[str, Any]:
+    """One filtered, sorted page of the latest result's rows.
+
+    Takes the same ``filters`` spec as ``/summary`` so the list and the summary
+    cards stay in sync, plus cursor paging, ``sort`` and ``fields`` projection —
+    the browser no longer downloads every ad / post / video to filter locally.
+    """
+    brand_id = _require_brand_id(brand)
+    if actor_key not in ALL_ACTOR_KEYS:
+        raise HTTPException(status_code=422, detail=f"Unknown actor key: {actor_key}")
+
+    db = get_session_local()()
+    try:
+        competitor = CompetitorRepository(db).get_for_brand(brand_id, competitor_id)
+        if not competitor:
+            raise HTTPException(status_code=404, detail="Competitor not found")
+
+        res_repo = CompetitorAnalysisResultRepository(db)
+        res_repo.heal_stuck_for_competitor(competitor.id)
+        result = res_repo.latest_for_actor(competitor.id, actor_key)
+        if not result:
+            return {
+                "success": True,
+                "data": ActorResultsPageOut(
+                    actor_key=actor_key,
+                    result=ActorResultOut(actor_key=actor_key, status="idle"),
+                    limit=payload.limit,
+                ).model_dump(mode="json"),
+            }
+
+        offset = _decode_cursor(payload.cursor, result.id)
+        result_id = result.id
+        raw = load_data(res_repo, result)
+        result_out = ActorResultOut(
+            actor_key=result.actor_key,
+            status=result.status,
+            summary=result.summary,
+            error=result.error,
+            started_at=result.started_at,
+            finished_at=result.finished_at,
+        )
+    finally:
+        db.close()
+
+    rows, context = split_items(actor_key, raw)
+    try:
+        page = page_items(
+            actor_key,
+            rows,
+            filters=payload.filters,
+            sort=payload.sort,
+            offset=offset,
+            limit=payload.limit,
+            fields=payload.fields,
+        )
+    except PageQueryError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+
+    next_offset = page["next_offset"]
+    out = ActorResultsPageOut(
+        actor_key=actor_key,
+        result=result_out,
+        items=page["items"],
+        context=context,
+        total=page["total"],
+        filtered_total=page["filtered_total"],
+        next_cursor=_encode_cursor(result_id, next_offset) if next_offset is not None else None,
+        limit=payload.limit,
+    )
+    return {"success": True, "data": out.model_dump(mode="json")}
+
+
+@router.get("/{competitor_id}/results/{actor_key}/changes", status_code=200)
+async def get_actor_changes(
+    competitor_id: int,
+    actor_key: str,
+    brand=Depends(require_brand),
+) -> dict[str, Any]:
+    """What changed in the latest completed run vs the one before it.
+
+    Served straight from the stored delta — new rows, removed row ids and
+    changed fields — without loading either run's full payload. For a
+    checkpoint run only the added and removed ids are stored: the new rows are
+    picked out of its own payload, and ``changed`` is empty.
+    """
+    brand_id = _require_brand_id(brand)
+    if actor_key not in ALL_ACTOR_KEYS:
+        raise HTTPException(status_code=422, detail=f"Unknown actor key: {actor_key}")
+
+    db = get_session_local()()
+    try:
+        competitor = CompetitorRepository(db).get_for_brand(brand_id, competitor_id)
+        if not competitor:
+            raise HTTPException(status_code=404, detail="Competitor not found")
+
+        result = CompetitorAnalysisResultRepository(db).latest_delta_for_actor(
+            competitor.id, actor_key,
+        )
+        delta = result.delta if result else None
+        if is_checkpoint_summary(delta):
+            added = checkpoint_added_rows(actor_key, delta, result.data)
+        else:
+            added = (delta or {}).get("added") or []
+        payload = {
+            "actor_key": actor_key,
+            "finished_at": result.finished_at.isoformat() if result and result.finished_at else None,
+            "has_previous": bool(delta),
+            "added": added,
+            "removed": (delta or {}).get("removed") or [],
+            "changed": (delta or {}).get("changed") or {},
+        }
+    finally:
+        db.close()
+
+    return {"success": True, "data": payload}
+
+
 # ── Job status & overview results ─────────────────────────────────────────────
 
 @router.get("/jobs/{job_id}", status_code=200)
@@ -554,15 +873,102 @@ async def get_job_status(
     brand_id = _require_brand_id(brand)
     db = get_session_local()()
     try:
-        job_repo = CompetitorAnalysisJobRepository(db)
-        res_repo = CompetitorAnalysisResultRepository(db)
+        payload = _job_status_out(db, brand_id, job_id)
+        if payload is None:
+            raise HTTPException(status_code=404, detail="Job not found")
+        return {"success": True, "data": payload.model_dump(mode="json")}
+    finally:
+        db.close()
+
 
-        job = job_repo.get_for_brand(brand_id, job_id)
+@router.get("/jobs/{job_id}/events", status_code=200)
+async def stream_job_events(
+    job_id: int,
+    request: Request,
+    brand=Depends(require_brand),
+) -> StreamingResponse:
+    """Server-Sent Events feed of a job's progress, replacing polling
+    ``/jobs/{job_id}``.
+
+    Sends a ``job`` event with the full ``JobStatusOut`` snapshot on connect
+    and again on every state transition of the job's scrapes (pushed across
+    workers via Postgres LISTEN/NOTIFY), then ``end`` once the job is
+    terminal. Comment lines keep idle proxies from closing the stream; while
+    idle the stream also heals scrapes whose worker died, so it can't stay on
+    "running" forever.
+    """
+    brand_id = _require_brand_id(brand)
+    db = get_session_local()()
+    try:
+        job = CompetitorAnalysisJobRepository(db).get_for_brand(brand_id, job_id)
         if not job:
             raise HTTPException(status_code=404, detail="Job not found")
+        competitor_id = job.competitor_id
+    finally:
+        db.close()
+
+    def snapshot() -> JobStatusOut | None:
+        db = get_session_local()()
+        try:
+            return _job_status_out(db, brand_id, job_id)
+        finally:
+            db.close()
+
+    def heal() -> int:
+        db = get_session_local()()
+        try:
+            return CompetitorAnalysisResultRepository(db).heal_stuck_for_competitor(competitor_id)
+        finally:
+            db.close()
+
+    async def events():
+        # Subscribe before the first read so no transition falls in between.
+        async with scrape_events.subscribe(job_id) as queue:
+            while True:
+                payload = await asyncio.to_thread(snapshot)
+                if payload is None:
+                    return
+                yield _sse("job", payload.model_dump(mode="json"))
+                if payload.status in JOB_TERMINAL_STATUSES:
+                    yield _sse("end", {"id": job_id, "status": payload.status})
+                    return
+                while True:
+                    try:
+                        await asyncio.wait_for(queue.get(), timeout=SSE_KEEPALIVE_SECONDS)
+                        break
+                    except asyncio.TimeoutError:
+                        if await request.is_disconnected():
+                            return
+                        # A crashed worker sends no event: heal its scrapes
+                        # here, and re-read if that closed any.
+                        if await asyncio.to_thread(heal):
+                            break
+                        yield ": keepalive\n\n"
+                # Coalesce a burst of transitions into one snapshot.
+                while not queue.empty():
+                    queue.get_nowait()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 
-        results = res_repo.list_by_job(job.id)
-        actors = [
+def _job_status_out(db, brand_id: int, job_id: int) -> JobStatusOut | None:
+    job = CompetitorAnalysisJobRepository(db).get_for_brand(brand_id, job_id)
+    if not job:
+        return None
+    results = CompetitorAnalysisResultRepository(db).list_by_job(job.id)
+    return JobStatusOut(
+        id=job.id,
+        status=job.status,
+        actors_total=job.actors_total,
+        actors_done=job.actors_done,
+        actors_failed=job.actors_failed,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        actors=[
             ActorResultOut(
                 actor_key=r.actor_key,
                 status=r.status,
@@ -572,21 +978,12 @@ async def get_job_status(
                 finished_at=r.finished_at,
             )
             for r in results
-        ]
-
-        payload = JobStatusOut(
-            id=job.id,
-            status=job.status,
-            actors_total=job.actors_total,
-            actors_done=job.actors_done,
-            actors_failed=job.actors_failed,
-            started_at=job.started_at,
-            finished_at=job.finished_at,
-            actors=actors,
-        )
-        return {"success": True, "data": payload.model_dump(mode="json")}
-    finally:
-        db.close()
+        ],
+    )
+
+
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
 
 
 @router.get("/{competitor_id}/results", status_code=200)
@@ -614,24 +1011,9 @@ async def get_competitor_results(
 
         res_repo.heal_stuck_for_competitor(competitor.id)
 
-        # Latest result row per actor — newest wins.
-        from app.models.competitor_analysis_result import CompetitorAnalysisResultModel
-        latest_per_actor = (
-            db.query(CompetitorAnalysisResultModel)
-            .filter(
-                CompetitorAnalysisResultModel.competitor_id == competitor.id,
-                CompetitorAnalysisResultModel.deleted_at.is_(None),
-            )
-            .order_by(
-                CompetitorAnalysisResultModel.actor_key,
-                CompetitorAnalysisResultModel.created_at.desc(),
-            )
-            .all()
-        )
+        # Latest result row per actor — one row each, ``data`` left unloaded.
         actors_by_key: dict[str, ActorResultOut] = {}
-        for row in latest_per_actor:
-            if row.actor_key in actors_by_key:
-                continue
+        for row in res_repo.latest_per_actor(competitor.id).values():
             actors_by_key[row.actor_key] = ActorResultOut(
                 actor_key=row.actor_key,
                 status=row.status,
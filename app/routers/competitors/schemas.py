@@ -13,6 +13,15 @@ class CompetitorTargetIn(BaseModel):
     target_value: str = Field(..., min_length=1, max_length=600)
     target_type: str = Field(..., min_length=1, max_length=20)
     is_enabled: bool = True
+    refresh_interval_hours: int | None = Field(
+        default=None,
+        ge=1,
+        le=24 * 30,
+        description=(
+            "Re-run this scraper automatically every N hours; null for manual runs only. "
+            "Omitted on update: the current schedule is kept."
+        ),
+    )
 
 
 class CompetitorTargetOut(BaseModel):
@@ -24,6 +33,8 @@ class CompetitorTargetOut(BaseModel):
     is_enabled: bool
     last_run_at: datetime | None = None
     last_cost_usd: Decimal | None = None
+    refresh_interval_hours: int | None = None
+    next_refresh_at: datetime | None = None
 
 
 # ── Competitors ───────────────────────────────────────────────────────────────
@@ -115,6 +126,50 @@ class ActorSummaryRequest(BaseModel):
     filters: dict[str, Any] | None = None
 
 
+class ActorResultsQuery(BaseModel):
+    """Body of ``POST /results/{actor_key}`` — the summary filter spec plus paging."""
+    filters: dict[str, Any] | None = None
+    cursor: str | None = None
+    limit: int = Field(default=50, ge=1, le=200)
+    sort: str | None = Field(
+        default=None,
+        max_length=60,
+        description="Row key to sort by; prefix with '-' for descending.",
+    )
+    fields: list[str] | None = Field(
+        default=None,
+        description="Only return these keys for each row.",
+    )
+
+
+class ActorResultsPageOut(BaseModel):
+    actor_key: str
+    result: ActorResultOut
+    items: list[dict[str, Any]] = Field(default_factory=list)
+    context: dict[str, Any] = Field(
+        default_factory=dict,
+        description="Non-paged remainder of the payload (profiles, authors, …).",
+    )
+    total: int = 0
+    filtered_total: int = 0
+    next_cursor: str | None = None
+    limit: int
+
+
+# ── Trends ────────────────────────────────────────────────────────────────────
+
+class MetricPointOut(BaseModel):
+    run_at: datetime
+    value: float
+
+
+class MetricSeriesOut(BaseModel):
+    competitor_id: int
+    actor_key: str
+    metric: str
+    points: list[MetricPointOut] = Field(default_factory=list)
+
+
 # ── Usage ─────────────────────────────────────────────────────────────────────
 
 class BudgetSnapshot(BaseModel):
@@ -135,6 +190,10 @@ class BrandUsageOut(BaseModel):
     runs: int
     by_actor: dict[str, dict[str, float | int]]
     budget: BudgetSnapshot
+    organization_usage: dict[str, float | int] | None = Field(
+        default=None,
+        description="Month-to-date compute units / USD / runs across every brand in the organization.",
+    )
 
 
 class ApifyRunOut(BaseModel):
@@ -147,6 +206,7 @@ class ApifyRunOut(BaseModel):
     status: str
     compute_units: Decimal | None = None
     usage_total_usd: Decimal | None = None
+    reused_from_run_id: int | None = None
     started_at: datetime | None = None
     finished_at: datetime | None = None
     created_at: datetime
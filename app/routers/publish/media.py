@@ -10,13 +10,12 @@ from __future__ import annotations
 import logging
 from typing import Any
 
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, UploadFile, status
 
 from app.database import get_session_local
 from app.dependencies import require_brand
 from app.routers.publish.schemas import MediaAssetSummary
-from app.services import storage
+from app.services import byte_serving, media_pipeline, storage
 
 router = APIRouter(prefix="/publish/media", tags=["Publish - Media"])
 logger = logging.getLogger(__name__)
@@ -43,31 +42,70 @@ async def upload_media(
             )
         except storage.StorageError as exc:
             raise HTTPException(status_code=422, detail=str(exc))
+        media_pipeline.enqueue(asset.id)
         return asset
     finally:
         db.close()
 
 
 @router.get("/{asset_id}/raw")
-async def stream_media(asset_id: int, brand=Depends(require_brand)) -> Any:
-    """Stream the asset's bytes back. Used by the composer preview + by Instagram /
-    TikTok publish steps that need a public URL for the media."""
+async def stream_media(asset_id: int, request: Request, brand=Depends(require_brand)) -> Any:
+    """Stream the asset's bytes back, in chunks read from storage. Used by the
+    composer preview + by Instagram / TikTok publish steps that need a public URL
+    for the media. Supports ``Range`` (video scrubbing) and ``If-None-Match``;
+    an asset id always names the same bytes, so responses are cacheable forever.
+    Payloads on the filesystem backend are served straight from their file."""
     db = get_session_local()()
     try:
-        asset = storage.read(db, asset_id=asset_id, brand_id=brand.id)
+        asset = storage.read_meta(db, asset_id=asset_id, brand_id=brand.id)
         if not asset:
             raise HTTPException(status_code=404, detail="Asset not found")
-        content = asset.content
-        mime = asset.mime
-        filename = asset.filename
+        size, sha256, mime, filename = asset.size_bytes, asset.sha256, asset.mime, asset.filename
+        payload = storage.open_payload(db, asset_id)
     finally:
         db.close()
 
-    def _gen():
-        yield content
+    return byte_serving.serve_bytes(
+        request,
+        read=payload.read,
+        path=payload.path,
+        size=size,
+        sha256=sha256,
+        mime=mime,
+        filename=filename,
+    )
+
+
+@router.get("/{asset_id}/preview")
+async def stream_preview(
+    asset_id: int,
+    request: Request,
+    variant: str = Query(media_pipeline.RENDITION_PREVIEW, pattern="^(thumb|preview)$"),
+    brand=Depends(require_brand),
+) -> Any:
+    """Stream a downscaled rendition (``thumb`` or ``preview``) for the composer.
+    Falls back to the original until the media pipeline has produced it."""
+    db = get_session_local()()
+    try:
+        asset = storage.read_meta(db, asset_id=asset_id, brand_id=brand.id)
+        if not asset:
+            raise HTTPException(status_code=404, detail="Asset not found")
+        rendition = storage.find_rendition(db, asset.sha256, variant)
+        if rendition is None:
+            payload = storage.open_payload(db, asset_id)
+            read, path = payload.read, payload.path
+            size, sha256, mime, filename = asset.size_bytes, asset.sha256, asset.mime, asset.filename
+        else:
+            read, path = storage.rendition_reader(rendition.id), None
+            size, sha256, mime = rendition.size_bytes, rendition.sha256, rendition.mime
+            filename = f"{variant}-{asset.filename.rsplit('.', 1)[0]}.{mime.split('/')[-1]}"
+    finally:
+        db.close()
 
-    return StreamingResponse(
-        _gen(),
-        media_type=mime,
-        headers={"Content-Disposition": f'inline; filename="{filename}"'},
+    return byte_serving.serve_bytes(
+        request, read=read, path=path, size=size, sha256=sha256, mime=mime, filename=filename,
+        # The fallback is replaced by the rendition once it exists.
+        cache_control=(
+            byte_serving.IMMUTABLE_CACHE_CONTROL if rendition else byte_serving.REVALIDATE_CACHE_CONTROL
+        ),
     )
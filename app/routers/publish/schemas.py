@@ -41,6 +41,7 @@ class DraftResponse(BaseModel):
     rejection_reason: str | None = None
     published_at: datetime | None = None
     platform_post_ids_json: dict[str, str] | None = None
+    platform_legs_json: dict[str, dict[str, Any]] | None = None
     error_message: str | None = None
     created_at: datetime
     updated_at: datetime
@@ -66,4 +67,5 @@ class MediaAssetSummary(BaseModel):
     width: int | None = None
     height: int | None = None
     duration_seconds: int | None = None
+    processed_at: datetime | None = None  # dimensions + previews ready
     created_at: datetime
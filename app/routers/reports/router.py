@@ -5,9 +5,10 @@ import logging
 from datetime import datetime, timedelta
 from typing import Any
 
-from fastapi import APIRouter, Body, Depends, HTTPException, status
+from fastapi import APIRouter, Body, Depends, HTTPException, Request, status
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, ConfigDict, EmailStr, Field
+from sqlalchemy.orm import defer
 
 from app.database import get_session_local
 from app.dependencies import require_brand
@@ -18,6 +19,7 @@ from app.models.report_run import (
     ReportRunModel,
 )
 from app.models.report_schedule import ALL_CADENCES, CADENCE_WEEKLY, ReportScheduleModel
+from app.services import byte_serving, storage
 from app.services.reports.builder import build_pdf
 
 router = APIRouter(prefix="/reports", tags=["Reports"])
@@ -94,9 +96,9 @@ async def generate_one_off(
                 sections=payload.sections,
                 kpis=payload.kpis,
             )
-            run.pdf_bytes = pdf_bytes
             run.status = RUN_STATUS_READY
             run.generated_at = datetime.utcnow()
+            await storage.store_report_pdf(db, run, pdf_bytes)
         except Exception as exc:  # noqa: BLE001
             run.status = RUN_STATUS_FAILED
             run.error_message = str(exc)
@@ -115,6 +117,7 @@ async def list_runs(brand=Depends(require_brand), limit: int = 50) -> Any:
     try:
         return (
             db.query(ReportRunModel)
+            .options(defer(ReportRunModel.pdf_bytes), defer(ReportRunModel.csv_bytes))
             .filter(
                 ReportRunModel.brand_id == brand.id,
                 ReportRunModel.deleted_at.is_(None),
@@ -128,12 +131,14 @@ async def list_runs(brand=Depends(require_brand), limit: int = 50) -> Any:
 
 
 @router.get("/runs/{run_id}/pdf")
-async def download_pdf(run_id: int, brand=Depends(require_brand)) -> Any:
-    """Stream the PDF for a generated run. Brand-JWT scoped."""
+async def download_pdf(run_id: int, request: Request, brand=Depends(require_brand)) -> Any:
+    """Stream the PDF for a generated run from its blob (ranges and ETag
+    revalidation supported). Brand-JWT scoped."""
     db = get_session_local()()
     try:
         run = (
             db.query(ReportRunModel)
+            .options(defer(ReportRunModel.pdf_bytes), defer(ReportRunModel.csv_bytes))
             .filter(
                 ReportRunModel.id == run_id,
                 ReportRunModel.brand_id == brand.id,
@@ -143,12 +148,29 @@ async def download_pdf(run_id: int, brand=Depends(require_brand)) -> Any:
         )
         if not run:
             raise HTTPException(status_code=404, detail="Run not found")
-        if run.status != RUN_STATUS_READY or not run.pdf_bytes:
+        if run.status != RUN_STATUS_READY or not (run.pdf_sha256 or run.pdf_bytes):
             raise HTTPException(status_code=409, detail=f"Run is not ready (status='{run.status}')")
-        pdf = run.pdf_bytes
+        sha256 = run.pdf_sha256
+        if sha256:
+            payload = storage.open_blob(db, sha256)
+        else:
+            pdf = run.pdf_bytes  # stored before PDFs moved to blobs
     finally:
         db.close()
 
+    if sha256:
+        if payload is None:
+            raise HTTPException(status_code=404, detail="Report PDF not found")
+        return byte_serving.serve_bytes(
+            request,
+            read=payload.read,
+            size=payload.size,
+            sha256=sha256,
+            mime="application/pdf",
+            filename=f"report-{run_id}.pdf",
+            path=payload.path,
+            disposition="attachment",
+        )
     return StreamingResponse(
         iter([pdf]),
         media_type="application/pdf",
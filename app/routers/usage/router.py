@@ -28,7 +28,9 @@ async def current_brand_usage(brand=Depends(require_brand)) -> dict[str, Any]:
 
     db = get_session_local()()
     try:
-        usage = ApifyRunRepository(db).monthly_usage_for_brand(brand_id)
+        run_repo = ApifyRunRepository(db)
+        usage = run_repo.monthly_usage_for_brand(brand_id)
+        org_usage = run_repo.monthly_usage_for_org(org_id) if org_id else None
     finally:
         db.close()
 
@@ -49,6 +51,10 @@ async def current_brand_usage(brand=Depends(require_brand)) -> dict[str, Any]:
             will_block=budget.will_block,
             period_start=budget.period_start,
         ),
+        organization_usage=(
+            {k: v for k, v in org_usage.items() if k != "period_start"}
+            if org_usage else None
+        ),
     )
     return {"success": True, "data": payload.model_dump(mode="json")}
 
@@ -0,0 +1,320 @@
+"""Where media payloads live.
+
+Every ``media_blobs`` row records the backend holding its bytes
+(``media_blobs.backend``); readers resolve it per request, so rows can move
+between backends while the app serves them (``blob_migration``). New uploads
+go to the backend named by ``settings.media_storage_backend``:
+
+- ``postgres`` — the bytes sit in ``media_blobs.content`` (BYTEA), ingested via
+  ``media_upload_chunks`` and read with ``substring``. No extra infrastructure.
+- ``filesystem`` — one file per SHA-256 under ``settings.media_storage_root``
+  (a local disk or a volume shared by every worker). Reads are mmap slices,
+  and ``local_path`` lets responses hand the file to the server
+  (``byte_serving.serve_bytes``; zero-copy where the server supports the
+  ``pathsend`` extension) instead of streaming it through Python. Files are
+  written to a temp name and renamed into place, so a path never shows
+  partial bytes. An upload's file is placed before its transaction commits;
+  if that transaction rolls back, ``storage.store`` discards the file again
+  (``discard_copy``).
+
+File writes and deletes for one hash are serialised with a Postgres advisory
+lock, so a purge can't unlink a file that a concurrent upload just brought
+back.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import mmap
+import os
+import tempfile
+import uuid
+from datetime import datetime
+from typing import Protocol
+
+from fastapi import UploadFile
+from sqlalchemy import delete, func, insert, literal, select, text, update
+from sqlalchemy.dialects.postgresql import aggregate_order_by, insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.database import get_session_local
+from app.models.media_asset import MediaBlobModel, MediaUploadChunkModel
+from app.services.byte_serving import RangeReader, column_range_reader
+
+settings = get_settings()
+
+
+BACKEND_POSTGRES = "postgres"
+BACKEND_FILESYSTEM = "filesystem"
+
+COPY_CHUNK_BYTES = 4 * 1024 * 1024
+
+
+class BlobBackend(Protocol):
+    name: str
+
+    async def ingest(self, db: Session, upload: UploadFile, sha256: str, size: int) -> None:
+        """Store an upload's bytes and insert (or reference) its blob row on
+        ``db``'s transaction. ``upload`` is positioned at the start."""
+
+    async def copy_in(self, sha256: str, size: int, read: RangeReader) -> None:
+        """Store the bytes of an existing blob, read from another backend.
+        Leaves the row's ``backend`` alone."""
+
+    def reader(self, sha256: str) -> RangeReader: ...
+
+    def local_path(self, sha256: str) -> str | None: ...
+
+    def discard(self, db: Session, sha256: str) -> None:
+        """Drop this backend's copy of the bytes, on ``db``'s transaction —
+        unless the blob's row still names this backend."""
+
+
+def _blob_row(sha256: str, size: int, backend: str, **values) -> pg_insert:
+    stmt = pg_insert(MediaBlobModel).values(
+        sha256=sha256,
+        size_bytes=size,
+        ref_count=1,
+        backend=backend,
+        created_at=datetime.utcnow(),
+        **values,
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=["sha256"],
+        set_={"ref_count": MediaBlobModel.ref_count + 1, "unreferenced_since": None},
+    ).returning(MediaBlobModel.backend)
+
+
+def _lock_hash(db: Session, sha256: str) -> None:
+    db.execute(text("SELECT pg_advisory_xact_lock(hashtextextended(:sha, 0))"), {"sha": sha256})
+
+
+def _assembled(upload_id: str):
+    return (
+        select(
+            func.string_agg(
+                MediaUploadChunkModel.data,
+                aggregate_order_by(literal(b""), MediaUploadChunkModel.seq),
+            )
+        )
+        .where(MediaUploadChunkModel.upload_id == upload_id)
+        .scalar_subquery()
+    )
+
+
+class PostgresBackend:
+    name = BACKEND_POSTGRES
+
+    async def ingest(self, db: Session, upload: UploadFile, sha256: str, size: int) -> None:
+        upload_id = await self._stage(db, upload.read)
+        await asyncio.to_thread(self._assemble, db, upload_id, sha256, size)
+
+    async def copy_in(self, sha256: str, size: int, read: RangeReader) -> None:
+        offset = 0
+
+        async def next_chunk(_: int) -> bytes:
+            nonlocal offset
+            if offset >= size:
+                return b""
+            chunk = await read(offset, min(COPY_CHUNK_BYTES, size - offset))
+            offset += len(chunk)
+            return chunk
+
+        db = get_session_local()()
+        try:
+            upload_id = await self._stage(db, next_chunk)
+
+            def fill() -> None:
+                db.execute(
+                    update(MediaBlobModel)
+                    .where(MediaBlobModel.sha256 == sha256)
+                    .values(content=_assembled(upload_id))
+                )
+                db.execute(delete(MediaUploadChunkModel).where(MediaUploadChunkModel.upload_id == upload_id))
+                db.commit()
+
+            await asyncio.to_thread(fill)
+        except BaseException:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    @staticmethod
+    async def _stage(db: Session, read_chunk) -> str:
+        """Write chunks to ``media_upload_chunks`` until ``read_chunk`` runs dry."""
+        upload_id = uuid.uuid4().hex
+        seq = 0
+        while chunk := await read_chunk(COPY_CHUNK_BYTES):
+            await asyncio.to_thread(
+                db.execute,
+                insert(MediaUploadChunkModel).values(upload_id=upload_id, seq=seq, data=chunk),
+            )
+            seq += 1
+        return upload_id
+
+    @staticmethod
+    def _assemble(db: Session, upload_id: str, sha256: str, size: int) -> None:
+        """Concatenate the chunks into a new blob, in Postgres. If the same
+        bytes were stored concurrently, reference that blob instead."""
+        db.execute(_blob_row(sha256, size, BACKEND_POSTGRES, content=_assembled(upload_id)))
+        db.execute(delete(MediaUploadChunkModel).where(MediaUploadChunkModel.upload_id == upload_id))
+
+    def reader(self, sha256: str) -> RangeReader:
+        return column_range_reader(MediaBlobModel.content, MediaBlobModel.sha256, sha256)
+
+    def local_path(self, sha256: str) -> str | None:
+        return None
+
+    def discard(self, db: Session, sha256: str) -> None:
+        db.execute(
+            update(MediaBlobModel)
+            .where(MediaBlobModel.sha256 == sha256, MediaBlobModel.backend != BACKEND_POSTGRES)
+            .values(content=None)
+        )
+
+
+class FilesystemBackend:
+    name = BACKEND_FILESYSTEM
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+
+    def path(self, sha256: str) -> str:
+        return os.path.join(self.root, sha256[:2], sha256[2:4], sha256)
+
+    async def ingest(self, db: Session, upload: UploadFile, sha256: str, size: int) -> None:
+        tmp = await self._write_temp(upload.read)
+
+        def place() -> None:
+            _lock_hash(db, sha256)
+            self._place(tmp, sha256)
+            backend = db.execute(_blob_row(sha256, size, BACKEND_FILESYSTEM)).scalar()
+            if backend != BACKEND_FILESYSTEM:
+                # Stored concurrently on another backend — that copy wins.
+                os.unlink(self.path(sha256))
+
+        try:
+            await asyncio.to_thread(place)
+        finally:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+
+    async def copy_in(self, sha256: str, size: int, read: RangeReader) -> None:
+        offset = 0
+
+        async def next_chunk(_: int) -> bytes:
+            nonlocal offset
+            if offset >= size:
+                return b""
+            chunk = await read(offset, min(COPY_CHUNK_BYTES, size - offset))
+            offset += len(chunk)
+            return chunk
+
+        tmp = await self._write_temp(next_chunk)
+
+        def place() -> None:
+            db = get_session_local()()
+            try:
+                _lock_hash(db, sha256)
+                self._place(tmp, sha256)
+                db.commit()
+            finally:
+                db.close()
+
+        try:
+            await asyncio.to_thread(place)
+        finally:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+
+    async def _write_temp(self, read_chunk) -> str:
+        tmp_dir = os.path.join(self.root, "tmp")
+        os.makedirs(tmp_dir, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=tmp_dir)
+        try:
+            with os.fdopen(fd, "wb") as out:
+                while chunk := await read_chunk(COPY_CHUNK_BYTES):
+                    await asyncio.to_thread(out.write, chunk)
+                await asyncio.to_thread(os.fsync, out.fileno())
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        return tmp
+
+    def _place(self, tmp: str, sha256: str) -> None:
+        final = self.path(sha256)
+        os.makedirs(os.path.dirname(final), exist_ok=True)
+        os.replace(tmp, final)
+
+    def reader(self, sha256: str) -> RangeReader:
+        path = self.path(sha256)
+
+        async def read(offset: int, length: int) -> bytes:
+            def run() -> bytes:
+                with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    return mapped[offset:offset + length]
+
+            return await asyncio.to_thread(run)
+
+        return read
+
+    def local_path(self, sha256: str) -> str | None:
+        # Not checked for existence: a purge can unlink the file at any point
+        # after this returns, so responses handle a missing file themselves.
+        return self.path(sha256)
+
+    def discard(self, db: Session, sha256: str) -> None:
+        _lock_hash(db, sha256)
+        still_here = db.execute(
+            select(MediaBlobModel.id).where(
+                MediaBlobModel.sha256 == sha256,
+                MediaBlobModel.backend == BACKEND_FILESYSTEM,
+            )
+        ).first()
+        if still_here is None and os.path.exists(self.path(sha256)):
+            os.unlink(self.path(sha256))
+
+
+def discard_copy(backend: BlobBackend, sha256: str) -> None:
+    """``backend.discard`` on its own short-lived session."""
+    db = get_session_local()()
+    try:
+        backend.discard(db, sha256)
+        db.commit()
+    finally:
+        db.close()
+
+
+_backends: dict[str, BlobBackend] = {}
+
+
+def get_backend(name: str) -> BlobBackend:
+    backend = _backends.get(name)
+    if backend is None:
+        if name == BACKEND_POSTGRES:
+            backend = PostgresBackend()
+        elif name == BACKEND_FILESYSTEM:
+            backend = FilesystemBackend(settings.media_storage_root)
+        else:
+            raise ValueError(f"Unknown media storage backend: {name}")
+        _backends[name] = backend
+    return backend
+
+
+def default_backend() -> BlobBackend:
+    return get_backend(settings.media_storage_backend)
+
+
+async def sha256_of(read: RangeReader, size: int) -> str:
+    """Hash a stored payload chunk by chunk (verifies copies)."""
+    digest = hashlib.sha256()
+    offset = 0
+    while offset < size:
+        chunk = await read(offset, min(COPY_CHUNK_BYTES, size - offset))
+        if not chunk:
+            break
+        digest.update(chunk)
+        offset += len(chunk)
+    return digest.hexdigest()
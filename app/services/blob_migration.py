@@ -0,0 +1,156 @@
+"""Move media blobs between storage backends while the app keeps serving them.
+
+Switch ``media_storage_backend`` first, so new uploads land on the target,
+then run ``scripts/migrate_media_storage.py``. Moving a blob takes two steps:
+
+1. ``migrate`` copies the bytes to the target backend, re-hashes the copy
+   against the blob's SHA-256, and only then flips ``media_blobs.backend``
+   (a conditional update, so a blob purged or moved meanwhile is left alone)
+   and stamps ``backend_changed_at``. Readers resolve the backend per request,
+   so they switch over with the flip; both copies exist throughout.
+2. ``finalize`` drops the source copies of blobs flipped more than ``grace``
+   ago, once reads opened before the flip have finished, and clears
+   ``backend_changed_at``.
+
+Both steps are idempotent and can be interrupted and re-run.
+
+``move_report_pdfs`` moves report PDFs stored inline (``report_runs.pdf_bytes``,
+from before PDFs became blobs) onto the configured backend, one run at a time.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, update
+
+from app.database import get_session_local
+from app.models.media_asset import MediaBlobModel
+from app.models.report_run import ReportRunModel
+from app.services import blob_backends, storage
+
+logger = logging.getLogger(__name__)
+
+
+BATCH_SIZE = 100
+FINALIZE_GRACE = timedelta(hours=1)
+
+
+@dataclass
+class MigrationReport:
+    moved: int = 0
+    skipped: int = 0  # purged or moved by someone else meanwhile
+    failed: list[str] = field(default_factory=list)  # SHA-256s whose copy didn't verify
+
+
+def _pending(target: str, after_id: int, limit: int) -> list[tuple[int, str, int, str]]:
+    db = get_session_local()()
+    try:
+        rows = db.execute(
+            select(MediaBlobModel.id, MediaBlobModel.sha256, MediaBlobModel.size_bytes, MediaBlobModel.backend)
+            .where(MediaBlobModel.backend != target, MediaBlobModel.id > after_id)
+            .order_by(MediaBlobModel.id)
+            .limit(limit)
+        ).all()
+        return [tuple(row) for row in rows]
+    finally:
+        db.close()
+
+
+def _flip(sha256: str, source: str, target: str) -> bool:
+    db = get_session_local()()
+    try:
+        flipped = db.execute(
+            update(MediaBlobModel)
+            .where(MediaBlobModel.sha256 == sha256, MediaBlobModel.backend == source)
+            .values(backend=target, backend_changed_at=datetime.utcnow())
+            .returning(MediaBlobModel.id)
+        ).first() is not None
+        db.commit()
+        return flipped
+    finally:
+        db.close()
+
+
+async def migrate(target_name: str, *, limit: int | None = None) -> MigrationReport:
+    """Copy every blob not on ``target_name`` there and flip it (step 1)."""
+    target = blob_backends.get_backend(target_name)
+    report = MigrationReport()
+    after_id = 0
+    while limit is None or report.moved < limit:
+        rows = await asyncio.to_thread(_pending, target_name, after_id, BATCH_SIZE)
+        if not rows:
+            break
+        for blob_id, sha256, size, source_name in rows:
+            after_id = blob_id
+            source = blob_backends.get_backend(source_name)
+            await target.copy_in(sha256, size, source.reader(sha256))
+            if await blob_backends.sha256_of(target.reader(sha256), size) != sha256:
+                logger.error("Copy of blob %s to %s does not match its hash", sha256, target_name)
+                report.failed.append(sha256)
+                await asyncio.to_thread(blob_backends.discard_copy, target, sha256)
+                continue
+            if await asyncio.to_thread(_flip, sha256, source_name, target_name):
+                report.moved += 1
+            else:
+                report.skipped += 1
+                await asyncio.to_thread(blob_backends.discard_copy, target, sha256)
+            if limit is not None and report.moved >= limit:
+                break
+    return report
+
+
+async def move_report_pdfs(*, limit: int | None = None) -> int:
+    """Store inline report PDFs as blobs and clear ``pdf_bytes``. Returns how
+    many runs were moved."""
+    moved = 0
+    after_id = 0
+    while limit is None or moved < limit:
+        db = get_session_local()()
+        try:
+            run = (
+                db.query(ReportRunModel)
+                .filter(
+                    ReportRunModel.id > after_id,
+                    ReportRunModel.pdf_sha256.is_(None),
+                    ReportRunModel.pdf_bytes.isnot(None),
+                )
+                .order_by(ReportRunModel.id)
+                .first()
+            )
+            if run is None:
+                break
+            after_id = run.id
+            await storage.store_report_pdf(db, run, bytes(run.pdf_bytes))
+            moved += 1
+        finally:
+            db.close()
+    return moved
+
+
+def finalize(now: datetime, grace: timedelta = FINALIZE_GRACE) -> int:
+    """Drop the source copies of blobs moved before ``now - grace`` (step 2)."""
+    db = get_session_local()()
+    try:
+        rows = db.execute(
+            select(MediaBlobModel.sha256, MediaBlobModel.backend)
+            .where(
+                MediaBlobModel.backend_changed_at.is_not(None),
+                MediaBlobModel.backend_changed_at < now - grace,
+            )
+        ).all()
+        for sha256, backend_name in rows:
+            for name in (blob_backends.BACKEND_POSTGRES, blob_backends.BACKEND_FILESYSTEM):
+                if name != backend_name:
+                    blob_backends.get_backend(name).discard(db, sha256)
+            db.execute(
+                update(MediaBlobModel)
+                .where(MediaBlobModel.sha256 == sha256, MediaBlobModel.backend == backend_name)
+                .values(backend_changed_at=None)
+            )
+            db.commit()
+        return len(rows)
+    finally:
+        db.close()
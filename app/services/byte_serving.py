@@ -0,0 +1,158 @@
+"""HTTP byte serving for stored payloads.
+
+``serve_bytes`` answers a GET for a stored file without loading it: the body
+is streamed in ``CHUNK_BYTES`` slices read from the database on demand
+(``substring`` on the BYTEA column, so only the slice crosses the wire). It
+honours a single ``Range`` (``206``/``416``), ``If-Range``, and
+``If-None-Match`` against a strong ETag built from the content's SHA-256
+(``304``). Payloads that sit in a local file (``path``) are handed to
+Starlette's ``FileResponse`` instead, which serves ranges from the file and
+lets servers with the ``pathsend`` extension send it zero-copy; a file gone
+by the time the response is sent (purged or moved meanwhile) is a ``404``.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+from collections.abc import AsyncIterator
+from typing import Any, Awaitable, Callable
+
+from fastapi import Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from sqlalchemy import func, select
+
+from app.database import get_session_local
+
+
+CHUNK_BYTES = 1024 * 1024
+
+# For URLs whose bytes never change (an asset id always names the same file).
+IMMUTABLE_CACHE_CONTROL = "private, max-age=31536000, immutable"
+# For URLs whose bytes can be replaced — clients revalidate with the ETag.
+REVALIDATE_CACHE_CONTROL = "private, no-cache"
+
+RangeReader = Callable[[int, int], Awaitable[bytes]]
+
+
+def column_range_reader(column: Any, key_column: Any, key: Any) -> RangeReader:
+    """A ``RangeReader`` over one row's BYTEA ``column``, each read on its own
+    short-lived session off the event loop."""
+    async def read(offset: int, length: int) -> bytes:
+        def run() -> bytes:
+            db = get_session_local()()
+            try:
+                chunk = db.execute(
+                    select(func.substring(column, offset + 1, length)).where(key_column == key)
+                ).scalar()
+            finally:
+                db.close()
+            if chunk is None:
+                raise LookupError(f"{column} for {key} not found")
+            return bytes(chunk)
+
+        return await asyncio.to_thread(run)
+
+    return read
+
+
+def sha256_sql(column: Any) -> Any:
+    """SQL for the hex SHA-256 of a BYTEA column, computed in Postgres."""
+    return func.encode(func.sha256(column), "hex")
+
+
+def _parse_range(header: str, size: int) -> tuple[int, int] | None:
+    """``(first, last)`` for a single ``bytes=`` range; ``None`` to serve the
+    whole body (absent, malformed or multi-range). Raises ``ValueError`` if
+    the range can't be satisfied."""
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first_s, dash, last_s = (part.strip() for part in spec.strip().partition("-"))
+    if not dash or not (first_s or last_s) or not all(p.isdigit() for p in (first_s, last_s) if p):
+        return None
+    if first_s:
+        first = int(first_s)
+        last = int(last_s) if last_s else size - 1
+        if last_s and first > last:
+            return None
+    else:
+        suffix = int(last_s)
+        if suffix == 0:
+            raise ValueError("empty suffix range")
+        first, last = max(0, size - suffix), size - 1
+    if first >= size:
+        raise ValueError("range starts past the end")
+    return first, min(last, size - 1)
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    """Whether an ``If-None-Match`` header lists ``etag`` (or is ``*``)."""
+    return header.strip() == "*" or etag in (tag.strip().removeprefix("W/") for tag in header.split(","))
+
+
+class _LocalFileResponse(FileResponse):
+    """``FileResponse`` that answers ``404`` instead of raising if the file
+    no longer exists when the response starts."""
+
+    async def __call__(self, scope, receive, send) -> None:
+        if self.stat_result is None:
+            try:
+                self.stat_result = await asyncio.to_thread(os.stat, self.path)
+            except FileNotFoundError:
+                await Response(status_code=404)(scope, receive, send)
+                return
+            self.set_stat_headers(self.stat_result)
+        await super().__call__(scope, receive, send)
+
+
+async def _stream(read: RangeReader, first: int, last: int) -> AsyncIterator[bytes]:
+    offset = first
+    while offset <= last:
+        length = min(CHUNK_BYTES, last - offset + 1)
+        yield await read(offset, length)
+        offset += length
+
+
+def serve_bytes(
+    request: Request,
+    *,
+    read: RangeReader,
+    size: int,
+    sha256: str,
+    mime: str,
+    filename: str,
+    cache_control: str = IMMUTABLE_CACHE_CONTROL,
+    path: str | None = None,
+    disposition: str = "inline",
+) -> Response:
+    etag = f'"{sha256}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": cache_control,
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": f'{disposition}; filename="{filename}"',
+    }
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    if path is not None:
+        # Range / If-Range handling is FileResponse's; our ETag takes
+        # precedence over the one it derives from the file's mtime.
+        return _LocalFileResponse(path, media_type=mime, headers=headers)
+
+    byte_range = None
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (not if_range or if_range.strip() == etag):
+        try:
+            byte_range = _parse_range(range_header, size)
+        except ValueError:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+
+    if byte_range is None:
+        first, last, status_code = 0, size - 1, 200
+    else:
+        (first, last), status_code = byte_range, 206
+        headers["Content-Range"] = f"bytes {first}-{last}/{size}"
+    headers["Content-Length"] = str(last - first + 1)
+    return StreamingResponse(_stream(read, first, last), status_code=status_code, media_type=mime, headers=headers)
@@ -4,6 +4,8 @@ Each scraper now takes its own per-target input (URL, handle, query) instead
 of derving everything from the competitor's brand name. The :class:`Target`
 dataclass carries the user-provided value and how to interpret it.
 """
+import hashlib
+import json
 from dataclasses import dataclass
 from typing import Any
 from urllib.parse import quote_plus, urlparse
@@ -176,6 +178,24 @@ def build_google_places_input(target: Target) -> dict[str, Any]:
     }
 
 
+# ── Reuse key ─────────────────────────────────────────────────────────────────
+
+def input_hash(actor_id: str, run_input: dict[str, Any]) -> str:
+    """Canonical sha256 of an actor run — equal for any two runs that would
+    scrape the same thing, whichever brand asked for them.
+
+    Builders already normalise their input (``@acme`` → ``acme``, bare domains
+    → ``https://``), so hashing the sorted JSON of their output is enough.
+    """
+    canonical = json.dumps(
+        {"actor_id": actor_id, "input": run_input},
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
 # ── Validation hints (for the API & UI) ───────────────────────────────────────
 
 DEFAULT_TARGET_TYPES: dict[str, str] = {
@@ -13,6 +13,8 @@ from typing import Any
 import numpy as np
 import pandas as pd
 
+from app.services.competitor_analysis.dedup import cluster_texts
+
 
 # ── Public types (loose dicts on purpose — matches FE schema 1:1) ─────────────
 
@@ -87,6 +89,19 @@ def _empty_summary(extra: dict[str, Any] | None = None) -> dict[str, Any]:
     return base
 
 
+def _collapse_duplicates(df: pd.DataFrame, f: dict[str, Any], text_key: str) -> pd.DataFrame:
+    """With ``collapse_duplicates`` set, keep one row per near-duplicate
+    cluster (the first surviving one). Rows stored before clustering was added
+    have no ``cluster_id`` and are clustered here."""
+    if not f.get("collapse_duplicates") or df.empty:
+        return df
+    if "cluster_id" in df.columns and df["cluster_id"].notna().all():
+        return df[~df["cluster_id"].duplicated()]
+    texts = df[text_key].tolist() if text_key in df.columns else [None] * len(df)
+    reps = cluster_texts(texts)
+    return df[[rep == pos for pos, rep in enumerate(reps)]]
+
+
 def _str_contains(series: pd.Series, needle: str) -> pd.Series:
     if not needle:
         return pd.Series([True] * len(series), index=series.index)
@@ -122,7 +137,20 @@ def _apply_meta_filters(df: pd.DataFrame, f: MetaAdsFilters | None) -> pd.DataFr
     if f.get("search"):
         out = out[_str_contains(out["body"], str(f["search"]))]
 
-    return out
+    return _collapse_duplicates(out, f, "body")
+
+
+def _meta_frame(items: list[dict[str, Any]]) -> pd.DataFrame:
+    """Ads → DataFrame with the derived columns the Meta filters rely on."""
+    df = pd.DataFrame(items)
+    df["is_active"] = df.get("is_active").fillna(False).astype(bool) if "is_active" in df.columns else False
+    df["has_video"] = df.get("media", pd.Series([[]] * len(df))).apply(
+        lambda m: any((isinstance(c, dict) and c.get("type") == "video") for c in (m or []))
+    )
+    df["platforms_lc"] = df.get("platforms", pd.Series([[]] * len(df))).apply(
+        lambda lst: [str(x).lower() for x in (lst or [])]
+    )
+    return df
 
 
 def summarize_meta_ads(
@@ -143,18 +171,9 @@ def summarize_meta_ads(
             "top_pages": {},
         })
 
-    df = pd.DataFrame(items)
+    df = _meta_frame(items)
     total_unfiltered = int(len(df))
 
-    # Derived columns.
-    df["is_active"] = df.get("is_active").fillna(False).astype(bool) if "is_active" in df.columns else False
-    df["has_video"] = df.get("media", pd.Series([[]] * len(df))).apply(
-        lambda m: any((isinstance(c, dict) and c.get("type") == "video") for c in (m or []))
-    )
-    df["platforms_lc"] = df.get("platforms", pd.Series([[]] * len(df))).apply(
-        lambda lst: [str(x).lower() for x in (lst or [])]
-    )
-
     df = _apply_meta_filters(df, filters)
     if df.empty:
         return _empty_summary({
@@ -189,6 +208,7 @@ def summarize_meta_ads(
     return {
         "total": total_unfiltered,
         "filtered_total": int(len(df)),
+        "unique_total": int(df["cluster_id"].nunique()) if "cluster_id" in df.columns else None,
         "ads_active": int(df["is_active"].sum()),
         "ads_with_video": int(df["has_video"].sum()),
         "median_run_days": _safe_float(run_days.median()) if not run_days.empty else None,
@@ -217,7 +237,7 @@ def _apply_ig_filters(df: pd.DataFrame, f: InstagramFilters | None) -> pd.DataFr
         out = out[out["caption"].fillna("").astype(str).str.lower().str.contains("#" + tag, na=False)]
     if f.get("search"):
         out = out[_str_contains(out["caption"], str(f["search"]))]
-    return out
+    return _collapse_duplicates(out, f, "caption")
 
 
 def summarize_instagram(
@@ -328,7 +348,15 @@ def _apply_tt_filters(df: pd.DataFrame, f: TikTokFilters | None) -> pd.DataFrame
         out = out[out["duration"].fillna(0).astype(int) >= int(f["min_duration"])]
     if f.get("max_duration") is not None:
         out = out[out["duration"].fillna(0).astype(int) <= int(f["max_duration"])]
-    return out
+    return _collapse_duplicates(out, f, "description")
+
+
+def _tiktok_frame(videos: list[dict[str, Any]]) -> pd.DataFrame:
+    df = pd.DataFrame(videos)
+    df["hashtags"] = df.get("hashtags", pd.Series([[]] * len(df))).apply(
+        lambda lst: list(lst) if isinstance(lst, list) else []
+    )
+    return df
 
 
 def summarize_tiktok(
@@ -356,11 +384,8 @@ def summarize_tiktok(
             "music_share": None,
         })
 
-    df = pd.DataFrame(videos_raw)
+    df = _tiktok_frame(videos_raw)
     total_unfiltered = int(len(df))
-    df["hashtags"] = df.get("hashtags", pd.Series([[]] * len(df))).apply(
-        lambda lst: list(lst) if isinstance(lst, list) else []
-    )
 
     df = _apply_tt_filters(df, filters)
     if df.empty:
@@ -451,3 +476,108 @@ def summarize(
     if actor_key == "tiktok":
         return summarize_tiktok(raw if isinstance(raw, dict) else {}, filters)
     return {}
+
+
+# ── Server-side paging of the stored items ───────────────────────────────────
+
+# Where each actor keeps its row list inside the stored ``data`` payload
+# (``None`` = the payload itself is the list).
+ITEMS_KEY: dict[str, str | None] = {
+    "facebook_ads": None,
+    "instagram": "posts",
+    "tiktok": "videos",
+    "google_search": "organic",
+    "google_places": None,
+    "website": None,
+}
+
+
+class PageQueryError(ValueError):
+    """Raised by ``page_items`` for a client-fixable query (bad sort key / cursor)."""
+
+
+def split_items(actor_key: str, raw: Any) -> tuple[list[dict[str, Any]], dict[str, Any]]:
+    """Split a stored payload into ``(rows, context)``.
+
+    ``context`` is the small non-paged remainder of dict payloads (Instagram
+    profiles, TikTok authors, SERP people-also-ask) that the tab renders
+    alongside the rows.
+    """
+    key = ITEMS_KEY.get(actor_key)
+    if key is None:
+        return (raw if isinstance(raw, list) else []), {}
+    if not isinstance(raw, dict):
+        return [], {}
+    rows = raw.get(key)
+    context = {k: v for k, v in raw.items() if k != key}
+    return (rows if isinstance(rows, list) else []), context
+
+
+def _filtered_positions(
+    actor_key: str,
+    rows: list[dict[str, Any]],
+    filters: dict[str, Any] | None,
+) -> pd.DataFrame:
+    """Apply the summary filter spec and return the surviving frame.
+
+    The frame index is the row's position in ``rows`` so callers can map back
+    to the original dicts without a lossy ``to_dict`` round-trip.
+    """
+    if actor_key == "facebook_ads":
+        return _apply_meta_filters(_meta_frame(rows), filters)
+    if actor_key == "instagram":
+        return _apply_ig_filters(pd.DataFrame(rows), filters)
+    if actor_key == "tiktok":
+        return _apply_tt_filters(_tiktok_frame(rows), filters)
+    return pd.DataFrame(rows)
+
+
+def page_items(
+    actor_key: str,
+    rows: list[dict[str, Any]],
+    *,
+    filters: dict[str, Any] | None = None,
+    sort: str | None = None,
+    offset: int = 0,
+    limit: int = 50,
+    fields: list[str] | None = None,
+) -> dict[str, Any]:
+    """Filter, sort, slice and project ``rows`` with the same filter spec as
+    :func:`summarize`.
+
+    ``sort`` is a row key, prefixed with ``-`` for descending; missing values
+    always sort last. ``fields`` restricts each returned row to those keys.
+    Returns ``{items, total, filtered_total, next_offset}`` where
+    ``next_offset`` is ``None`` on the last page.
+    """
+    total = len(rows)
+    if not rows:
+        return {"items": [], "total": 0, "filtered_total": 0, "next_offset": None}
+
+    df = _filtered_positions(actor_key, rows, filters)
+
+    if sort:
+        descending = sort.startswith("-")
+        column = sort.lstrip("-")
+        if column not in df.columns:
+            raise PageQueryError(f"Unknown sort field: {column}")
+        try:
+            df = df.sort_values(
+                column, ascending=not descending, kind="stable", na_position="last",
+            )
+        except TypeError as exc:
+            raise PageQueryError(f"Cannot sort by {column}: mixed value types") from exc
+
+    positions = df.index.tolist()
+    page = positions[offset:offset + limit]
+    items = [rows[i] for i in page]
+    if fields:
+        items = [{k: item.get(k) for k in fields} for item in items]
+
+    next_offset = offset + limit if offset + limit < len(positions) else None
+    return {
+        "items": items,
+        "total": total,
+        "filtered_total": len(positions),
+        "next_offset": next_offset,
+    }
@@ -1,7 +1,13 @@
-"""Async wrapper around Apify's run-sync-get-dataset-items endpoint."""
+"""Async wrapper around the Apify actor-run API.
+
+Runs are started asynchronously (``start_actor``) and awaited by run id
+(``wait_for_run``) so the orchestrator can checkpoint a run before it finishes
+and re-attach to it after a restart.
+"""
+import asyncio
 import logging
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, Awaitable, Callable
 from urllib.parse import quote
 
 import httpx
@@ -12,10 +18,20 @@ from app.utils.exceptions import ApifyActorError
 logger = logging.getLogger(__name__)
 
 
+RUN_STATUS_SUCCEEDED = "SUCCEEDED"
+RUN_TERMINAL_STATUSES = frozenset({RUN_STATUS_SUCCEEDED, "FAILED", "ABORTED", "TIMED-OUT"})
+
+# Apify holds a ``waitForFinish`` request open for at most 60s.
+WAIT_FOR_FINISH_SECONDS = 60
+MAX_POLL_FAILURES = 3
+# Back-off after a failed poll: 2s, then 4s, ...
+POLL_RETRY_BASE_SECONDS = 2
+
+
 @dataclass
 class RunOutcome:
-    """Returned by ``ApifyClient.run_actor`` — items + identifiers needed to
-    look up the run's cost stats afterwards."""
+    """Items of a finished run + identifiers needed to look up its cost stats
+    afterwards (built by the orchestrator once ``wait_for_run`` returns)."""
 
     items: list[dict[str, Any]]
     run_id: str | None
@@ -38,11 +54,10 @@ class RunMeta:
 class ApifyClient:
     """Minimal async client for Apify actors.
 
-    Uses the public ``run-sync-get-dataset-items`` endpoint which blocks until
-    the actor finishes and returns the dataset items in one call. The Apify
-    response surfaces the run id via the ``X-Apify-Pagination-Total`` family of
-    headers — we read ``X-Apify-Run-Id`` and ``X-Apify-Dataset-Id`` so callers
-    can fetch run-level cost/usage metadata afterwards via ``fetch_run_meta``.
+    ``start_actor`` starts a run (``POST /acts/{id}/runs``) and returns its run
+    and dataset ids at once; ``wait_for_run`` long-polls the run until it
+    finishes, and ``fetch_dataset_items`` reads its items. Run-level
+    cost/usage metadata comes from ``fetch_run_meta``.
     """
 
     BASE_URL = "https://api.apify.com/v2"
@@ -52,65 +67,26 @@ class ApifyClient:
             raise ApifyActorError("apify", "APIFY_API_TOKEN is not configured")
         self.token = token
 
-    async def run_actor(
-        self,
-        actor_id: str,
-        run_input: dict[str, Any],
-        timeout_seconds: int = 300,
-        memory_mb: int = 1024,
-    ) -> RunOutcome:
-        """Run an actor synchronously and return its dataset items + run id."""
-        encoded_id = quote(actor_id, safe="")
+    async def fetch_dataset_items(self, dataset_id: str) -> list[dict[str, Any]]:
+        """Read a finished run's dataset — used to serve a reused run without
+        paying for a new one. Raises ``ApifyActorError`` on any failure so the
+        caller can fall back to a fresh run."""
         url = (
-            f"{self.BASE_URL}/acts/{encoded_id}/run-sync-get-dataset-items"
-            f"?token={self.token}&memory={memory_mb}&timeout={timeout_seconds}"
-            f"&format=json&clean=true"
+            f"{self.BASE_URL}/datasets/{quote(dataset_id, safe='')}/items"
+            f"?token={self.token}&format=json&clean=true"
         )
-
         try:
-            async with httpx.AsyncClient(timeout=timeout_seconds + 30) as client:
-                response = await client.post(
-                    url,
-                    json=run_input,
-                    headers={"Content-Type": "application/json"},
-                )
+            async with httpx.AsyncClient(timeout=60) as client:
+                response = await client.get(url)
         except httpx.HTTPError as exc:
-            raise ApifyActorError(actor_id, f"network error: {exc}") from exc
-
-        run_id = _read_run_id(response)
-        dataset_id = response.headers.get("x-apify-dataset-id") or response.headers.get(
-            "X-Apify-Dataset-Id"
-        )
-
+            raise ApifyActorError("dataset", f"network error: {exc}") from exc
         if response.status_code >= 400:
-            body = response.text[:500]
-            logger.warning(
-                "Apify actor %s failed: %s %s", actor_id, response.status_code, body
-            )
-            raise ApifyActorError(
-                actor_id,
-                f"HTTP {response.status_code}: {body}",
-                run_id=run_id,
-                dataset_id=dataset_id,
-            )
-
+            raise ApifyActorError("dataset", f"HTTP {response.status_code} for dataset {dataset_id}")
         try:
             payload = response.json()
         except ValueError as exc:
-            raise ApifyActorError(actor_id, "non-JSON response", run_id=run_id) from exc
-
-        if isinstance(payload, dict) and "error" in payload:
-            err = payload["error"]
-            msg = err.get("message") if isinstance(err, dict) else str(err)
-            raise ApifyActorError(
-                actor_id,
-                msg or "actor returned error",
-                run_id=run_id,
-                dataset_id=dataset_id,
-            )
-
-        items = payload if isinstance(payload, list) else []
-        return RunOutcome(items=items, run_id=run_id, dataset_id=dataset_id)
+            raise ApifyActorError("dataset", "non-JSON response") from exc
+        return payload if isinstance(payload, list) else []
 
     async def fetch_run_meta(self, run_id: str) -> RunMeta | None:
         """Fetch run-level cost stats. Returns ``None`` on any failure — cost
@@ -134,35 +110,108 @@ class ApifyClient:
         except ValueError:
             return None
 
-        data = body.get("data") if isinstance(body, dict) else None
-        if not isinstance(data, dict):
-            return None
+        return _parse_run_meta(body, run_id)
 
-        stats = data.get("stats") or {}
-        usage_total_usd = data.get("usageTotalUsd")
-        compute_units = stats.get("computeUnits") if isinstance(stats, dict) else None
-
-        return RunMeta(
-            run_id=str(data.get("id") or run_id),
-            status=data.get("status"),
-            compute_units=_to_float(compute_units),
-            usage_total_usd=_to_float(usage_total_usd),
-            dataset_id=data.get("defaultDatasetId"),
-            started_at=data.get("startedAt"),
-            finished_at=data.get("finishedAt"),
+    async def start_actor(
+        self,
+        actor_id: str,
+        run_input: dict[str, Any],
+        timeout_seconds: int = 300,
+        memory_mb: int = 1024,
+    ) -> tuple[str, str | None]:
+        """Start an actor run without waiting for it. Returns ``(run_id,
+        dataset_id)`` so the caller can checkpoint the run before it finishes."""
+        encoded_id = quote(actor_id, safe="")
+        url = (
+            f"{self.BASE_URL}/acts/{encoded_id}/runs"
+            f"?token={self.token}&memory={memory_mb}&timeout={timeout_seconds}"
         )
+        try:
+            async with httpx.AsyncClient(timeout=60) as client:
+                response = await client.post(
+                    url,
+                    json=run_input,
+                    headers={"Content-Type": "application/json"},
+                )
+        except httpx.HTTPError as exc:
+            raise ApifyActorError(actor_id, f"network error: {exc}") from exc
+
+        if response.status_code >= 400:
+            body = response.text[:500]
+            logger.warning("Apify actor %s failed to start: %s %s", actor_id, response.status_code, body)
+            raise ApifyActorError(actor_id, f"HTTP {response.status_code}: {body}")
+        try:
+            meta = _parse_run_meta(response.json(), None)
+        except ValueError as exc:
+            raise ApifyActorError(actor_id, "non-JSON response") from exc
+        if meta is None or not meta.run_id:
+            raise ApifyActorError(actor_id, "start response carried no run id")
+        return meta.run_id, meta.dataset_id
 
+    async def wait_for_run(
+        self,
+        actor_id: str,
+        run_id: str,
+        on_poll: Callable[[], Awaitable[None]] | None = None,
+    ) -> RunMeta:
+        """Block until the run reaches a terminal status and return its meta.
+
+        Long-polls ``waitForFinish`` (Apify caps it at 60s) and calls
+        ``on_poll`` between polls — the orchestrator uses it as a heartbeat on
+        its checkpoint. Transient network errors are retried a few times,
+        backing off between attempts.
+        """
+        url = (
+            f"{self.BASE_URL}/actor-runs/{quote(run_id, safe='')}"
+            f"?token={self.token}&waitForFinish={WAIT_FOR_FINISH_SECONDS}"
+        )
+        failures = 0
+        async with httpx.AsyncClient(timeout=WAIT_FOR_FINISH_SECONDS + 30) as client:
+            while True:
+                try:
+                    response = await client.get(url)
+                except httpx.HTTPError as exc:
+                    failures += 1
+                    if failures >= MAX_POLL_FAILURES:
+                        raise ApifyActorError(actor_id, f"network error: {exc}", run_id=run_id) from exc
+                    logger.warning("Apify poll failed (run=%s, attempt %d): %s", run_id, failures, exc)
+                    await asyncio.sleep(POLL_RETRY_BASE_SECONDS * 2 ** (failures - 1))
+                    continue
+                if response.status_code >= 400:
+                    raise ApifyActorError(
+                        actor_id, f"HTTP {response.status_code} polling run", run_id=run_id,
+                    )
+                failures = 0
+                try:
+                    meta = _parse_run_meta(response.json(), run_id)
+                except ValueError as exc:
+                    raise ApifyActorError(actor_id, "non-JSON response", run_id=run_id) from exc
+                if meta is None:
+                    raise ApifyActorError(actor_id, "malformed run response", run_id=run_id)
+                if meta.status in RUN_TERMINAL_STATUSES:
+                    return meta
+                if on_poll is not None:
+                    await on_poll()
+
+
+def _parse_run_meta(body: Any, run_id: str | None) -> RunMeta | None:
+    data = body.get("data") if isinstance(body, dict) else None
+    if not isinstance(data, dict):
+        return None
 
-def _read_run_id(response: httpx.Response) -> str | None:
-    for key in (
-        "x-apify-run-id",
-        "X-Apify-Run-Id",
-        "x-apify-actor-run-id",
-    ):
-        value = response.headers.get(key)
-        if value:
-            return value
-    return None
+    stats = data.get("stats") or {}
+    usage_total_usd = data.get("usageTotalUsd")
+    compute_units = stats.get("computeUnits") if isinstance(stats, dict) else None
+
+    return RunMeta(
+        run_id=str(data.get("id") or run_id or ""),
+        status=data.get("status"),
+        compute_units=_to_float(compute_units),
+        usage_total_usd=_to_float(usage_total_usd),
+        dataset_id=data.get("defaultDatasetId"),
+        started_at=data.get("startedAt"),
+        finished_at=data.get("finishedAt"),
+    )
 
 
 def _to_float(value: Any) -> float | None:
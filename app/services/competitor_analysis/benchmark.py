@@ -0,0 +1,252 @@
+"""Cross-competitor benchmark matrix.
+
+Takes the latest completed Instagram / TikTok / Facebook Ads payload of every
+competitor, stacks all posts, videos and ads into one frame per platform and
+computes the side-by-side metrics with grouped pandas / NumPy ops, instead of
+one ``summarize_*`` call per competitor per actor.
+
+Metric definitions follow the per-actor summaries in ``aggregations``:
+engagement rate is the mean per-post ``(likes + comments) / followers``
+(TikTok adds shares), cadence is posts per week over the span the latest run
+covers. ``hashtag_overlap`` is a competitor's mean Jaccard similarity of
+hashtag sets with each other competitor. Ranks are 1 = highest.
+"""
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from app.models.competitor_analysis_result import (
+    ACTOR_FACEBOOK_ADS,
+    ACTOR_INSTAGRAM,
+    ACTOR_TIKTOK,
+)
+from app.services.analytics.derived import share_of_voice_breakdown
+
+
+BENCHMARK_ACTORS = (ACTOR_INSTAGRAM, ACTOR_TIKTOK, ACTOR_FACEBOOK_ADS)
+
+BENCHMARK_METRICS = (
+    "ig_followers",
+    "ig_engagement_rate",
+    "ig_posts_per_week",
+    "ig_median_likes",
+    "tt_followers",
+    "tt_engagement_rate",
+    "tt_videos_per_week",
+    "tt_median_plays",
+    "ads_active",
+    "hashtag_overlap",
+)
+
+_HASHTAG_RE = r"#(\w+)"
+
+
+def _stack(
+    payloads: dict[int, Any],
+    rows_key: str,
+    owner_key: str,
+    columns: list[str],
+) -> tuple[pd.DataFrame, pd.Series]:
+    """One frame of every competitor's ``rows_key`` rows (tagged with
+    ``competitor_id``), plus each competitor's top ``owner_key`` followers."""
+    frames: list[pd.DataFrame] = []
+    followers: dict[int, int] = {}
+    for competitor_id, data in payloads.items():
+        if not isinstance(data, dict):
+            continue
+        owners = data.get(owner_key) or []
+        top = owners[0] if owners and isinstance(owners[0], dict) else {}
+        try:
+            followers[competitor_id] = int(top.get("followers") or 0)
+        except (TypeError, ValueError):
+            followers[competitor_id] = 0
+        rows = [r for r in (data.get(rows_key) or []) if isinstance(r, dict)]
+        if rows:
+            frame = pd.DataFrame(rows, columns=columns)
+            frame["competitor_id"] = competitor_id
+            frames.append(frame)
+    stacked = (
+        pd.concat(frames, ignore_index=True)
+        if frames else pd.DataFrame(columns=[*columns, "competitor_id"])
+    )
+    return stacked, pd.Series(followers, dtype=float)
+
+
+def _platform_metrics(
+    df: pd.DataFrame,
+    followers: pd.Series,
+    *,
+    prefix: str,
+    time_col: str,
+    engagement_cols: list[str],
+    median_col: str,
+    cadence_name: str,
+) -> pd.DataFrame:
+    """Per-competitor followers, engagement rate, cadence and median for one
+    platform's stacked rows."""
+    out = pd.DataFrame({f"{prefix}_followers": followers})
+    if df.empty:
+        return out
+    for col in {*engagement_cols, median_col}:
+        df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
+    df["_ts"] = pd.to_datetime(df[time_col], errors="coerce", utc=True)
+
+    per_follower = df["competitor_id"].map(followers).replace(0, np.nan)
+    df["_engagement"] = df[engagement_cols].sum(axis=1) / per_follower
+
+    grouped = df.groupby("competitor_id")
+    agg = grouped.agg(
+        n=("competitor_id", "size"),
+        first=("_ts", "min"),
+        last=("_ts", "max"),
+        engagement=("_engagement", "mean"),
+        median=(median_col, "median"),
+    )
+    weeks = ((agg["last"] - agg["first"]).dt.total_seconds() / (7 * 86400)).clip(lower=1).fillna(1)
+    out[f"{prefix}_engagement_rate"] = agg["engagement"]
+    out[f"{prefix}_{cadence_name}"] = agg["n"] / weeks
+    out[f"{prefix}_median_{median_col}"] = agg["median"]
+    out[f"{prefix}_count"] = agg["n"]
+    return out
+
+
+def _hashtag_overlap(tags: pd.DataFrame, competitor_ids: list[int]) -> tuple[pd.Series, np.ndarray]:
+    """Pairwise Jaccard of hashtag sets (competitors × competitors) and each
+    competitor's mean overlap with the others."""
+    n = len(competitor_ids)
+    matrix = np.zeros((n, n))
+    if tags.empty or n < 2:
+        return pd.Series(np.nan, index=competitor_ids), matrix
+
+    incidence = (
+        pd.crosstab(tags["competitor_id"], tags["tag"])
+        .reindex(competitor_ids, fill_value=0)
+        .to_numpy(dtype=bool)
+        .astype(np.int64)
+    )
+    inter = incidence @ incidence.T
+    sizes = np.diag(inter)
+    union = sizes[:, None] + sizes[None, :] - inter
+    with np.errstate(divide="ignore", invalid="ignore"):
+        matrix = np.where(union > 0, inter / union, 0.0)
+    np.fill_diagonal(matrix, 0.0)
+    mean_overlap = matrix.sum(axis=1) / (n - 1)
+    mean_overlap = np.where(sizes > 0, mean_overlap, np.nan)
+    return pd.Series(mean_overlap, index=competitor_ids), matrix
+
+
+def _json_value(value: Any) -> Any:
+    if value is None or (isinstance(value, float) and not np.isfinite(value)):
+        return None
+    if isinstance(value, (np.integer, int)):
+        return int(value)
+    return float(value)
+
+
+def build_benchmark(
+    competitors: list[tuple[int, str]],
+    payloads: dict[tuple[int, str], Any],
+    *,
+    brand_name: str,
+    self_competitor_id: int | None = None,
+) -> dict[str, Any]:
+    """Benchmark matrix for ``competitors`` (``(id, name)`` pairs).
+
+    ``payloads`` maps ``(competitor_id, actor_key)`` to the latest completed
+    payload. ``self_competitor_id`` marks the competitor entry that tracks the
+    brand itself — it becomes the brand row of the share-of-voice breakdown
+    (otherwise the brand row has no measured volume).
+    """
+    ids = [cid for cid, _ in competitors]
+    names = dict(competitors)
+
+    def by_actor(actor_key: str) -> dict[int, Any]:
+        return {cid: payloads[(cid, actor_key)] for cid in ids if (cid, actor_key) in payloads}
+
+    ig_posts, ig_followers = _stack(
+        by_actor(ACTOR_INSTAGRAM), "posts", "profiles",
+        ["likes", "comments", "timestamp", "caption"],
+    )
+    tt_videos, tt_followers = _stack(
+        by_actor(ACTOR_TIKTOK), "videos", "authors",
+        ["plays", "likes", "comments", "shares", "create_time", "hashtags"],
+    )
+
+    ig = _platform_metrics(
+        ig_posts, ig_followers, prefix="ig", time_col="timestamp",
+        engagement_cols=["likes", "comments"], median_col="likes", cadence_name="posts_per_week",
+    )
+    tt = _platform_metrics(
+        tt_videos, tt_followers, prefix="tt", time_col="create_time",
+        engagement_cols=["likes", "comments", "shares"], median_col="plays", cadence_name="videos_per_week",
+    )
+
+    ads_frames = [
+        pd.DataFrame({"competitor_id": cid, "is_active": [bool(a.get("is_active")) for a in ads if isinstance(a, dict)]})
+        for cid, ads in by_actor(ACTOR_FACEBOOK_ADS).items()
+        if isinstance(ads, list) and ads
+    ]
+    ads = (
+        pd.concat(ads_frames, ignore_index=True).groupby("competitor_id")["is_active"].sum().rename("ads_active")
+        if ads_frames else pd.Series(dtype=float, name="ads_active")
+    )
+
+    tag_frames = []
+    if not ig_posts.empty:
+        tag_frames.append(
+            ig_posts.assign(tag=ig_posts["caption"].fillna("").astype(str).str.findall(_HASHTAG_RE))
+            [["competitor_id", "tag"]].explode("tag")
+        )
+    if not tt_videos.empty:
+        tag_frames.append(
+            tt_videos.assign(tag=tt_videos["hashtags"].apply(lambda lst: lst if isinstance(lst, list) else []))
+            [["competitor_id", "tag"]].explode("tag")
+        )
+    tags = pd.concat(tag_frames, ignore_index=True) if tag_frames else pd.DataFrame(columns=["competitor_id", "tag"])
+    tags = tags.dropna()
+    tags["tag"] = tags["tag"].astype(str).str.lstrip("#").str.lower()
+    tags = tags[tags["tag"] != ""].drop_duplicates()
+    overlap, overlap_matrix = _hashtag_overlap(tags, ids)
+
+    matrix = (
+        pd.DataFrame(index=pd.Index(ids, name="competitor_id"))
+        .join(ig).join(tt).join(ads)
+        .assign(hashtag_overlap=overlap)
+    )
+    for column in (*BENCHMARK_METRICS, "ig_count", "tt_count"):
+        if column not in matrix.columns:
+            matrix[column] = np.nan
+    ranks = matrix[list(BENCHMARK_METRICS)].rank(ascending=False, method="min")
+
+    volume = matrix[["ig_count", "tt_count", "ads_active"]].fillna(0).sum(axis=1).astype(int)
+    brand_volume = int(volume.get(self_competitor_id, 0)) if self_competitor_id in names else 0
+    sov = share_of_voice_breakdown(
+        brand_name,
+        brand_volume,
+        [(names[cid], int(volume[cid])) for cid in ids if cid != self_competitor_id],
+    )
+
+    rows = []
+    for cid in ids:
+        rows.append({
+            "competitor_id": cid,
+            "name": names[cid],
+            "is_brand": cid == self_competitor_id,
+            "metrics": {m: _json_value(matrix.at[cid, m]) for m in BENCHMARK_METRICS},
+            "ranks": {
+                m: None if pd.isna(ranks.at[cid, m]) else int(ranks.at[cid, m])
+                for m in BENCHMARK_METRICS
+            },
+            "content_volume": int(volume[cid]),
+        })
+
+    return {
+        "metrics": list(BENCHMARK_METRICS),
+        "competitors": rows,
+        "hashtag_overlap": {
+            "competitor_ids": ids,
+            "matrix": np.round(overlap_matrix, 4).tolist(),
+        },
+        "share_of_voice": sov,
+    }
@@ -0,0 +1,169 @@
+"""Near-duplicate detection for competitor ads / posts (MinHash + LSH, numpy).
+
+Ad libraries are full of the same creative with small edits (a swapped emoji,
+a different price). Each text is reduced to a MinHash signature over character
+5-gram shingles, signatures are bucketed by LSH bands, and bucket-mates whose
+estimated Jaccard similarity clears ``SIMILARITY_THRESHOLD`` are merged into one
+cluster. Everything up to the final union-find runs as whole-batch numpy ops,
+so a few thousand ads cluster in well under a second.
+
+Rows get two keys from :func:`annotate_duplicates`:
+  * ``cluster_id``   — id of the cluster's first row (its representative)
+  * ``cluster_size`` — how many rows share that cluster
+
+Rows without text are never merged (each is its own cluster). The orchestrator
+tags rows as part of its normalise step; results stored before that are
+clustered on read when a filter asks to ``collapse_duplicates``.
+"""
+import re
+from typing import Any
+
+import numpy as np
+
+# Which row text identifies a near-duplicate, per actor.
+DEDUP_TEXT_KEY: dict[str, str] = {
+    "facebook_ads": "body",
+    "instagram": "caption",
+    "tiktok": "description",
+}
+
+SHINGLE_SIZE = 5
+NUM_PERM = 64
+BANDS = 16  # 16 bands × 4 rows: pairs at 0.7 Jaccard share a band ~99% of the time
+SIMILARITY_THRESHOLD = 0.7
+
+# Permutation block size for the min-hash pass — bounds peak memory to about
+# (total shingles × block × 4 bytes).
+_PERM_BLOCK = 8
+
+# Shingles are hashed to 64 bits, then folded to 32 for the permutations —
+# half the memory traffic of the hot loop, and 32-bit min-hashes are plenty
+# for similarity estimates at this scale.
+_rng = np.random.default_rng(0x5EED)
+_PERM_A = _rng.integers(1, 2**32, size=NUM_PERM, dtype=np.uint32) | np.uint32(1)
+_PERM_B = _rng.integers(0, 2**32, size=NUM_PERM, dtype=np.uint32)
+_GRAM_PRIME = np.uint64(1099511628211)
+_MAX_HASH = np.iinfo(np.uint32).max
+
+_NON_WORD_RE = re.compile(r"[\W_]+")
+
+
+def _normalize(text: Any) -> bytes:
+    if not isinstance(text, str):
+        return b""
+    cleaned = _NON_WORD_RE.sub(" ", text.lower()).strip()
+    if cleaned and len(cleaned) < SHINGLE_SIZE:
+        cleaned = cleaned.ljust(SHINGLE_SIZE)
+    return cleaned.encode("utf-8")
+
+
+def _mix(h: np.ndarray) -> np.ndarray:
+    """splitmix64 finalizer — spreads the polynomial gram hash over 64 bits."""
+    h = h ^ (h >> np.uint64(30))
+    h = h * np.uint64(0xBF58476D1CE4E5B9)
+    h = h ^ (h >> np.uint64(27))
+    h = h * np.uint64(0x94D049BB133111EB)
+    return h ^ (h >> np.uint64(31))
+
+
+def minhash_signatures(texts: list[Any]) -> tuple[np.ndarray, np.ndarray]:
+    """``(signatures, has_text)`` — one ``NUM_PERM``-wide uint32 row per text.
+
+    Rows for texts with no shingles are all ``_MAX_HASH`` and flagged ``False``
+    in ``has_text``.
+    """
+    encoded = [_normalize(t) for t in texts]
+    n = len(encoded)
+    lengths = np.fromiter((len(b) for b in encoded), dtype=np.int64, count=n)
+    grams_per_doc = np.maximum(lengths - SHINGLE_SIZE + 1, 0)
+    has_text = grams_per_doc > 0
+    signatures = np.full((n, NUM_PERM), _MAX_HASH, dtype=np.uint32)
+    total_grams = int(grams_per_doc.sum())
+    if not total_grams:
+        return signatures, has_text
+
+    buf = np.frombuffer(b"".join(encoded), dtype=np.uint8).astype(np.uint64)
+    doc_starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    gram_offsets = np.concatenate(([0], np.cumsum(grams_per_doc)[:-1]))
+
+    # Position of every shingle's first byte in ``buf``, doc by doc.
+    gram_doc = np.repeat(np.arange(n), grams_per_doc)
+    gram_pos = doc_starts[gram_doc] + (np.arange(total_grams) - gram_offsets[gram_doc])
+
+    hashes = np.zeros(total_grams, dtype=np.uint64)
+    for j in range(SHINGLE_SIZE):
+        hashes = hashes * _GRAM_PRIME + buf[gram_pos + j]
+    hashes = _mix(hashes)
+    folded = ((hashes >> np.uint64(32)) ^ hashes).astype(np.uint32)[:, None]
+
+    # Shingles are contiguous per doc, so one ``reduceat`` per permutation
+    # block takes every doc's minimum at once.
+    segment_starts = gram_offsets[has_text]
+    permuted = np.empty((total_grams, _PERM_BLOCK), dtype=np.uint32)
+    for lo in range(0, NUM_PERM, _PERM_BLOCK):
+        hi = lo + _PERM_BLOCK
+        np.multiply(folded, _PERM_A[None, lo:hi], out=permuted)
+        permuted += _PERM_B[None, lo:hi]
+        signatures[has_text, lo:hi] = np.minimum.reduceat(permuted, segment_starts, axis=0)
+    return signatures, has_text
+
+
+def cluster_texts(texts: list[Any]) -> list[int]:
+    """For each text, the position of its cluster's representative (the
+    lowest position in the cluster)."""
+    n = len(texts)
+    if n == 0:
+        return []
+    signatures, has_text = minhash_signatures(texts)
+    docs = np.flatnonzero(has_text)
+    parent = list(range(n))
+
+    def find(x: int) -> int:
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    if len(docs) > 1:
+        sig = signatures[docs]
+        rows_per_band = NUM_PERM // BANDS
+        pairs: list[np.ndarray] = []
+        for band in range(BANDS):
+            block = np.ascontiguousarray(sig[:, band * rows_per_band:(band + 1) * rows_per_band])
+            keys = block.view(np.dtype((np.void, block.dtype.itemsize * rows_per_band))).ravel()
+            _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+            rep = first[inverse.ravel()]
+            candidates = np.flatnonzero(rep != np.arange(len(docs)))
+            if not len(candidates):
+                continue
+            similarity = (sig[candidates] == sig[rep[candidates]]).mean(axis=1)
+            keep = candidates[similarity >= SIMILARITY_THRESHOLD]
+            if len(keep):
+                pairs.append(np.stack((docs[rep[keep]], docs[keep]), axis=1))
+
+        if pairs:
+            for a, b in np.unique(np.concatenate(pairs), axis=0).tolist():
+                ra, rb = find(a), find(b)
+                if ra != rb:
+                    parent[max(ra, rb)] = min(ra, rb)
+
+    return [find(i) for i in range(n)]
+
+
+def annotate_duplicates(
+    rows: list[dict[str, Any]],
+    text_key: str,
+    id_key: str = "id",
+) -> list[dict[str, Any]]:
+    """Set ``cluster_id`` / ``cluster_size`` on every row (in place) and
+    return ``rows``."""
+    reps = cluster_texts([row.get(text_key) for row in rows])
+    sizes: dict[int, int] = {}
+    for rep in reps:
+        sizes[rep] = sizes.get(rep, 0) + 1
+    for row, rep in zip(rows, reps):
+        rep_id = rows[rep].get(id_key)
+        row["cluster_id"] = str(rep_id) if rep_id not in (None, "") else f"#{rep}"
+        row["cluster_size"] = sizes[rep]
+    return rows
+
@@ -0,0 +1,211 @@
+"""Row-level deltas between two normalised results of the same actor.
+
+A completed result is stored either as a full checkpoint (``data`` set) or as a
+delta against the previous completed result for the same (competitor, actor)
+(``data`` NULL, ``base_result_id`` + ``delta`` set). A checkpoint keeps only
+the ids of the rows added and removed since the previous run (``added_ids`` /
+``removed``) — never a second copy of its rows — so "what's new since last
+scrape" stays a small read either way.
+
+Delta shape (all ids stringified so they survive as JSON object keys)::
+
+    {
+      "v": 1,
+      "order":   ["id", ...],            # row ids of the new payload, in order
+      "added":   [{...}, ...],           # full rows that are new this run
+      "removed": ["id", ...],            # ids that disappeared
+      "changed": {"id": {"field": new}}, # fields whose value changed
+      "dropped": {"id": ["field"]},      # fields that disappeared from a row
+      "context": {...}                   # non-paged remainder (profiles, …)
+    }
+
+Checkpoint summary::
+
+    {"v": 1, "added_ids": ["id", ...], "removed": ["id", ...]}
+"""
+import json
+from typing import Any
+
+from app.services.competitor_analysis.aggregations import ITEMS_KEY, split_items
+
+
+DELTA_VERSION = 1
+
+# Write a full checkpoint after this many consecutive deltas so reads never
+# replay a long chain.
+CHECKPOINT_EVERY = 10
+
+# Store a delta only when it is meaningfully smaller than the full payload.
+MAX_DELTA_RATIO = 0.5
+
+# Which key identifies a row for each actor (default ``id``).
+_ITEM_ID_KEY: dict[str, str] = {
+    "website": "url",
+    "google_search": "url",
+}
+
+
+def _row_ids(actor_key: str, rows: list[dict[str, Any]]) -> list[str] | None:
+    """Stringified row ids, or ``None`` when rows can't be matched reliably
+    (missing or duplicate ids)."""
+    id_key = _ITEM_ID_KEY.get(actor_key, "id")
+    ids: list[str] = []
+    for row in rows:
+        value = row.get(id_key) if isinstance(row, dict) else None
+        if value in (None, ""):
+            return None
+        ids.append(str(value))
+    if len(set(ids)) != len(ids):
+        return None
+    return ids
+
+
+def compute_delta(actor_key: str, previous: Any, current: Any) -> dict[str, Any] | None:
+    """Diff two stored payloads. ``None`` if the rows can't be keyed."""
+    prev_rows, _ = split_items(actor_key, previous)
+    cur_rows, context = split_items(actor_key, current)
+    prev_ids = _row_ids(actor_key, prev_rows)
+    cur_ids = _row_ids(actor_key, cur_rows)
+    if prev_ids is None or cur_ids is None:
+        return None
+
+    prev_by_id = dict(zip(prev_ids, prev_rows))
+    cur_id_set = set(cur_ids)
+
+    added: list[dict[str, Any]] = []
+    changed: dict[str, dict[str, Any]] = {}
+    dropped: dict[str, list[str]] = {}
+    for row_id, row in zip(cur_ids, cur_rows):
+        old = prev_by_id.get(row_id)
+        if old is None:
+            added.append(row)
+            continue
+        diff = {k: v for k, v in row.items() if k not in old or old[k] != v}
+        if diff:
+            changed[row_id] = diff
+        gone = [k for k in old if k not in row]
+        if gone:
+            dropped[row_id] = gone
+
+    return {
+        "v": DELTA_VERSION,
+        "order": cur_ids,
+        "added": added,
+        "removed": [row_id for row_id in prev_ids if row_id not in cur_id_set],
+        "changed": changed,
+        "dropped": dropped,
+        "context": context,
+    }
+
+
+def apply_delta(actor_key: str, base: Any, delta: dict[str, Any]) -> Any:
+    """Rebuild the full payload from ``base`` + ``delta``."""
+    base_rows, _ = split_items(actor_key, base)
+    base_ids = _row_ids(actor_key, base_rows) or []
+    by_id: dict[str, dict[str, Any]] = dict(zip(base_ids, base_rows))
+
+    added_ids = _row_ids(actor_key, delta.get("added") or []) or []
+    for row_id, row in zip(added_ids, delta.get("added") or []):
+        by_id[row_id] = row
+
+    changed = delta.get("changed") or {}
+    dropped = delta.get("dropped") or {}
+    rows: list[dict[str, Any]] = []
+    for row_id in delta.get("order") or []:
+        row = by_id.get(row_id)
+        if row is None:
+            continue
+        if row_id in changed or row_id in dropped:
+            row = {k: v for k, v in row.items() if k not in dropped.get(row_id, ())}
+            row.update(changed.get(row_id) or {})
+        rows.append(row)
+
+    items_key = ITEMS_KEY.get(actor_key)
+    if items_key is None:
+        return rows
+    return {**(delta.get("context") or {}), items_key: rows}
+
+
+def checkpoint_summary(actor_key: str, delta: dict[str, Any] | None) -> dict[str, Any] | None:
+    """What a checkpoint row keeps of its ``delta``: the added and removed row
+    ids only (its ``data`` already holds the added rows)."""
+    if delta is None:
+        return None
+    return {
+        "v": DELTA_VERSION,
+        "added_ids": _row_ids(actor_key, delta.get("added") or []) or [],
+        "removed": delta.get("removed") or [],
+    }
+
+
+def is_checkpoint_summary(delta: dict[str, Any] | None) -> bool:
+    return bool(delta) and "added_ids" in delta
+
+
+def checkpoint_added_rows(actor_key: str, summary: dict[str, Any], full: Any) -> list[dict[str, Any]]:
+    """The rows of a checkpoint's ``full`` payload named by its summary's
+    ``added_ids``."""
+    wanted = set(summary.get("added_ids") or [])
+    rows, _ = split_items(actor_key, full)
+    ids = _row_ids(actor_key, rows) or []
+    return [row for row_id, row in zip(ids, rows) if row_id in wanted]
+
+
+def should_checkpoint(
+    delta: dict[str, Any] | None,
+    full: Any,
+    previous_depth: int,
+) -> bool:
+    """Store ``full`` instead of ``delta`` when the chain is long enough or the
+    delta doesn't save enough space to be worth replaying."""
+    if delta is None or previous_depth + 1 >= CHECKPOINT_EVERY:
+        return True
+    delta_size = len(json.dumps(delta, default=str))
+    full_size = len(json.dumps(full, default=str))
+    return full_size == 0 or delta_size > full_size * MAX_DELTA_RATIO
+
+
+# ── Storage helpers (used with CompetitorAnalysisResultRepository) ────────────
+
+def load_data(repo, row) -> Any:
+    """Full payload for ``row``, replaying its delta chain back to the nearest
+    checkpoint when the row itself only stores a delta."""
+    if row is None:
+        return None
+    chain = [row]
+    current = row
+    while current.data is None and current.base_result_id is not None:
+        if len(chain) > CHECKPOINT_EVERY + 1:
+            return None  # corrupt / cyclic chain — never loop forever
+        current = repo.get_including_deleted(current.base_result_id)
+        if current is None:
+            return None
+        chain.append(current)
+
+    payload = current.data
+    for link in reversed(chain[:-1]):
+        if not link.delta:
+            return None
+        payload = apply_delta(row.actor_key, payload, link.delta)
+    return payload
+
+
+def plan_storage(repo, row, data: Any) -> dict[str, Any]:
+    """Decide how a newly completed ``row`` stores ``data``.
+
+    Returns the ``delta`` / ``base_result_id`` / ``chain_depth`` keyword
+    arguments for ``CompetitorAnalysisResultRepository.mark_completed``.
+    """
+    previous = repo.previous_completed(row)
+    if previous is None:
+        return {"delta": None, "base_result_id": None, "chain_depth": 0}
+
+    delta = compute_delta(row.actor_key, load_data(repo, previous), data)
+    depth = previous.chain_depth or 0
+    if should_checkpoint(delta, data, depth):
+        return {
+            "delta": checkpoint_summary(row.actor_key, delta),
+            "base_result_id": None,
+            "chain_depth": 0,
+        }
+    return {"delta": delta, "base_result_id": previous.id, "chain_depth": depth + 1}
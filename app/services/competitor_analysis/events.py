@@ -0,0 +1,92 @@
+"""Scrape progress events over Postgres LISTEN/NOTIFY.
+
+Every ``ScrapeRun`` transition — and every scrape or job closed by the stuck
+result healer or the start-up reaper — sends a ``pg_notify`` on ``CHANNEL``
+inside its own transaction, so the event goes out exactly when the new state is
+committed — from whichever worker ran the scrape. Each process keeps one
+``PgListener`` connection (started with the first subscriber) and fans
+notifications out to per-job ``asyncio.Queue`` subscribers; the SSE endpoint
+turns those into pushes instead of the page polling the job.
+
+Payloads only carry ids and the new status — subscribers re-read the rows, so
+the 8000-byte NOTIFY limit never applies to summaries. If the listening
+connection drops, subscribers get ``RESYNC`` and should re-read state, since
+notifications sent while it was down are lost.
+"""
+import asyncio
+import json
+import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.services.pg_listener import PgListener
+
+
+logger = logging.getLogger(__name__)
+
+
+CHANNEL = "competitor_scrape_events"
+
+# Queued to subscribers after the listener reconnects.
+RESYNC: dict[str, Any] = {"type": "resync"}
+
+
+def notify(
+    db: Session,
+    *,
+    job_id: int,
+    result_id: int | None,
+    status: str,
+    phase: str | None = None,
+) -> None:
+    """Queue a progress event on ``db``'s transaction; Postgres delivers it
+    on commit and drops it on rollback. ``result_id`` is ``None`` for events
+    about the job itself."""
+    payload = {"job_id": job_id, "result_id": result_id, "status": status}
+    if phase:
+        payload["phase"] = phase
+    db.execute(
+        text("SELECT pg_notify(:channel, :payload)"),
+        {"channel": CHANNEL, "payload": json.dumps(payload)},
+    )
+
+
+_subscribers: dict[int, set[asyncio.Queue]] = {}
+
+
+def _dispatch(event: dict[str, Any]) -> None:
+    try:
+        job_id = int(event["job_id"])
+    except (KeyError, TypeError, ValueError):
+        return
+    for queue in _subscribers.get(job_id, ()):
+        queue.put_nowait(event)
+
+
+def _resync() -> None:
+    for queues in _subscribers.values():
+        for queue in queues:
+            queue.put_nowait(RESYNC)
+
+
+_listener = PgListener(CHANNEL, _dispatch, _resync)
+
+
+@asynccontextmanager
+async def subscribe(job_id: int) -> AsyncIterator[asyncio.Queue]:
+    """``async with subscribe(job_id) as queue:`` — events for one job."""
+    queue: asyncio.Queue = asyncio.Queue()
+    _subscribers.setdefault(job_id, set()).add(queue)
+    try:
+        await _listener.start()
+        yield queue
+    finally:
+        queues = _subscribers.get(job_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del _subscribers[job_id]
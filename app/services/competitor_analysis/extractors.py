@@ -0,0 +1,57 @@
+"""Compiled field accessors for the Apify normalizers.
+
+The Facebook Ads actor emits the same field under different key dialects
+(``page_name`` / ``pageName``, ``ad_archive_id`` / ``adArchiveId``), so the
+normalizer tries up to six aliases for every field of every ad. Within one
+dataset the dialect doesn't change, so we collect the keys that actually occur
+once per run and compile each alias list down to the keys present — usually a
+single direct ``dict.get``.
+
+Pruning keeps the original alias *order*, and the key set is taken from every
+item the normalizer will read (not a sample), so compiled output is identical
+to trying every alias. ``scripts/benchmark_normalizers.py`` checks this.
+
+The Instagram / TikTok normalizers already read each field with one inline
+``d.get(a) or d.get(b)``; compiled getters measured slower there (an extra
+call per field), so they stay as they are.
+"""
+from typing import Any, Callable, Iterable
+
+Getter = Callable[[dict[str, Any]], Any]
+
+_EMPTY = (None, "", [], {})
+
+
+def key_union(dicts: Iterable[Any]) -> frozenset[str]:
+    """Every key that occurs in any of ``dicts`` (non-dicts are skipped)."""
+    keys: set[str] = set()
+    for d in dicts:
+        if isinstance(d, dict):
+            keys.update(d)
+    return frozenset(keys)
+
+
+def _none(_d: dict[str, Any]) -> None:
+    return None
+
+
+def compile_pick(present: frozenset[str], *keys: str) -> Getter:
+    """First value among ``keys`` not in ``(None, "", [], {})``, else ``None``."""
+    live = tuple(k for k in keys if k in present)
+    if not live:
+        return _none
+    if len(live) == 1:
+        (only,) = live
+
+        def pick_one(d: dict[str, Any]) -> Any:
+            v = d.get(only)
+            return v if v not in _EMPTY else None
+        return pick_one
+
+    def pick_many(d: dict[str, Any]) -> Any:
+        for k in live:
+            v = d.get(k)
+            if v not in _EMPTY:
+                return v
+        return None
+    return pick_many
@@ -0,0 +1,228 @@
+"""Competitor thumbnail cache.
+
+Normalised results reference remote CDN images (ad creatives, profile
+pictures, TikTok covers) whose signed URLs expire and load slowly. After a run
+completes, ``cache_result_media`` registers every image URL in the payload and
+downloads the new ones with bounded concurrency — shared across all runs in the
+process. Each image is downscaled to a WebP thumbnail of at most
+``competitor_media_thumb_max_side`` pixels (Pillow, in ``media_pipeline``'s
+process pool) and stored in ``competitor_media_blobs``, content-addressed by
+SHA-256 so a creative shared by many ads is stored once.
+
+Sources over ``competitor_media_max_bytes`` aren't downloaded; anything
+uncached is served by redirecting to the source, so the proxy URL always works.
+
+Downloads go through a ``MediaFetcher``; ``HttpxMediaFetcher`` is the default
+and takes an optional httpx transport, so the cache can be driven against a
+local stand-in server or an in-process mock transport.
+"""
+import asyncio
+import hashlib
+import logging
+from typing import Any, Protocol
+
+import httpx
+
+from app.config import get_settings
+from app.database import get_session_local
+from app.models.competitor_analysis_result import (
+    ACTOR_FACEBOOK_ADS,
+    ACTOR_GOOGLE_PLACES,
+    ACTOR_INSTAGRAM,
+    ACTOR_TIKTOK,
+)
+from app.models.competitor_media import (
+    MEDIA_STATUS_CACHED,
+    MEDIA_STATUS_FAILED,
+    MEDIA_STATUS_TOO_LARGE,
+)
+from app.repositories.competitor_media import CompetitorMediaRepository
+from app.services import media_pipeline
+
+
+logger = logging.getLogger(__name__)
+
+
+# Upper bound on images registered from one result payload.
+MAX_URLS_PER_RESULT = 200
+
+_MAGIC: tuple[tuple[bytes, int, str], ...] = (
+    (b"\xff\xd8\xff", 0, "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", 0, "image/png"),
+    (b"GIF87a", 0, "image/gif"),
+    (b"GIF89a", 0, "image/gif"),
+    (b"WEBP", 8, "image/webp"),
+)
+
+# Process-wide download slots — created lazily on the running loop.
+_slots: asyncio.Semaphore | None = None
+
+
+class MediaFetchError(Exception):
+    """The image could not be downloaded or isn't an image."""
+
+
+class MediaTooLarge(MediaFetchError):
+    """The image exceeds the cache's size cap."""
+
+
+class MediaFetcher(Protocol):
+    async def fetch(self, url: str, max_bytes: int) -> bytes:
+        """Return the body of ``url``; raise ``MediaTooLarge`` past
+        ``max_bytes`` and ``MediaFetchError`` for anything else."""
+        ...
+
+    async def aclose(self) -> None:
+        ...
+
+
+class HttpxMediaFetcher:
+    """Streams images with httpx, aborting as soon as the size cap is hit."""
+
+    def __init__(
+        self,
+        timeout_seconds: float,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        self._client = httpx.AsyncClient(
+            timeout=timeout_seconds,
+            follow_redirects=True,
+            transport=transport,
+            headers={"Accept": "image/*"},
+        )
+
+    async def fetch(self, url: str, max_bytes: int) -> bytes:
+        try:
+            async with self._client.stream("GET", url) as response:
+                if response.status_code != 200:
+                    raise MediaFetchError(f"HTTP {response.status_code}")
+                declared = response.headers.get("Content-Length")
+                if declared and declared.isdigit() and int(declared) > max_bytes:
+                    raise MediaTooLarge(f"{declared} bytes")
+                body = bytearray()
+                async for chunk in response.aiter_bytes():
+                    body += chunk
+                    if len(body) > max_bytes:
+                        raise MediaTooLarge(f"over {max_bytes} bytes")
+                return bytes(body)
+        except httpx.HTTPError as exc:
+            raise MediaFetchError(f"network error: {exc}") from exc
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+def media_key(url: str) -> str:
+    """Proxy lookup key for a remote URL."""
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
+def sniff_image_mime(content: bytes) -> str | None:
+    for magic, offset, mime in _MAGIC:
+        if content[offset:offset + len(magic)] == magic:
+            return mime
+    return None
+
+
+def media_urls(actor_key: str, data: Any) -> list[str]:
+    """Image URLs referenced by a normalised payload, first-seen order."""
+    found: list[Any] = []
+    if actor_key == ACTOR_FACEBOOK_ADS and isinstance(data, list):
+        for ad in data:
+            for m in (ad.get("media") or []) if isinstance(ad, dict) else []:
+                if isinstance(m, dict) and m.get("type") == "image":
+                    found.append(m.get("url"))
+    elif actor_key == ACTOR_INSTAGRAM and isinstance(data, dict):
+        found += [p.get("profile_pic_url") for p in data.get("profiles") or [] if isinstance(p, dict)]
+        found += [p.get("display_url") for p in data.get("posts") or [] if isinstance(p, dict)]
+    elif actor_key == ACTOR_TIKTOK and isinstance(data, dict):
+        found += [a.get("avatar") for a in data.get("authors") or [] if isinstance(a, dict)]
+        found += [v.get("cover") for v in data.get("videos") or [] if isinstance(v, dict)]
+    elif actor_key == ACTOR_GOOGLE_PLACES and isinstance(data, list):
+        found += [p.get("image_url") for p in data if isinstance(p, dict)]
+
+    urls: dict[str, None] = {}
+    for url in found:
+        if isinstance(url, str) and url.startswith(("http://", "https://")):
+            urls.setdefault(url, None)
+    return list(urls)[:MAX_URLS_PER_RESULT]
+
+
+async def cache_result_media(
+    actor_key: str,
+    data: Any,
+    *,
+    fetcher: MediaFetcher | None = None,
+) -> dict[str, int]:
+    """Download and store the payload's not-yet-cached images. Returns
+    per-outcome counts; never raises for individual image failures."""
+    global _slots
+    settings = get_settings()
+    urls = {media_key(u): u for u in media_urls(actor_key, data)}
+    counts = {
+        "referenced": len(urls),
+        MEDIA_STATUS_CACHED: 0,
+        MEDIA_STATUS_TOO_LARGE: 0,
+        MEDIA_STATUS_FAILED: 0,
+    }
+    if not urls:
+        return counts
+
+    db = get_session_local()()
+    try:
+        todo = CompetitorMediaRepository(db).register(urls)
+    finally:
+        db.close()
+    if not todo:
+        return counts
+
+    if _slots is None:
+        _slots = asyncio.Semaphore(max(1, settings.competitor_media_fetch_concurrency))
+    own_fetcher = fetcher is None
+    if fetcher is None:
+        fetcher = HttpxMediaFetcher(settings.competitor_media_fetch_timeout_seconds)
+    max_bytes = settings.competitor_media_max_bytes
+    thumb = media_pipeline.RenditionSpec(
+        "competitor", "WEBP", settings.competitor_media_thumb_max_side, 78,
+    )
+
+    async def download(url_hash: str, url: str) -> str:
+        async with _slots:
+            try:
+                source = await fetcher.fetch(url, max_bytes)
+                if sniff_image_mime(source) is None:
+                    raise MediaFetchError("not an image")
+                try:
+                    rendition = (await media_pipeline.render(source, (thumb,))).renditions[0]
+                except Exception as exc:  # noqa: BLE001 — Pillow raises many types
+                    raise MediaFetchError(f"undecodable image: {exc}") from exc
+                content, mime = rendition.data, rendition.mime
+            except MediaTooLarge as exc:
+                status, error = MEDIA_STATUS_TOO_LARGE, str(exc)
+            except MediaFetchError as exc:
+                status, error = MEDIA_STATUS_FAILED, str(exc)
+            else:
+                status, error = MEDIA_STATUS_CACHED, None
+        # Stored as each download finishes so at most one batch of slots'
+        # worth of image bytes is held in memory.
+        db = get_session_local()()
+        try:
+            repo = CompetitorMediaRepository(db)
+            if status == MEDIA_STATUS_CACHED:
+                repo.store(url_hash, hashlib.sha256(content).hexdigest(), mime, content)
+            else:
+                repo.mark(url_hash, status, error)
+        finally:
+            db.close()
+        return status
+
+    try:
+        statuses = await asyncio.gather(*(download(h, u) for h, u in todo))
+    finally:
+        if own_fetcher:
+            await fetcher.aclose()
+
+    for status in statuses:
+        counts[status] += 1
+    logger.info("Media cache for %s: %s", actor_key, counts)
+    return counts
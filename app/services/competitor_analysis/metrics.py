@@ -0,0 +1,43 @@
+"""Headline metrics tracked across runs for the competitor trend charts.
+
+Every completed result records the numeric summary keys listed in
+``TREND_METRICS`` for its actor into ``competitor_metric_points`` (one row per
+metric per run). The trends endpoint then reads those narrow rows — never the
+historical ``data`` payloads.
+"""
+from math import isfinite
+from typing import Any
+
+from app.models.competitor_analysis_result import (
+    ACTOR_FACEBOOK_ADS,
+    ACTOR_GOOGLE_PLACES,
+    ACTOR_GOOGLE_SEARCH,
+    ACTOR_INSTAGRAM,
+    ACTOR_TIKTOK,
+    ACTOR_WEBSITE,
+)
+
+
+# Actor-key → summary keys kept as trend points. Keep in sync with the
+# backfill in alembic revision s7t8u9v0w1x2.
+TREND_METRICS: dict[str, tuple[str, ...]] = {
+    ACTOR_FACEBOOK_ADS: ("ads_total", "ads_active", "unique_total"),
+    ACTOR_INSTAGRAM: ("followers", "posts_count", "median_likes"),
+    ACTOR_TIKTOK: ("followers", "videos_count", "total_plays", "median_plays"),
+    ACTOR_GOOGLE_PLACES: ("places_count", "average_rating", "total_reviews"),
+    ACTOR_GOOGLE_SEARCH: ("results_count",),
+    ACTOR_WEBSITE: ("pages_count", "total_words"),
+}
+
+
+def metric_points(actor_key: str, summary: dict[str, Any] | None) -> dict[str, float]:
+    """The actor's trend metrics present in ``summary`` as floats; missing or
+    non-numeric values are left out rather than recorded as zero."""
+    points: dict[str, float] = {}
+    for metric in TREND_METRICS.get(actor_key, ()):
+        value = (summary or {}).get(metric)
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            continue
+        if isfinite(value):
+            points[metric] = float(value)
+    return points
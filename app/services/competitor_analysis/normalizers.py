@@ -5,10 +5,14 @@ Each function returns ``(data, summary)`` where:
   * ``summary`` — small dict of headline numbers used in list cards / pills
 """
 import re
+from dataclasses import dataclass
 from datetime import datetime, timezone
+from statistics import median
 from typing import Any
 from urllib.parse import urlparse
 
+from app.services.competitor_analysis.extractors import Getter, compile_pick, key_union
+
 NormalizedResult = tuple[list[dict[str, Any]] | dict[str, Any], dict[str, Any]]
 
 
@@ -28,15 +32,6 @@ def _truncate(text: Any, n: int = 500) -> str | None:
     return text if len(text) <= n else text[: n - 1] + "…"
 
 
-def _pick(d: dict[str, Any], *keys: str) -> Any:
-    """Return the first non-empty value among the given keys."""
-    for k in keys:
-        v = d.get(k)
-        if v not in (None, "", [], {}):
-            return v
-    return None
-
-
 def _to_iso_date(v: Any) -> str | None:
     """Coerce Apify's mixed date shapes to an ISO-8601 string (YYYY-MM-DD).
 
@@ -89,67 +84,51 @@ def normalize_facebook_ads(
     items: list[dict[str, Any]],
     brand_name: str | None = None,
 ) -> NormalizedResult:
-    ads: list[dict[str, Any]] = []
-    for raw in items[:60]:
-        snap = raw.get("snapshot") or {}
+    batch = items[:60]
+    snaps = [raw.get("snapshot") or {} for raw in batch]
+    plan = _FacebookAdsPlan.compile(batch, snaps)
 
-        body_text = _pick(
-            snap, "body"
-        )
+    ads: list[dict[str, Any]] = []
+    for raw, snap in zip(batch, snaps):
+        body_text = plan.snap_body(snap)
         if isinstance(body_text, dict):
             body_text = body_text.get("text") or body_text.get("markup")
-        body_text = body_text or _pick(raw, "ad_creative_body", "body", "adCreativeBody")
+        body_text = body_text or plan.raw_body(raw)
         body_text = _clean_ad_body(body_text, brand_name)
 
         media: list[dict[str, str]] = []
 
         for c in (snap.get("cards") or [])[:3]:
-            url = _pick(
-                c,
-                "video_preview_image_url", "videoPreviewImageUrl",
-                "resized_image_url", "resizedImageUrl",
-                "original_image_url", "originalImageUrl",
-            )
+            url = plan.card_url(c)
             if url:
-                has_video = bool(_pick(c, "video_hd_url", "videoHdUrl", "video_sd_url", "videoSdUrl"))
+                has_video = bool(plan.card_video(c))
                 media.append({"url": url, "type": "video" if has_video else "image"})
 
         if not media:
             for v in (snap.get("videos") or [])[:1]:
-                url = _pick(
-                    v,
-                    "video_preview_image_url", "videoPreviewImageUrl",
-                    "video_hd_url", "videoHdUrl",
-                )
+                url = plan.video_url(v)
                 if url:
                     media.append({"url": url, "type": "video"})
             for i in (snap.get("images") or [])[:2]:
-                url = _pick(
-                    i,
-                    "resized_image_url", "resizedImageUrl",
-                    "original_image_url", "originalImageUrl",
-                )
+                url = plan.image_url(i)
                 if url:
                     media.append({"url": url, "type": "image"})
 
-        page_name = _pick(
-            raw, "page_name", "pageName"
-        ) or _pick(snap, "page_name", "pageName")
-
-        page_url = _pick(raw, "page_url", "pageUrl") or _pick(snap, "page_profile_uri", "pageProfileUri")
+        page_name = plan.raw_page_name(raw) or plan.snap_page_name(snap)
+        page_url = plan.raw_page_url(raw) or plan.snap_page_url(snap)
 
         ad_entry = {
-            "id": _pick(raw, "ad_archive_id", "adArchiveId", "id"),
+            "id": plan.ad_id(raw),
             "page_name": page_name,
             "page_url": page_url,
             "body": _truncate(body_text, 600),
-            "cta": _pick(snap, "cta_text", "ctaText") or _pick(raw, "cta_text", "ctaText"),
-            "link_url": _pick(snap, "link_url", "linkUrl") or _pick(raw, "link_url", "linkUrl"),
-            "start_date": _to_iso_date(_pick(raw, "start_date", "startDate", "start_date_string")),
-            "end_date": _to_iso_date(_pick(raw, "end_date", "endDate", "end_date_string")),
+            "cta": plan.snap_cta(snap) or plan.raw_cta(raw),
+            "link_url": plan.snap_link(snap) or plan.raw_link(raw),
+            "start_date": _to_iso_date(plan.start_date(raw)),
+            "end_date": _to_iso_date(plan.end_date(raw)),
             "is_active": raw.get("is_active") if raw.get("is_active") is not None else raw.get("isActive"),
-            "platforms": _pick(raw, "publisher_platform", "publisherPlatform", "publisher_platforms") or [],
-            "regions": _pick(raw, "regions", "eu_total_reach_breakdown") or [],
+            "platforms": plan.platforms(raw) or [],
+            "regions": plan.regions(raw) or [],
             "media": media,
         }
 
@@ -168,6 +147,73 @@ def normalize_facebook_ads(
     }
 
 
+@dataclass(frozen=True)
+class _FacebookAdsPlan:
+    """Alias lists of ``normalize_facebook_ads`` compiled against the keys one
+    dataset actually uses (see ``extractors``)."""
+    snap_body: Getter
+    raw_body: Getter
+    card_url: Getter
+    card_video: Getter
+    video_url: Getter
+    image_url: Getter
+    raw_page_name: Getter
+    snap_page_name: Getter
+    raw_page_url: Getter
+    snap_page_url: Getter
+    ad_id: Getter
+    snap_cta: Getter
+    raw_cta: Getter
+    snap_link: Getter
+    raw_link: Getter
+    start_date: Getter
+    end_date: Getter
+    platforms: Getter
+    regions: Getter
+
+    @classmethod
+    def compile(cls, batch: list[dict[str, Any]], snaps: list[dict[str, Any]]) -> "_FacebookAdsPlan":
+        raw_keys = key_union(batch)
+        snap_keys = key_union(snaps)
+        card_keys = key_union(c for snap in snaps for c in (snap.get("cards") or [])[:3])
+        video_keys = key_union(v for snap in snaps for v in (snap.get("videos") or [])[:1])
+        image_keys = key_union(i for snap in snaps for i in (snap.get("images") or [])[:2])
+        return cls(
+            snap_body=compile_pick(snap_keys, "body"),
+            raw_body=compile_pick(raw_keys, "ad_creative_body", "body", "adCreativeBody"),
+            card_url=compile_pick(
+                card_keys,
+                "video_preview_image_url", "videoPreviewImageUrl",
+                "resized_image_url", "resizedImageUrl",
+                "original_image_url", "originalImageUrl",
+            ),
+            card_video=compile_pick(card_keys, "video_hd_url", "videoHdUrl", "video_sd_url", "videoSdUrl"),
+            video_url=compile_pick(
+                video_keys,
+                "video_preview_image_url", "videoPreviewImageUrl",
+                "video_hd_url", "videoHdUrl",
+            ),
+            image_url=compile_pick(
+                image_keys,
+                "resized_image_url", "resizedImageUrl",
+                "original_image_url", "originalImageUrl",
+            ),
+            raw_page_name=compile_pick(raw_keys, "page_name", "pageName"),
+            snap_page_name=compile_pick(snap_keys, "page_name", "pageName"),
+            raw_page_url=compile_pick(raw_keys, "page_url", "pageUrl"),
+            snap_page_url=compile_pick(snap_keys, "page_profile_uri", "pageProfileUri"),
+            ad_id=compile_pick(raw_keys, "ad_archive_id", "adArchiveId", "id"),
+            snap_cta=compile_pick(snap_keys, "cta_text", "ctaText"),
+            raw_cta=compile_pick(raw_keys, "cta_text", "ctaText"),
+            snap_link=compile_pick(snap_keys, "link_url", "linkUrl"),
+            raw_link=compile_pick(raw_keys, "link_url", "linkUrl"),
+            start_date=compile_pick(raw_keys, "start_date", "startDate", "start_date_string"),
+            end_date=compile_pick(raw_keys, "end_date", "endDate", "end_date_string"),
+            platforms=compile_pick(raw_keys, "publisher_platform", "publisherPlatform", "publisher_platforms"),
+            regions=compile_pick(raw_keys, "regions", "eu_total_reach_breakdown"),
+        )
+
+
 # ── 2. Website crawler ────────────────────────────────────────────────────────
 
 def normalize_website(items: list[dict[str, Any]]) -> NormalizedResult:
@@ -338,6 +384,7 @@ def normalize_instagram(items: list[dict[str, Any]]) -> NormalizedResult:
         "followers": top.get("followers") if top else 0,
         "posts_count": top.get("posts_count") if top else 0,
         "matches": len(profiles),
+        "median_likes": median(p["likes"] for p in posts[:30]) if posts else None,
     }
     return {"profiles": profiles, "posts": posts[:30]}, summary
 
@@ -404,6 +451,7 @@ def normalize_tiktok(items: list[dict[str, Any]]) -> NormalizedResult:
         "followers": top.get("followers") if top else 0,
         "videos_count": len(videos),
         "total_plays": sum(v.get("plays") or 0 for v in videos),
+        "median_plays": median(v["plays"] for v in videos) if videos else None,
     }
     return {"authors": author_list, "videos": videos}, summary
 
@@ -7,10 +7,12 @@ configure per-actor targets and explicitly run each scraper.
 import asyncio
 import functools
 import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
 from typing import Any, Callable
 
 from app.config import get_settings
-from app.database import get_session_local
+from app.models.apify_run import ApifyRunModel
 from app.models.competitor_analysis_result import (
     ACTOR_FACEBOOK_ADS,
     ACTOR_GOOGLE_PLACES,
@@ -18,9 +20,15 @@ from app.models.competitor_analysis_result import (
     ACTOR_INSTAGRAM,
     ACTOR_TIKTOK,
     ACTOR_WEBSITE,
+    RESULT_STATUS_COMPLETED,
+    RESULT_STATUS_RUNNING,
+    RUN_PHASE_DATASET_READY,
+    RUN_PHASE_NORMALISED,
+    RUN_PHASE_STARTED,
+    CompetitorAnalysisResultModel,
 )
 from app.repositories.apify_run import ApifyRunRepository
-from app.repositories.competitor_analysis_job import CompetitorAnalysisJobRepository
+from app.repositories.competitor import CompetitorRepository
 from app.repositories.competitor_analysis_result import CompetitorAnalysisResultRepository
 from app.repositories.competitor_target import CompetitorTargetRepository
 from app.services.competitor_analysis.actor_inputs import (
@@ -37,8 +45,18 @@ from app.services.competitor_analysis.actor_inputs import (
     build_instagram_input,
     build_tiktok_input,
     build_website_input,
+    input_hash,
 )
-from app.services.competitor_analysis.apify_client import ApifyClient, RunOutcome
+from app.services.competitor_analysis.aggregations import split_items
+from app.services.competitor_analysis.apify_client import (
+    RUN_STATUS_SUCCEEDED,
+    ApifyClient,
+    RunMeta,
+    RunOutcome,
+)
+from app.services.competitor_analysis.dedup import DEDUP_TEXT_KEY, annotate_duplicates
+from app.services.competitor_analysis.deltas import load_data
+from app.services.competitor_analysis.media_cache import cache_result_media
 from app.services.competitor_analysis.normalizers import (
     normalize_facebook_ads,
     normalize_google_places,
@@ -47,6 +65,7 @@ from app.services.competitor_analysis.normalizers import (
     normalize_tiktok,
     normalize_website,
 )
+from app.services.competitor_analysis.run_state import ScrapeRun, transaction
 from app.utils.exceptions import ApifyActorError
 
 
@@ -72,6 +91,12 @@ _ACTOR_REGISTRY: dict[
 }
 
 
+# Normalisers whose output depends on the requesting brand (ad copy templating
+# uses the competitor's display name) — their stored result is never copied
+# across brands; a reused run re-normalises the shared dataset instead.
+_BRAND_DEPENDENT_ACTORS = frozenset({ACTOR_FACEBOOK_ADS})
+
+
 # ── Public entry points ───────────────────────────────────────────────────────
 
 async def run_target(
@@ -88,227 +113,373 @@ async def run_target(
 ) -> None:
     """Run one scraper end-to-end and persist results + cost.
 
-    Always opens a fresh DB session — must not share the request-bound session.
-    Cost-ledger writes are best-effort: if Apify's metadata endpoint fails we
-    still record the result.
+    All DB writes go through ``ScrapeRun`` — one transaction per state
+    transition, off the event loop; it never shares the request-bound session.
+    Cost capture is best-effort: if Apify's metadata endpoint fails we still
+    record the result.
     """
+    run = ScrapeRun(job_id=job_id, result_id=result_id, target_id=target_id)
     settings = get_settings()
     token = settings.apify_api_token
     if not token:
-        _record_actor_failure(job_id, result_id, "APIFY_API_TOKEN is not configured on the server")
-        _finalize_job(job_id)
+        await run.reject("APIFY_API_TOKEN is not configured on the server")
         return
 
     if actor_key not in _ACTOR_REGISTRY:
-        _record_actor_failure(job_id, result_id, f"Unknown actor: {actor_key}")
-        _finalize_job(job_id)
+        await run.reject(f"Unknown actor: {actor_key}")
         return
 
     actor_id, timeout, build_input, normalizer = _ACTOR_REGISTRY[actor_key]
 
     if actor_key == ACTOR_FACEBOOK_ADS:
         normalizer = functools.partial(normalize_facebook_ads, brand_name=competitor_name)
+    normalizer = _with_duplicate_clusters(actor_key, normalizer)
 
     target = Target(actor_key=actor_key, target_value=target_value, target_type=target_type)
     try:
         run_input = build_input(target)
     except Exception as exc:  # noqa: BLE001
-        _record_actor_failure(job_id, result_id, f"invalid target: {exc}")
-        _finalize_job(job_id)
+        await run.reject(f"invalid target: {exc}")
         return
 
     client = ApifyClient(token)
+    run_hash = input_hash(actor_id, run_input)
 
-    # Open a ledger row up-front so we can record cost even if the run fails.
-    ledger_id = _start_ledger(
+    # Opens the ledger row up-front so we can record cost even if the run fails.
+    await run.start(
         brand_id=brand_id,
         competitor_id=competitor_id,
-        result_id=result_id,
         actor_key=actor_key,
+        input_hash=run_hash,
+    )
+
+    reused = await _try_reuse(
+        client,
+        ledger_id=run.ledger_id,
+        actor_key=actor_key,
+        run_hash=run_hash,
+        normalizer=normalizer,
+    )
+    if reused is not None:
+        data, summary, source = reused
+        await run.complete(data, summary, apify_run_id=source.apify_run_id, reused_from=source)
+        logger.info(
+            "Reused Apify run %s (dataset %s) for %s — no new actor run",
+            source.apify_run_id, source.dataset_id, actor_key,
+        )
+        await _cache_media(actor_key, data)
+        return
+
+    await _run_and_persist(
+        client,
+        run,
+        actor_key=actor_key,
+        actor_id=actor_id,
+        timeout=timeout,
+        normalizer=normalizer,
+        handle=_RunHandle(run_input=run_input),
+    )
+
+
+async def resume_target(*, result_id: int) -> None:
+    """Re-attach to the checkpointed Apify run behind ``result_id`` — left
+    behind by a worker that shut down mid-run — and finish it: wait for the
+    run, fetch its dataset, normalise and persist, exactly as ``run_target``
+    would have. Called by ``competitor_analysis.resume`` after claiming the row.
+    """
+    loaded = await asyncio.to_thread(_load_for_resume, result_id)
+    if loaded is None:
+        return
+    run, row, competitor_name = loaded
+
+    settings = get_settings()
+    if not settings.apify_api_token or row.actor_key not in _ACTOR_REGISTRY:
+        await run.fail("Could not resume the interrupted run on this server")
+        return
+
+    actor_id, timeout, _, normalizer = _ACTOR_REGISTRY[row.actor_key]
+    if row.actor_key == ACTOR_FACEBOOK_ADS:
+        normalizer = functools.partial(normalize_facebook_ads, brand_name=competitor_name)
+    normalizer = _with_duplicate_clusters(row.actor_key, normalizer)
+
+    logger.info(
+        "Resuming Apify run %s for result=%s actor=%s (phase=%s)",
+        row.apify_run_id, row.id, row.actor_key, row.run_phase,
+    )
+    await _run_and_persist(
+        ApifyClient(settings.apify_api_token),
+        run,
+        actor_key=row.actor_key,
+        actor_id=actor_id,
+        timeout=timeout,
+        normalizer=normalizer,
+        handle=_RunHandle(run_id=row.apify_run_id),
     )
 
-    _mark_result_running(result_id)
-    _mark_job_running(job_id)
 
+def _load_for_resume(
+    result_id: int,
+) -> tuple[ScrapeRun, CompetitorAnalysisResultModel, str] | None:
+    """The running ``ScrapeRun`` behind a checkpointed result, reopening its
+    ledger row if the previous worker never got to write one."""
+    with transaction() as db:
+        row = CompetitorAnalysisResultRepository(db).get(result_id)
+        if not row or not row.apify_run_id:
+            return None
+        target = CompetitorTargetRepository(db).get_for_competitor(row.competitor_id, row.actor_key)
+        competitor = CompetitorRepository(db).get(row.competitor_id)
+        ledger_repo = ApifyRunRepository(db)
+        ledger = ledger_repo.running_for_result(row.id) or ledger_repo.start_run(
+            brand_id=row.brand_id,
+            competitor_id=row.competitor_id,
+            result_id=row.id,
+            actor_key=row.actor_key,
+        )
+        run = ScrapeRun(
+            job_id=row.job_id,
+            result_id=row.id,
+            target_id=target.id if target else None,
+            ledger_id=ledger.id,
+            state=RESULT_STATUS_RUNNING,
+        )
+        competitor_name = competitor.name if competitor else ""
+        db.expunge(row)
+    return run, row, competitor_name
+
+
+# ── Checkpointed actor runs ───────────────────────────────────────────────────
+
+@dataclass
+class _RunHandle:
+    """The actor run a result is following: ``run_input`` to start a new
+    one, or the ``run_id`` of a started (possibly resumed) one."""
+
+    run_input: dict[str, Any] | None = None
+    run_id: str | None = None
+
+
+async def _run_and_persist(
+    client: ApifyClient,
+    run: ScrapeRun,
+    *,
+    actor_key: str,
+    actor_id: str,
+    timeout: int,
+    normalizer: Callable[[list[dict[str, Any]]], tuple[Any, dict[str, Any]]],
+    handle: _RunHandle,
+) -> None:
     try:
         outcome = await asyncio.wait_for(
-            client.run_actor(actor_id=actor_id, run_input=run_input, timeout_seconds=timeout),
+            _follow_actor_run(client, run, actor_id=actor_id, timeout=timeout, handle=handle),
             timeout=timeout + 60,
         )
     except asyncio.CancelledError:
-        # Worker was cancelled (server shutdown, reload). Mark the row failed
-        # synchronously so the UI shows the failure on next read instead of a
-        # frozen "running" state, then re-raise so asyncio cleanup runs.
-        logger.warning("Actor %s cancelled mid-run (job=%s)", actor_id, job_id)
-        _record_actor_failure(
-            job_id,
-            result_id,
+        if handle.run_id and run.has_resumable_checkpoint():
+            # Server shutdown / reload after the actor run started: the run
+            # keeps going on Apify's side, so leave the row running with its
+            # checkpoint for the next process to re-attach to.
+            logger.warning(
+                "Actor %s interrupted mid-run (job=%s); Apify run %s left for resume",
+                actor_id, run.job_id, handle.run_id,
+            )
+            raise
+        # Cancelled before a run started. Mark the row failed synchronously
+        # so the UI shows the failure on next read instead of a frozen
+        # "running" state, then re-raise so asyncio cleanup runs.
+        logger.warning("Actor %s cancelled mid-run (job=%s)", actor_id, run.job_id)
+        run.interrupt(
             "Run interrupted — the server was stopped or restarted before this scraper finished. Run the scraper again to retry.",
+            "Server shutdown interrupted this scrape.",
         )
-        try:
-            CompetitorAnalysisJobRepository(get_session_local()()).mark_failed(
-                job_id, "Server shutdown interrupted this scrape."
-            )
-        except Exception:  # noqa: BLE001
-            pass
-        _mark_target_run(target_id, cost_usd=None)
         raise
     except asyncio.TimeoutError:
-        _record_actor_failure(job_id, result_id, f"timeout after {timeout + 60}s")
-        await _finalize_ledger(client, ledger_id, run_id=None, success=False)
-        _finalize_job(job_id)
-        _mark_target_run(target_id, cost_usd=None)
+        await run.fail(
+            f"timeout after {timeout + 60}s",
+            apify_run_id=handle.run_id,
+            meta=await _fetch_run_meta(client, handle.run_id),
+        )
         return
     except ApifyActorError as exc:
-        logger.warning("Actor %s failed for job %s: %s", actor_id, job_id, exc)
-        _record_actor_failure(job_id, result_id, str(exc))
-        await _finalize_ledger(client, ledger_id, run_id=exc.run_id, success=False)
-        _mark_target_run(target_id, cost_usd=None)
-        _finalize_job(job_id)
+        logger.warning("Actor %s failed for job %s: %s", actor_id, run.job_id, exc)
+        run_id = exc.run_id or handle.run_id
+        await run.fail(str(exc), apify_run_id=run_id, meta=await _fetch_run_meta(client, run_id))
         return
     except Exception as exc:  # noqa: BLE001
-        logger.exception("Unexpected actor failure: actor=%s job=%s", actor_id, job_id)
-        _record_actor_failure(job_id, result_id, f"unexpected error: {exc}")
-        await _finalize_ledger(client, ledger_id, run_id=None, success=False)
-        _mark_target_run(target_id, cost_usd=None)
-        _finalize_job(job_id)
+        logger.exception("Unexpected actor failure: actor=%s job=%s", actor_id, run.job_id)
+        await run.fail(
+            f"unexpected error: {exc}",
+            apify_run_id=handle.run_id,
+            meta=await _fetch_run_meta(client, handle.run_id),
+        )
         return
 
+    meta = await _fetch_run_meta(client, outcome.run_id)
     try:
         data, summary = normalizer(outcome.items)
     except Exception as exc:  # noqa: BLE001
         logger.exception("Normalizer for %s failed", actor_key)
-        _record_actor_failure(job_id, result_id, f"normalizer error: {exc}")
-        await _finalize_ledger(client, ledger_id, run_id=outcome.run_id, success=False)
-        _mark_target_run(target_id, cost_usd=None)
-        _finalize_job(job_id)
+        await run.fail(f"normalizer error: {exc}", apify_run_id=outcome.run_id, meta=meta)
         return
+    await run.checkpoint(RUN_PHASE_NORMALISED)
 
-    _record_actor_success(job_id, result_id, data, summary, apify_run_id=outcome.run_id)
-    cost_usd = await _finalize_ledger(client, ledger_id, run_id=outcome.run_id, success=True)
-    _mark_target_run(target_id, cost_usd=cost_usd)
-    _finalize_job(job_id)
-
-
-# ── DB helpers ────────────────────────────────────────────────────────────────
-
-def _mark_result_running(result_id: int) -> None:
-    db = get_session_local()()
-    try:
-        CompetitorAnalysisResultRepository(db).mark_running(result_id)
-    finally:
-        db.close()
+    await run.complete(data, summary, apify_run_id=outcome.run_id, meta=meta)
+    await _cache_media(actor_key, data)
 
 
-def _mark_job_running(job_id: int) -> None:
-    db = get_session_local()()
-    try:
-        CompetitorAnalysisJobRepository(db).mark_running(job_id)
-    finally:
-        db.close()
+async def _follow_actor_run(
+    client: ApifyClient,
+    run: ScrapeRun,
+    *,
+    actor_id: str,
+    timeout: int,
+    handle: _RunHandle,
+) -> RunOutcome:
+    """Start the actor run (unless ``handle`` already names one), wait for
+    it and fetch its dataset, checkpointing each phase on the result row."""
+    if handle.run_id is None:
+        handle.run_id, _ = await client.start_actor(
+            actor_id, handle.run_input or {}, timeout_seconds=timeout,
+        )
+        await run.checkpoint(RUN_PHASE_STARTED, apify_run_id=handle.run_id)
 
+    meta = await client.wait_for_run(actor_id, handle.run_id, on_poll=run.checkpoint)
+    if meta.status != RUN_STATUS_SUCCEEDED or not meta.dataset_id:
+        raise ApifyActorError(
+            actor_id, f"run finished with status {meta.status}",
+            run_id=handle.run_id, dataset_id=meta.dataset_id,
+        )
+    await run.checkpoint(RUN_PHASE_DATASET_READY, dataset_id=meta.dataset_id)
 
-def _finalize_job(job_id: int) -> None:
-    db = get_session_local()()
     try:
-        CompetitorAnalysisJobRepository(db).finalize(job_id)
-    finally:
-        db.close()
+        items = await client.fetch_dataset_items(meta.dataset_id)
+    except ApifyActorError as exc:
+        exc.run_id = exc.run_id or handle.run_id
+        exc.dataset_id = exc.dataset_id or meta.dataset_id
+        raise
+    return RunOutcome(items=items, run_id=handle.run_id, dataset_id=meta.dataset_id)
 
 
-def _record_actor_success(
-    job_id: int,
-    result_id: int,
-    data: Any,
-    summary: dict[str, Any],
-    *,
-    apify_run_id: str | None,
-) -> None:
-    db = get_session_local()()
-    try:
-        repo = CompetitorAnalysisResultRepository(db)
-        if apify_run_id:
-            row = repo.get(result_id)
-            if row:
-                row.apify_run_id = apify_run_id
-                db.commit()
-        repo.mark_completed(result_id, data, summary)
-        CompetitorAnalysisJobRepository(db).increment_done(job_id)
-    finally:
-        db.close()
-
-
-def _record_actor_failure(job_id: int, result_id: int, error: str) -> None:
-    db = get_session_local()()
+async def _fetch_run_meta(client: ApifyClient, run_id: str | None) -> RunMeta | None:
+    """Best-effort cost stats for the ledger."""
+    if not run_id:
+        return None
     try:
-        CompetitorAnalysisResultRepository(db).mark_failed(result_id, error)
-        CompetitorAnalysisJobRepository(db).increment_failed(job_id)
-    finally:
-        db.close()
+        return await client.fetch_run_meta(run_id)
+    except Exception:  # noqa: BLE001
+        logger.exception("fetch_run_meta crashed; skipping cost capture")
+        return None
 
 
-def _start_ledger(
+def _with_duplicate_clusters(
+    actor_key: str,
+    normalizer: Callable[[list[dict[str, Any]]], tuple[Any, dict[str, Any]]],
+) -> Callable[[list[dict[str, Any]]], tuple[Any, dict[str, Any]]]:
+    """Wrap ``normalizer`` so its rows come back tagged with near-duplicate
+    clusters and the summary gains ``unique_total`` (distinct clusters)."""
+    text_key = DEDUP_TEXT_KEY.get(actor_key)
+    if text_key is None:
+        return normalizer
+
+    def normalize(items: list[dict[str, Any]]) -> tuple[Any, dict[str, Any]]:
+        data, summary = normalizer(items)
+        rows, _ = split_items(actor_key, data)
+        annotate_duplicates(rows, text_key)
+        summary["unique_total"] = len({row["cluster_id"] for row in rows})
+        return data, summary
+    return normalize
+
+
+# ── Cross-brand reuse ─────────────────────────────────────────────────────────
+
+async def _try_reuse(
+    client: ApifyClient,
     *,
-    brand_id: int,
-    competitor_id: int,
-    result_id: int,
+    ledger_id: int | None,
     actor_key: str,
-) -> int:
-    db = get_session_local()()
-    try:
-        run = ApifyRunRepository(db).start_run(
-            brand_id=brand_id,
-            competitor_id=competitor_id,
-            result_id=result_id,
-            actor_key=actor_key,
-        )
-        return run.id
-    finally:
-        db.close()
+    run_hash: str,
+    normalizer: Callable[[list[dict[str, Any]]], tuple[Any, dict[str, Any]]],
+) -> tuple[Any, dict[str, Any], ApifyRunModel] | None:
+    """Serve this run from a fresh identical run, if one exists.
+
+    Returns ``(data, summary, source ledger row)`` — the caller closes its own
+    ledger row against ``source`` at zero cost — or ``None`` when nothing
+    reusable exists (or reading it failed) and the caller should start a real
+    actor run.
+    """
+    settings = get_settings()
+    window = settings.apify_reuse_window_minutes
+    if window <= 0:
+        return None
 
+    found = await asyncio.to_thread(
+        _find_reusable,
+        ledger_id=ledger_id,
+        actor_key=actor_key,
+        run_hash=run_hash,
+        finished_after=datetime.utcnow() - timedelta(minutes=window),
+        copy_normalized=(
+            settings.apify_reuse_copy_normalized and actor_key not in _BRAND_DEPENDENT_ACTORS
+        ),
+    )
+    if found is None:
+        return None
+    source, copied = found
 
-async def _finalize_ledger(
-    client: ApifyClient,
-    ledger_id: int,
-    *,
-    run_id: str | None,
-    success: bool,
-) -> float | None:
-    """Best-effort: fetch run meta and write the cost row. Returns cost USD."""
-    meta = None
-    if run_id:
+    if copied is None:
         try:
-            meta = await client.fetch_run_meta(run_id)
-        except Exception:  # noqa: BLE001
-            logger.exception("fetch_run_meta crashed; skipping cost capture")
-
-    db = get_session_local()()
-    try:
-        repo = ApifyRunRepository(db)
-        if success:
-            repo.finalize_success(
-                ledger_id,
-                apify_run_id=meta.run_id if meta else run_id,
-                compute_units=meta.compute_units if meta else None,
-                usage_total_usd=meta.usage_total_usd if meta else None,
-                dataset_id=meta.dataset_id if meta else None,
+            items = await client.fetch_dataset_items(source.dataset_id)
+            copied = normalizer(items)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning(
+                "Reuse of run %s failed for %s; starting a fresh run: %s",
+                source.id, actor_key, exc,
             )
-        else:
-            repo.finalize_failure(
-                ledger_id,
-                apify_run_id=meta.run_id if meta else run_id,
-                compute_units=meta.compute_units if meta else None,
-                usage_total_usd=meta.usage_total_usd if meta else None,
-            )
-    finally:
-        db.close()
+            return None
 
-    return meta.usage_total_usd if meta else None
+    data, summary = copied
+    return data, summary, source
 
 
-def _mark_target_run(target_id: int, cost_usd: float | None) -> None:
-    db = get_session_local()()
+def _find_reusable(
+    *,
+    ledger_id: int | None,
+    actor_key: str,
+    run_hash: str,
+    finished_after: datetime,
+    copy_normalized: bool,
+) -> tuple[ApifyRunModel, tuple[Any, dict[str, Any]] | None] | None:
+    """The reusable source run, plus its stored normalised payload when that
+    can be copied as-is."""
+    with transaction() as db:
+        source = ApifyRunRepository(db).find_reusable(
+            actor_key=actor_key,
+            input_hash=run_hash,
+            finished_after=finished_after,
+            exclude_pk=ledger_id,
+        )
+        if not source:
+            return None
+        db.expunge(source)
+
+        copied = None
+        if copy_normalized and source.result_id:
+            res_repo = CompetitorAnalysisResultRepository(db)
+            row = res_repo.get(source.result_id)
+            if row and row.status == RESULT_STATUS_COMPLETED:
+                source_data = load_data(res_repo, row)
+                if source_data is not None:
+                    copied = (source_data, row.summary or {})
+    return source, copied
+
+
+# ── Post-run ──────────────────────────────────────────────────────────────────
+
+async def _cache_media(actor_key: str, data: Any) -> None:
+    """Copy the result's thumbnails into the media cache once the run is
+    already visible as completed. Best-effort."""
+    if not get_settings().competitor_media_cache_enabled:
+        return
     try:
-        CompetitorTargetRepository(db).mark_run(target_id, cost_usd)
-    finally:
-        db.close()
+        await cache_result_media(actor_key, data)
+    except Exception:  # noqa: BLE001
+        logger.exception("Media caching failed for %s", actor_key)
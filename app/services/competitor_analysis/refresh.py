@@ -0,0 +1,138 @@
+"""Recurring competitor refresh loop.
+
+Runs as an in-process ``asyncio.Task`` next to the publisher loops (launched
+from ``main.py`` startup). Targets opt in with ``refresh_interval_hours``; each
+tick the loop:
+
+1. Reads how many scrapes are pending/running overall and per organization —
+   manual runs included, straight from the DB so the caps hold across uvicorn
+   workers.
+2. Picks due targets stalest-first and starts runs while the global and
+   per-org caps have room. Targets over the cap stay due for the next tick.
+3. Skips (and pushes back one interval) targets whose brand is over its
+   monthly compute budget per ``check_budget``.
+
+Claims are a conditional update of ``next_refresh_at`` so two workers never
+start the same target. Jitter on every next run keeps targets configured at the
+same time from coming due together.
+"""
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any
+
+from app.config import get_settings
+from app.database import get_session_local
+from app.repositories.competitor import CompetitorRepository
+from app.repositories.competitor_analysis_job import CompetitorAnalysisJobRepository
+from app.repositories.competitor_analysis_result import CompetitorAnalysisResultRepository
+from app.repositories.competitor_target import CompetitorTargetRepository
+from app.services.budget import check_budget
+from app.services.competitor_analysis.orchestrator import run_target
+
+
+logger = logging.getLogger(__name__)
+
+
+# How many due targets to consider per tick. Larger than any sane global cap so
+# targets skipped for per-org caps don't starve other organizations.
+CANDIDATE_BATCH = 50
+
+# Strong references to running refresh tasks — asyncio only keeps weak ones.
+_in_flight: set[asyncio.Task] = set()
+
+
+async def refresh_due_targets_loop() -> None:
+    """Forever-loop that starts scheduled competitor refreshes."""
+    settings = get_settings()
+    logger.info(
+        "Competitor refresh loop starting (poll=%ds, max=%d, per_org=%d)",
+        settings.competitor_refresh_poll_seconds,
+        settings.competitor_refresh_max_concurrency,
+        settings.competitor_refresh_max_per_org,
+    )
+    while True:
+        try:
+            for run_kwargs in _claim_due_refreshes(datetime.utcnow()):
+                task = asyncio.create_task(run_target(**run_kwargs))
+                _in_flight.add(task)
+                task.add_done_callback(_in_flight.discard)
+        except Exception:  # noqa: BLE001
+            logger.exception("Competitor refresh iteration crashed; continuing")
+        await asyncio.sleep(settings.competitor_refresh_poll_seconds)
+
+
+def _claim_due_refreshes(now: datetime) -> list[dict[str, Any]]:
+    """Claim as many due targets as the caps allow and create their pending
+    job/result rows. Returns ``run_target`` kwargs for each claimed target."""
+    settings = get_settings()
+    db = get_session_local()()
+    try:
+        target_repo = CompetitorTargetRepository(db)
+        job_repo = CompetitorAnalysisJobRepository(db)
+        res_repo = CompetitorAnalysisResultRepository(db)
+        comp_repo = CompetitorRepository(db)
+
+        active_total, active_by_org = res_repo.active_counts_by_org()
+        slots = settings.competitor_refresh_max_concurrency - active_total
+        if slots <= 0:
+            return []
+
+        blocked_brands: dict[int, bool] = {}
+        runs: list[dict[str, Any]] = []
+        for target, org_id in target_repo.due_for_refresh(now, CANDIDATE_BATCH):
+            if len(runs) >= slots:
+                break
+            if org_id is not None and (
+                active_by_org.get(org_id, 0) >= settings.competitor_refresh_max_per_org
+            ):
+                continue
+            if res_repo.has_active_for_actor(target.competitor_id, target.actor_key):
+                continue  # completion reschedules it via mark_run
+
+            if target.brand_id not in blocked_brands:
+                blocked_brands[target.brand_id] = check_budget(target.brand_id, org_id).will_block
+            if blocked_brands[target.brand_id] or not target.target_value.strip():
+                if target_repo.advance_refresh(target, now):
+                    logger.info(
+                        "Skipping scheduled refresh target=%s brand=%s (%s)",
+                        target.id, target.brand_id,
+                        "over budget" if blocked_brands[target.brand_id] else "empty target",
+                    )
+                continue
+
+            competitor = comp_repo.get(target.competitor_id)
+            if not competitor or not target_repo.advance_refresh(target, now):
+                continue
+
+            job = job_repo.create_pending(
+                brand_id=target.brand_id,
+                competitor_id=target.competitor_id,
+                actors_total=1,
+            )
+            result = res_repo.create_pending(
+                job_id=job.id,
+                competitor_id=target.competitor_id,
+                brand_id=target.brand_id,
+                actor_key=target.actor_key,
+            )
+            if org_id is not None:
+                active_by_org[org_id] = active_by_org.get(org_id, 0) + 1
+            runs.append({
+                "job_id": job.id,
+                "result_id": result.id,
+                "target_id": target.id,
+                "competitor_id": target.competitor_id,
+                "brand_id": target.brand_id,
+                "actor_key": target.actor_key,
+                "target_value": target.target_value,
+                "target_type": target.target_type,
+                "competitor_name": competitor.name,
+            })
+            logger.info(
+                "Scheduled refresh actor=%s competitor=%s brand=%s job=%s",
+                target.actor_key, target.competitor_id, target.brand_id, job.id,
+            )
+        return runs
+    finally:
+        db.close()
@@ -0,0 +1,61 @@
+"""Resume Apify runs interrupted by a worker restart.
+
+``run_target`` starts actor runs asynchronously and checkpoints the run id /
+dataset id on the result row, heartbeating ``checkpointed_at`` while it waits.
+The run itself keeps going on Apify's side when the worker dies, so instead of
+failing the scrape (and paying for it twice) this loop — an in-process
+``asyncio.Task`` like the refresh loop — finds running rows whose heartbeat
+stopped, claims them with a conditional update so only one worker re-attaches,
+and hands them to ``orchestrator.resume_target``.
+
+Checkpoints older than ``RESUME_GIVE_UP_AFTER`` are left to the stuck-result
+reaper.
+"""
+import asyncio
+import logging
+from datetime import datetime
+
+from app.database import get_session_local
+from app.repositories.competitor_analysis_result import CompetitorAnalysisResultRepository
+from app.services.competitor_analysis.orchestrator import resume_target
+
+
+logger = logging.getLogger(__name__)
+
+
+POLL_SECONDS = 60
+CANDIDATE_BATCH = 20
+
+# Strong references to running resume tasks — asyncio only keeps weak ones.
+_in_flight: set[asyncio.Task] = set()
+
+
+async def resume_interrupted_runs_loop() -> None:
+    """Forever-loop that re-attaches to orphaned checkpointed runs."""
+    logger.info("Competitor run resume loop starting (poll=%ds)", POLL_SECONDS)
+    while True:
+        try:
+            for result_id in _claim_orphaned_runs(datetime.utcnow()):
+                task = asyncio.create_task(resume_target(result_id=result_id))
+                _in_flight.add(task)
+                task.add_done_callback(_in_flight.discard)
+        except Exception:  # noqa: BLE001
+            logger.exception("Competitor run resume iteration crashed; continuing")
+        await asyncio.sleep(POLL_SECONDS)
+
+
+def _claim_orphaned_runs(now: datetime) -> list[int]:
+    db = get_session_local()()
+    try:
+        repo = CompetitorAnalysisResultRepository(db)
+        claimed: list[int] = []
+        for row in repo.orphaned_checkpoints(now, CANDIDATE_BATCH):
+            if repo.claim_checkpoint(row, now):
+                logger.info(
+                    "Claimed interrupted Apify run %s (result=%s phase=%s)",
+                    row.apify_run_id, row.id, row.run_phase,
+                )
+                claimed.append(row.id)
+        return claimed
+    finally:
+        db.close()
@@ -0,0 +1,301 @@
+"""Unit of work for one scrape's state transitions.
+
+A scrape touches five tables as it moves through its lifecycle — the result
+row, its job, the Apify cost ledger, the target and the trend metrics. Rather
+than one session and commit per write, ``ScrapeRun`` groups the writes of each
+transition into a single transaction on a single connection and runs it in a
+worker thread, so the event loop never blocks on Postgres and a burst of
+finishing scrapes doesn't churn the pool.
+
+The transitions are explicit::
+
+    pending ──start──▶ running ──complete──▶ completed
+       │                  │  ▲
+       │                  │  └─checkpoint (actor run progress / heartbeat)
+       └──reject──▶ failed ◀──fail / interrupt──┘
+
+Repositories commit as usual; inside a transition their commits only release
+a savepoint and the outer transaction commits once at the end, so a transition
+is all-or-nothing. Each transition (and each checkpoint that changes the run
+phase) also publishes a progress event in the same transaction — see
+``competitor_analysis.events``.
+"""
+import asyncio
+import logging
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, TypeVar
+
+from sqlalchemy.orm import Session
+
+from app.database import get_engine
+from app.models.apify_run import ApifyRunModel
+from app.models.competitor_analysis_result import (
+    RESULT_STATUS_COMPLETED,
+    RESULT_STATUS_FAILED,
+    RESULT_STATUS_PENDING,
+    RESULT_STATUS_RUNNING,
+    CompetitorAnalysisResultModel,
+)
+from app.repositories.apify_run import ApifyRunRepository
+from app.repositories.competitor_analysis_job import CompetitorAnalysisJobRepository
+from app.repositories.competitor_analysis_result import CompetitorAnalysisResultRepository
+from app.repositories.competitor_metric import CompetitorMetricRepository
+from app.repositories.competitor_target import CompetitorTargetRepository
+from app.services.competitor_analysis.apify_client import RunMeta
+from app.services.competitor_analysis.deltas import plan_storage
+from app.services.competitor_analysis.events import notify
+from app.services.competitor_analysis.metrics import metric_points
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_TRANSITIONS: dict[str, frozenset[str]] = {
+    RESULT_STATUS_PENDING: frozenset({RESULT_STATUS_RUNNING, RESULT_STATUS_FAILED}),
+    RESULT_STATUS_RUNNING: frozenset({RESULT_STATUS_RUNNING, RESULT_STATUS_COMPLETED, RESULT_STATUS_FAILED}),
+    RESULT_STATUS_COMPLETED: frozenset(),
+    RESULT_STATUS_FAILED: frozenset(),
+}
+
+
+class InvalidTransition(RuntimeError):
+    """A scrape was moved to a state its current state can't reach."""
+
+
+@contextmanager
+def transaction() -> Iterator[Session]:
+    """One connection, one transaction. Repository ``commit()`` calls inside
+    become savepoint releases; everything commits (or rolls back) together.
+
+    Statements issued after the last repository commit — typically the
+    transition's ``notify`` — sit in a fresh savepoint, which ``close()``
+    would roll back; the session is committed first so they are kept."""
+    with get_engine().connect() as connection:
+        outer = connection.begin()
+        db = Session(bind=connection, join_transaction_mode="create_savepoint")
+        try:
+            yield db
+            db.commit()
+            db.close()
+            outer.commit()
+        except BaseException:
+            db.close()
+            outer.rollback()
+            raise
+
+
+async def _in_thread(fn: Callable[[Session], T]) -> T:
+    def run() -> T:
+        with transaction() as db:
+            return fn(db)
+
+    return await asyncio.to_thread(run)
+
+
+class ScrapeRun:
+    """The lifecycle of one result row (one actor run) and everything its
+    transitions write alongside it."""
+
+    def __init__(
+        self,
+        *,
+        job_id: int,
+        result_id: int,
+        target_id: int | None = None,
+        ledger_id: int | None = None,
+        state: str = RESULT_STATUS_PENDING,
+    ):
+        self.job_id = job_id
+        self.result_id = result_id
+        self.target_id = target_id
+        self.ledger_id = ledger_id
+        self.state = state
+
+    def _advance(self, state: str) -> None:
+        if state not in _TRANSITIONS[self.state]:
+            raise InvalidTransition(f"result {self.result_id}: {self.state} → {state}")
+        self.state = state
+
+    # ── Transitions ───────────────────────────────────────────────────────
+
+    async def start(
+        self,
+        *,
+        brand_id: int,
+        competitor_id: int,
+        actor_key: str,
+        input_hash: str | None,
+    ) -> None:
+        """pending → running: open the cost-ledger row (so a failed run is
+        still costed) and mark the result and job running."""
+        self._advance(RESULT_STATUS_RUNNING)
+
+        def write(db: Session) -> int:
+            ledger = ApifyRunRepository(db).start_run(
+                brand_id=brand_id,
+                competitor_id=competitor_id,
+                result_id=self.result_id,
+                actor_key=actor_key,
+                input_hash=input_hash,
+            )
+            CompetitorAnalysisResultRepository(db).mark_running(self.result_id)
+            CompetitorAnalysisJobRepository(db).mark_running(self.job_id)
+            self._notify(db)
+            return ledger.id
+
+        self.ledger_id = await _in_thread(write)
+
+    async def checkpoint(
+        self,
+        phase: str | None = None,
+        *,
+        apify_run_id: str | None = None,
+        dataset_id: str | None = None,
+    ) -> None:
+        """running → running: record actor-run progress, or just heartbeat."""
+        self._advance(RESULT_STATUS_RUNNING)
+
+        def write(db: Session) -> None:
+            CompetitorAnalysisResultRepository(db).checkpoint(
+                self.result_id, phase, apify_run_id=apify_run_id, dataset_id=dataset_id,
+            )
+            if self.ledger_id is not None and apify_run_id:
+                ApifyRunRepository(db).attach_run(self.ledger_id, apify_run_id)
+            if phase:
+                self._notify(db, phase)
+
+        await _in_thread(write)
+
+    async def complete(
+        self,
+        data: Any,
+        summary: dict[str, Any],
+        *,
+        apify_run_id: str | None,
+        meta: RunMeta | None = None,
+        reused_from: ApifyRunModel | None = None,
+    ) -> None:
+        """running → completed: store the payload, trend points and cost,
+        reschedule the target and settle the job."""
+        self._advance(RESULT_STATUS_COMPLETED)
+
+        def write(db: Session) -> None:
+            repo = CompetitorAnalysisResultRepository(db)
+            row = repo.get(self.result_id)
+            storage = {}
+            if row:
+                if apify_run_id:
+                    row.apify_run_id = apify_run_id
+                    db.commit()
+                storage = plan_storage(repo, row, data)
+            repo.mark_completed(self.result_id, data, summary, **storage)
+            job_repo = CompetitorAnalysisJobRepository(db)
+            job_repo.increment_done(self.job_id)
+            if row:
+                _record_metric_points(db, row, summary)
+
+            if reused_from is not None:
+                cost_usd: float | None = 0.0
+                if self.ledger_id is not None:
+                    ApifyRunRepository(db).finalize_reused(self.ledger_id, reused_from)
+            else:
+                cost_usd = meta.usage_total_usd if meta else None
+                if self.ledger_id is not None:
+                    ApifyRunRepository(db).finalize_success(
+                        self.ledger_id,
+                        apify_run_id=meta.run_id if meta else apify_run_id,
+                        compute_units=meta.compute_units if meta else None,
+                        usage_total_usd=cost_usd,
+                        dataset_id=meta.dataset_id if meta else None,
+                    )
+            if self.target_id:
+                CompetitorTargetRepository(db).mark_run(self.target_id, cost_usd)
+            job_repo.finalize(self.job_id)
+            self._notify(db)
+
+        await _in_thread(write)
+
+    async def fail(
+        self,
+        error: str,
+        *,
+        apify_run_id: str | None = None,
+        meta: RunMeta | None = None,
+    ) -> None:
+        """running → failed: record the error and whatever the run cost."""
+        self._advance(RESULT_STATUS_FAILED)
+
+        def write(db: Session) -> None:
+            self._write_failure(db, error)
+            if self.ledger_id is not None:
+                ApifyRunRepository(db).finalize_failure(
+                    self.ledger_id,
+                    apify_run_id=meta.run_id if meta else apify_run_id,
+                    compute_units=meta.compute_units if meta else None,
+                    usage_total_usd=meta.usage_total_usd if meta else None,
+                )
+            if self.target_id:
+                CompetitorTargetRepository(db).mark_run(self.target_id, None)
+            CompetitorAnalysisJobRepository(db).finalize(self.job_id)
+            self._notify(db)
+
+        await _in_thread(write)
+
+    async def reject(self, error: str) -> None:
+        """pending → failed: the run never started (no token, bad target)."""
+        self._advance(RESULT_STATUS_FAILED)
+
+        def write(db: Session) -> None:
+            self._write_failure(db, error)
+            CompetitorAnalysisJobRepository(db).finalize(self.job_id)
+            self._notify(db)
+
+        await _in_thread(write)
+
+    def interrupt(self, error: str, job_error: str) -> None:
+        """running → failed on cancellation. Synchronous on purpose: the task
+        is being torn down and may not get to await another thread."""
+        self._advance(RESULT_STATUS_FAILED)
+        try:
+            with transaction() as db:
+                self._write_failure(db, error)
+                CompetitorAnalysisJobRepository(db).mark_failed(self.job_id, job_error)
+                if self.target_id:
+                    CompetitorTargetRepository(db).mark_run(self.target_id, None)
+                self._notify(db)
+        except Exception:  # noqa: BLE001
+            logger.exception("Recording interruption failed for result %s", self.result_id)
+
+    # ── Reads ─────────────────────────────────────────────────────────────
+
+    def has_resumable_checkpoint(self) -> bool:
+        """Whether another worker can re-attach to this run's Apify run.
+        Synchronous — only consulted while the task is being cancelled."""
+        with transaction() as db:
+            return CompetitorAnalysisResultRepository(db).has_resumable_checkpoint(self.result_id)
+
+    def _notify(self, db: Session, phase: str | None = None) -> None:
+        notify(db, job_id=self.job_id, result_id=self.result_id, status=self.state, phase=phase)
+
+    def _write_failure(self, db: Session, error: str) -> None:
+        CompetitorAnalysisResultRepository(db).mark_failed(self.result_id, error)
+        CompetitorAnalysisJobRepository(db).increment_failed(self.job_id)
+
+
+def _record_metric_points(
+    db: Session,
+    row: CompetitorAnalysisResultModel,
+    summary: dict[str, Any],
+) -> None:
+    """Best-effort: a failed trend write must not fail the completed result."""
+    points = metric_points(row.actor_key, summary)
+    if not points:
+        return
+    try:
+        CompetitorMetricRepository(db).record(row, points, row.finished_at or datetime.utcnow())
+    except Exception:  # noqa: BLE001
+        db.rollback()
+        logger.exception("Recording trend metrics failed for result %s", row.id)
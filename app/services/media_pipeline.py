@@ -0,0 +1,468 @@
+"""Background media pipeline — dimensions, previews and platform renditions.
+
+After an upload, ``enqueue`` hands the asset to ``media_pipeline_loop`` (an
+in-process ``asyncio.Task`` like the publisher loops), which:
+
+- images: decodes the bytes with Pillow in a process pool — never on the event
+  loop — records ``width``/``height`` and stores a WebP ``thumb`` and
+  ``preview`` plus JPEG re-encodes sized for Facebook and Instagram (kept only
+  when smaller than the original, so the publisher never uploads more bytes);
+- videos: spools the file to a temp file chunk by chunk and asks the
+  ``VideoProbe`` (ffprobe/ffmpeg when installed; pluggable via
+  ``set_video_probe``) for dimensions, duration and a poster frame, which is
+  rendered into ``thumb``/``preview`` like an image.
+
+Renditions are keyed by the source SHA-256, so assets sharing a blob are
+processed once. Assets missed by the queue (restart, another worker's upload)
+are picked up by a periodic sweep of rows with no ``processed_at``. Every
+asset is claimed (``processing_started_at``, ``FOR UPDATE SKIP LOCKED``)
+before it is processed, so each is decoded by one worker only; a claim older
+than ``CLAIM_TIMEOUT`` — its worker died — is up for grabs again.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import io
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+import subprocess
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Protocol
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import defer
+
+from app.config import get_settings
+from app.database import get_session_local
+from app.models.media_asset import KIND_IMAGE, KIND_VIDEO, MediaAssetModel, MediaRenditionModel
+from app.services import storage
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+RENDITION_THUMB = "thumb"
+RENDITION_PREVIEW = "preview"
+PREVIEW_VARIANTS = (RENDITION_THUMB, RENDITION_PREVIEW)
+
+SWEEP_SECONDS = 5 * 60
+SWEEP_BATCH = 20
+# Fresh uploads are left to the queue of the worker that received them.
+SWEEP_MIN_AGE = timedelta(minutes=2)
+CLAIM_TIMEOUT = timedelta(minutes=30)
+PROBE_TIMEOUT_SECONDS = 60
+
+
+@dataclass(frozen=True)
+class RenditionSpec:
+    variant: str
+    format: str          # Pillow format name
+    max_side: int
+    quality: int
+    # Platform re-encodes are only worth keeping when smaller than the source.
+    only_if_smaller: bool = False
+
+
+IMAGE_RENDITIONS: tuple[RenditionSpec, ...] = (
+    RenditionSpec(RENDITION_THUMB, "WEBP", 320, 75),
+    RenditionSpec(RENDITION_PREVIEW, "WEBP", 1280, 80),
+    # Facebook recompresses anything larger; Instagram serves at most 1440 wide.
+    RenditionSpec("facebook", "JPEG", 2048, 85, only_if_smaller=True),
+    RenditionSpec("instagram", "JPEG", 1440, 85, only_if_smaller=True),
+)
+POSTER_RENDITIONS = tuple(spec for spec in IMAGE_RENDITIONS if spec.variant in PREVIEW_VARIANTS)
+
+_MIMES = {"WEBP": "image/webp", "JPEG": "image/jpeg"}
+
+
+@dataclass
+class Rendition:
+    variant: str
+    mime: str
+    width: int
+    height: int
+    data: bytes
+
+
+@dataclass
+class ImageResult:
+    width: int
+    height: int
+    renditions: list[Rendition]
+
+
+def render_image(content: bytes, specs: tuple[RenditionSpec, ...]) -> ImageResult:
+    """Decode ``content`` and produce ``specs``. Runs in the process pool."""
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(content)) as opened:
+        animated = getattr(opened, "is_animated", False)
+        image = ImageOps.exif_transpose(opened)
+        image.load()
+    width, height = image.size
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "A" in image.getbands() or "transparency" in image.info else "RGB")
+
+    renditions = []
+    for spec in specs:
+        if spec.only_if_smaller and animated:
+            continue  # a re-encode would drop the animation
+        frame = image.copy()
+        frame.thumbnail((spec.max_side, spec.max_side), Image.Resampling.LANCZOS)
+        if spec.format == "JPEG" and frame.mode == "RGBA":
+            flat = Image.new("RGB", frame.size, (255, 255, 255))
+            flat.paste(frame, mask=frame.getchannel("A"))
+            frame = flat
+        out = io.BytesIO()
+        frame.save(out, format=spec.format, quality=spec.quality, optimize=True)
+        data = out.getvalue()
+        if spec.only_if_smaller and len(data) >= len(content):
+            continue
+        renditions.append(Rendition(spec.variant, _MIMES[spec.format], frame.width, frame.height, data))
+    return ImageResult(width, height, renditions)
+
+
+# ── Video probing ───────────────────────────────────────────────────────────
+
+@dataclass
+class VideoInfo:
+    width: int | None
+    height: int | None
+    duration_seconds: int | None
+
+
+class VideoProbe(Protocol):
+    def probe(self, path: str) -> VideoInfo: ...
+    def poster(self, path: str) -> bytes | None: ...
+
+
+class FfmpegProbe:
+    """ffprobe for metadata, ffmpeg for a poster frame one second in."""
+
+    def __init__(self, ffprobe: str, ffmpeg: str | None):
+        self.ffprobe = ffprobe
+        self.ffmpeg = ffmpeg
+
+    def probe(self, path: str) -> VideoInfo:
+        out = subprocess.run(
+            [
+                self.ffprobe, "-v", "error", "-select_streams", "v:0",
+                "-show_entries", "stream=width,height:format=duration",
+                "-of", "json", path,
+            ],
+            capture_output=True, check=True, timeout=PROBE_TIMEOUT_SECONDS,
+        ).stdout
+        info = json.loads(out or b"{}")
+        stream = (info.get("streams") or [{}])[0]
+        duration = (info.get("format") or {}).get("duration")
+        return VideoInfo(
+            width=stream.get("width"),
+            height=stream.get("height"),
+            duration_seconds=round(float(duration)) if duration else None,
+        )
+
+    def poster(self, path: str) -> bytes | None:
+        if not self.ffmpeg:
+            return None
+        frame = subprocess.run(
+            [
+                self.ffmpeg, "-v", "error", "-ss", "1", "-i", path,
+                "-frames:v", "1", "-f", "image2", "-c:v", "mjpeg", "pipe:1",
+            ],
+            capture_output=True, timeout=PROBE_TIMEOUT_SECONDS,
+        ).stdout
+        return frame or None
+
+
+def _default_video_probe() -> VideoProbe | None:
+    ffprobe = shutil.which("ffprobe")
+    return FfmpegProbe(ffprobe, shutil.which("ffmpeg")) if ffprobe else None
+
+
+_video_probe: VideoProbe | None = _default_video_probe()
+
+
+def set_video_probe(probe: VideoProbe | None) -> None:
+    global _video_probe
+    _video_probe = probe
+
+
+# ── Pipeline ────────────────────────────────────────────────────────────────
+
+_pool: ProcessPoolExecutor | None = None
+_queue: asyncio.Queue[int] | None = None
+# Ids the sweep already claimed, waiting in ``_queue``.
+_swept: set[int] = set()
+
+
+def _process_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn, not fork: children must not inherit the parent's DB connections.
+        _pool = ProcessPoolExecutor(
+            max_workers=max(1, settings.media_pipeline_workers),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+async def render(content: bytes, specs: tuple[RenditionSpec, ...]) -> ImageResult:
+    """``render_image`` in the process pool, off the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_process_pool(), render_image, content, specs)
+
+
+def enqueue(asset_id: int) -> None:
+    """Queue a freshly stored asset. A no-op when the loop isn't running —
+    the sweep catches it later."""
+    if _queue is not None:
+        _queue.put_nowait(asset_id)
+
+
+async def media_pipeline_loop() -> None:
+    """Forever-loop: process queued assets with ``media_pipeline_workers``
+    consumers, and sweep for unprocessed ones every ``SWEEP_SECONDS``."""
+    global _queue
+    _queue = asyncio.Queue()
+    logger.info("Media pipeline starting (workers=%d)", settings.media_pipeline_workers)
+    consumers = [
+        asyncio.create_task(_consume(_queue)) for _ in range(max(1, settings.media_pipeline_workers))
+    ]
+    try:
+        while True:
+            try:
+                # Claim no more than the queue can take on, so claimed ids
+                # don't wait out their claim here.
+                room = SWEEP_BATCH - _queue.qsize()
+                if room > 0:
+                    for asset_id in await asyncio.to_thread(_claim_assets, room):
+                        _swept.add(asset_id)
+                        _queue.put_nowait(asset_id)
+            except Exception:  # noqa: BLE001
+                logger.exception("Media pipeline sweep crashed; continuing")
+            await asyncio.sleep(SWEEP_SECONDS)
+    finally:
+        for task in consumers:
+            task.cancel()
+
+
+async def _consume(queue: asyncio.Queue[int]) -> None:
+    while True:
+        asset_id = await queue.get()
+        try:
+            if await _claim_queued(asset_id):
+                await process_asset(asset_id)
+        except Exception:  # noqa: BLE001
+            logger.exception("Media pipeline failed for asset %d", asset_id)
+            await asyncio.to_thread(_mark_processed, asset_id)
+        finally:
+            queue.task_done()
+
+
+async def _claim_queued(asset_id: int) -> bool:
+    """Whether this worker may process a dequeued asset: swept ids are
+    claimed already, uploads queued by ``enqueue`` are claimed now."""
+    if asset_id in _swept:
+        _swept.discard(asset_id)
+        return True
+    try:
+        return bool(await asyncio.to_thread(_claim_assets, 1, asset_id))
+    except Exception:  # noqa: BLE001
+        logger.exception("Claiming asset %d failed; left to the sweep", asset_id)
+        return False
+
+
+def _claim_assets(limit: int, asset_id: int | None = None) -> list[int]:
+    """Claim up to ``limit`` unprocessed assets not claimed by another worker
+    (``asset_id``: just that one; otherwise ones old enough to have missed
+    their upload's queue). Returns the claimed ids."""
+    now = datetime.utcnow()
+    candidates = (
+        select(MediaAssetModel.id)
+        .where(
+            MediaAssetModel.processed_at.is_(None),
+            MediaAssetModel.deleted_at.is_(None),
+            or_(
+                MediaAssetModel.processing_started_at.is_(None),
+                MediaAssetModel.processing_started_at < now - CLAIM_TIMEOUT,
+            ),
+            MediaAssetModel.id == asset_id if asset_id is not None
+            else MediaAssetModel.created_at < now - SWEEP_MIN_AGE,
+        )
+        .order_by(MediaAssetModel.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    db = get_session_local()()
+    try:
+        claimed = db.execute(
+            update(MediaAssetModel)
+            .where(MediaAssetModel.id.in_(candidates.scalar_subquery()))
+            .values(processing_started_at=now)
+            .returning(MediaAssetModel.id)
+        ).scalars().all()
+        db.commit()
+        return sorted(claimed)
+    finally:
+        db.close()
+
+
+async def process_asset(asset_id: int) -> None:
+    asset = await asyncio.to_thread(_load_asset, asset_id)
+    if asset is None or asset.processed_at is not None:
+        return
+    if asset.sha256 and await asyncio.to_thread(_copy_from_sibling, asset):
+        return
+
+    width = height = duration = None
+    renditions: list[Rendition] = []
+    if asset.kind == KIND_IMAGE:
+        content = await storage.read_range_async(asset.id, 0, asset.size_bytes)
+        result = await render(content, IMAGE_RENDITIONS)
+        width, height, renditions = result.width, result.height, result.renditions
+    elif asset.kind == KIND_VIDEO and _video_probe is not None:
+        info, poster = await _probe_video(asset)
+        width, height, duration = info.width, info.height, info.duration_seconds
+        if poster:
+            result = await render(poster, POSTER_RENDITIONS)
+            renditions = result.renditions
+
+    await asyncio.to_thread(_save, asset, width, height, duration, renditions)
+    logger.info(
+        "Processed asset %d (%s %sx%s, renditions=%s)",
+        asset.id, asset.kind, width, height, [r.variant for r in renditions],
+    )
+
+
+async def _probe_video(asset: MediaAssetModel) -> tuple[VideoInfo, bytes | None]:
+    payload = await storage.open_payload_async(asset.id)
+    if payload.path is not None:
+        # Already a file on disk (filesystem backend): probe it in place.
+        return await _probe_file(payload.path)
+    fd, path = tempfile.mkstemp(suffix=os.path.splitext(asset.filename)[1])
+    try:
+        with os.fdopen(fd, "wb") as out:
+            offset = 0
+            while offset < asset.size_bytes:
+                length = min(storage.INGEST_CHUNK_BYTES, asset.size_bytes - offset)
+                chunk = await payload.read(offset, length)
+                await asyncio.to_thread(out.write, chunk)
+                offset += length
+        return await _probe_file(path)
+    finally:
+        os.unlink(path)
+
+
+async def _probe_file(path: str) -> tuple[VideoInfo, bytes | None]:
+    info = await asyncio.to_thread(_video_probe.probe, path)
+    poster = await asyncio.to_thread(_video_probe.poster, path)
+    return info, poster
+
+
+def _load_asset(asset_id: int) -> MediaAssetModel | None:
+    db = get_session_local()()
+    try:
+        asset = (
+            db.query(MediaAssetModel)
+            .options(defer(MediaAssetModel.content))
+            .filter(MediaAssetModel.id == asset_id, MediaAssetModel.deleted_at.is_(None))
+            .first()
+        )
+        if asset is not None:
+            db.expunge(asset)
+        return asset
+    finally:
+        db.close()
+
+
+def _copy_from_sibling(asset: MediaAssetModel) -> bool:
+    """Same bytes already processed for another asset: reuse its metadata
+    (the renditions are shared by hash)."""
+    db = get_session_local()()
+    try:
+        sibling = (
+            db.query(MediaAssetModel)
+            .options(defer(MediaAssetModel.content))
+            .filter(
+                MediaAssetModel.sha256 == asset.sha256,
+                MediaAssetModel.processed_at.isnot(None),
+            )
+            .first()
+        )
+        if sibling is None:
+            return False
+        db.query(MediaAssetModel).filter(MediaAssetModel.id == asset.id).update({
+            "width": sibling.width,
+            "height": sibling.height,
+            "duration_seconds": sibling.duration_seconds,
+            "processed_at": datetime.utcnow(),
+        })
+        db.commit()
+        return True
+    finally:
+        db.close()
+
+
+def _save(
+    asset: MediaAssetModel,
+    width: int | None,
+    height: int | None,
+    duration: int | None,
+    renditions: list[Rendition],
+) -> None:
+    db = get_session_local()()
+    try:
+        source = asset.sha256
+        if source and renditions:
+            db.execute(
+                pg_insert(MediaRenditionModel)
+                .values([
+                    {
+                        "source_sha256": source,
+                        "variant": r.variant,
+                        "mime": r.mime,
+                        "width": r.width,
+                        "height": r.height,
+                        "size_bytes": len(r.data),
+                        "sha256": hashlib.sha256(r.data).hexdigest(),
+                        "content": r.data,
+                        "created_at": datetime.utcnow(),
+                    }
+                    for r in renditions
+                ])
+                .on_conflict_do_nothing(index_elements=["source_sha256", "variant"])
+            )
+        same_bytes = (
+            MediaAssetModel.sha256 == source if source else MediaAssetModel.id == asset.id
+        )
+        db.query(MediaAssetModel).filter(same_bytes, MediaAssetModel.processed_at.is_(None)).update({
+            "width": width,
+            "height": height,
+            "duration_seconds": duration,
+            "processed_at": datetime.utcnow(),
+        }, synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def _mark_processed(asset_id: int) -> None:
+    """Don't retry an asset the pipeline can't handle; the original is still served."""
+    db = get_session_local()()
+    try:
+        db.query(MediaAssetModel).filter(MediaAssetModel.id == asset_id).update(
+            {"processed_at": datetime.utcnow()}
+        )
+        db.commit()
+    except Exception:  # noqa: BLE001
+        logger.exception("Could not mark asset %d processed", asset_id)
+    finally:
+        db.close()
@@ -0,0 +1,106 @@
+"""Postgres LISTEN on a dedicated connection, driven by the event loop.
+
+One ``PgListener`` per channel per process: it opens its own autocommit
+connection (outside the pool), ``LISTEN``s, and reads notifications through
+``loop.add_reader`` — no polling, no thread. Each JSON payload is handed to
+``on_event``. If the connection drops it reconnects every
+``RECONNECT_SECONDS`` and then calls ``on_resync``, because notifications sent
+while it was down are lost and listeners must re-read state.
+"""
+import asyncio
+import json
+import logging
+from typing import Any, Callable
+
+from app.database import get_engine
+
+
+logger = logging.getLogger(__name__)
+
+
+RECONNECT_SECONDS = 5
+
+
+class PgListener:
+    def __init__(
+        self,
+        channel: str,
+        on_event: Callable[[dict[str, Any]], None],
+        on_resync: Callable[[], None] | None = None,
+    ):
+        self.channel = channel
+        self._on_event = on_event
+        self._on_resync = on_resync
+        self._conn: Any = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._started = False
+
+    @property
+    def connected(self) -> bool:
+        return self._conn is not None
+
+    async def start(self) -> None:
+        """Open the listening connection unless already started. Never
+        raises — a failed connect is retried in the background."""
+        if self._started:
+            return
+        self._started = True
+        await self._connect()
+
+    async def _connect(self) -> bool:
+        self._loop = asyncio.get_running_loop()
+        try:
+            self._conn = await asyncio.to_thread(self._open)
+        except Exception:  # noqa: BLE001
+            logger.exception("Could not LISTEN on %s; retrying", self.channel)
+            self._loop.call_later(RECONNECT_SECONDS, self._start_reconnect)
+            return False
+        self._loop.add_reader(self._conn.fileno(), self._on_readable)
+        logger.info("Listening on %s", self.channel)
+        return True
+
+    def _open(self) -> Any:
+        engine = get_engine()
+        cargs, cparams = engine.dialect.create_connect_args(engine.url)
+        conn = engine.dialect.dbapi.connect(*cargs, **cparams)
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute(f"LISTEN {self.channel}")
+        return conn
+
+    def _on_readable(self) -> None:
+        try:
+            self._conn.poll()
+        except Exception:  # noqa: BLE001
+            logger.warning("LISTEN connection on %s lost; reconnecting", self.channel)
+            self._drop()
+            self._loop.call_later(RECONNECT_SECONDS, self._start_reconnect)
+            return
+        while self._conn.notifies:
+            note = self._conn.notifies.pop(0)
+            try:
+                event = json.loads(note.payload)
+            except ValueError:
+                continue
+            if isinstance(event, dict):
+                try:
+                    self._on_event(event)
+                except Exception:  # noqa: BLE001
+                    logger.exception("Handling a %s notification failed", self.channel)
+
+    def _drop(self) -> None:
+        if self._conn is None:
+            return
+        self._loop.remove_reader(self._conn.fileno())
+        try:
+            self._conn.close()
+        except Exception:  # noqa: BLE001
+            pass
+        self._conn = None
+
+    def _start_reconnect(self) -> None:
+        self._loop.create_task(self._reconnect_and_resync())
+
+    async def _reconnect_and_resync(self) -> None:
+        if await self._connect() and self._on_resync is not None:
+            self._on_resync()
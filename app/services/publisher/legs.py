@@ -0,0 +1,126 @@
+"""Per-platform publish legs of a scheduled post.
+
+A post going to three platforms is three legs. Each leg keeps its own status,
+attempt count, backoff and platform post id in ``platform_legs_json``, so a
+partial failure retries only the legs that failed — a leg that published is
+never uploaded again, and each failed leg backs off on its own schedule. The
+post's ``scheduled_at`` is moved to the earliest leg retry.
+
+Before its platform call a leg is committed as ``publishing`` under a fresh
+idempotency key (``<post id>:<platform>:<attempt>``). A leg still
+``publishing`` after a restart was interrupted mid-call: the platform may have
+accepted it, so recovery fails the leg rather than retrying it into a
+duplicate.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Any
+
+from app.models.scheduled_post import (
+    LEG_FAILED,
+    LEG_PENDING,
+    LEG_PUBLISHED,
+    LEG_PUBLISHING,
+    STATUS_FAILED,
+    STATUS_PUBLISHED,
+    STATUS_SCHEDULED,
+    ScheduledPostModel,
+)
+
+
+MAX_LEG_ATTEMPTS = 3
+BACKOFF_BASE_MINUTES = 2
+BACKOFF_CAP_MINUTES = 60
+
+INTERRUPTED_ERROR = "Interrupted mid-publish — check the platform before retrying."
+
+Leg = dict[str, Any]
+
+
+def load_legs(post: ScheduledPostModel) -> dict[str, Leg]:
+    """Copies of the post's legs, one per requested platform. Platforms
+    published before legs were tracked count as published."""
+    legs = {platform: dict(leg) for platform, leg in (post.platform_legs_json or {}).items()}
+    posted = post.platform_post_ids_json or {}
+    for platform in post.platforms_json or []:
+        if platform not in legs:
+            legs[platform] = {
+                "status": LEG_PUBLISHED if posted.get(platform) else LEG_PENDING,
+                "attempts": 0,
+                "post_id": posted.get(platform),
+                "error": None,
+                "next_attempt_at": None,
+                "idempotency_key": None,
+            }
+    return legs
+
+
+def due_platforms(post: ScheduledPostModel, legs: dict[str, Leg], now: datetime) -> list[str]:
+    """Platforms whose leg is pending and past its backoff."""
+    due = []
+    for platform in post.platforms_json or []:
+        leg = legs[platform]
+        retry_at = leg.get("next_attempt_at")
+        if leg["status"] == LEG_PENDING and (not retry_at or datetime.fromisoformat(retry_at) <= now):
+            due.append(platform)
+    return due
+
+
+def begin(leg: Leg, post_id: int, platform: str) -> None:
+    leg["attempts"] = (leg.get("attempts") or 0) + 1
+    leg["status"] = LEG_PUBLISHING
+    leg["idempotency_key"] = f"{post_id}:{platform}:{leg['attempts']}"
+    leg["next_attempt_at"] = None
+
+
+def succeed(leg: Leg, platform_post_id: str) -> None:
+    leg["status"] = LEG_PUBLISHED
+    leg["post_id"] = platform_post_id
+    leg["error"] = None
+
+
+def fail(leg: Leg, error: str, now: datetime) -> None:
+    """Back the leg off exponentially, or fail it once out of attempts."""
+    leg["error"] = error
+    if leg["attempts"] >= MAX_LEG_ATTEMPTS:
+        leg["status"] = LEG_FAILED
+        leg["next_attempt_at"] = None
+        return
+    delay = min(BACKOFF_BASE_MINUTES ** leg["attempts"], BACKOFF_CAP_MINUTES)
+    leg["status"] = LEG_PENDING
+    leg["next_attempt_at"] = (now + timedelta(minutes=delay)).isoformat()
+
+
+def interrupt(legs: dict[str, Leg]) -> None:
+    for leg in legs.values():
+        if leg["status"] == LEG_PUBLISHING:
+            leg["status"] = LEG_FAILED
+            leg["error"] = INTERRUPTED_ERROR
+
+
+def settle(post: ScheduledPostModel, legs: dict[str, Leg], now: datetime) -> None:
+    """Write the legs back and derive the post's status from them:
+    published once every leg is, rescheduled while any leg has a retry
+    left, failed otherwise."""
+    post.platform_legs_json = legs
+    post.platform_post_ids_json = {
+        platform: leg["post_id"] for platform, leg in legs.items() if leg["status"] == LEG_PUBLISHED
+    }
+    requested = [legs[p] for p in post.platforms_json or [] if p in legs]
+    errors = [f"{p}: {legs[p]['error']}" for p in post.platforms_json or [] if legs.get(p, {}).get("error")]
+    post.error_message = "; ".join(errors) or None
+
+    retries = [
+        datetime.fromisoformat(leg["next_attempt_at"]) if leg.get("next_attempt_at") else now
+        for leg in requested
+        if leg["status"] == LEG_PENDING
+    ]
+    if all(leg["status"] == LEG_PUBLISHED for leg in requested):
+        post.status = STATUS_PUBLISHED
+        post.published_at = now
+    elif retries:
+        post.status = STATUS_SCHEDULED
+        post.scheduled_at = min(retries)
+    else:
+        post.status = STATUS_FAILED
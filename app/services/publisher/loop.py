@@ -6,18 +6,25 @@ run as ``asyncio.Task`` instances inside the FastAPI process — launched from
 workers comes from Postgres row locking (``FOR UPDATE SKIP LOCKED``).
 
 Loops:
-1. ``publish_pending_loop`` — polls ``scheduled_posts`` for due rows, publishes to
+1. ``publish_pending_loop`` — claims due ``scheduled_posts`` rows, publishes to
    each requested platform, marks the row published or failed.
-2. ``send_due_reports_loop`` — polls ``report_schedules`` for due runs, builds the
+2. ``send_due_reports_loop`` — claims due ``report_schedules`` runs, builds the
    PDF, emails it via the existing Gmail SMTP path, advances ``next_sent_at``.
+
+Neither loop polls: each sleeps until the next due time of its table, tracked
+by a ``wakeups.DueTimer`` that Postgres triggers keep current over
+LISTEN/NOTIFY.
 """
 from __future__ import annotations
 
 import asyncio
 import logging
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+from typing import Any
 
 from sqlalchemy import text as sql_text
+from sqlalchemy.orm import defer
 
 from app.database import get_session_local
 from app.models.media_asset import MediaAssetModel
@@ -28,7 +35,6 @@ from app.models.report_run import (
     ReportRunModel,
 )
 from app.models.report_schedule import (
-    CADENCE_MONTHLY,
     CADENCE_WEEKLY,
     ReportScheduleModel,
 )
@@ -42,14 +48,51 @@ from app.models.scheduled_post import (
 from app.repositories.facebook_session import FacebookSessionRepository
 from app.repositories.instagram_session import InstagramSessionRepository
 from app.repositories.tiktok_session import TikTokSessionRepository
+from app.services import storage
 from app.services.facebook.pages import PagesService
-from app.services.publisher import platforms
+from app.services.publisher import legs, platforms, pools, wakeups
 
 logger = logging.getLogger(__name__)
 
 
-POLL_INTERVAL_SECONDS = 30
-MAX_ATTEMPTS = 3
+# Most due posts claimed per query, and most posts publishing at once in this
+# process — claimed rows beyond what the platform pools can work on would only
+# sit in ``publishing`` (and be failed by a restart). In-flight posts hold no
+# database connection while publishing (see ``_ClaimedPost``), so this isn't
+# bounded by the connection pool.
+CLAIM_BATCH = 20
+MAX_IN_FLIGHT = 40
+
+# Strong references to publish tasks — asyncio only keeps weak ones.
+_in_flight: set[asyncio.Task] = set()
+
+
+class _PublisherStats:
+    """Process-local publisher counters for ``publisher_metrics``."""
+
+    def __init__(self) -> None:
+        self.claimed = 0
+        self.published = 0
+        self.retried = 0
+        self.failed = 0
+        self.last_lag_seconds: float | None = None
+        self.max_lag_seconds = 0.0
+
+    def record_claim(self, lag_seconds: float) -> None:
+        self.claimed += 1
+        self.last_lag_seconds = lag_seconds
+        self.max_lag_seconds = max(self.max_lag_seconds, lag_seconds)
+
+    def record_outcome(self, status: str) -> None:
+        if status == STATUS_PUBLISHED:
+            self.published += 1
+        elif status == STATUS_FAILED:
+            self.failed += 1
+        else:
+            self.retried += 1
+
+
+_stats = _PublisherStats()
 
 
 # ── Publisher loop ──────────────────────────────────────────────────────────
@@ -58,115 +101,251 @@ async def publish_pending_loop() -> None:
     """Forever-loop that picks up scheduled posts whose ``scheduled_at`` is due.
 
     Per iteration:
-      1. ``SELECT ... FOR UPDATE SKIP LOCKED`` one ready row + flip its status to
-         ``publishing`` in the same transaction. The lock + status flip together
-         act as the "claim" so two API workers cannot both pick up the same row.
-      2. Publish to each requested platform.
-      3. On success, status=``published`` + record platform_post_ids.
-      4. On failure, increment attempts; status=``failed`` once attempts == MAX.
+      1. ``SELECT ... FOR UPDATE SKIP LOCKED`` up to ``CLAIM_BATCH`` ready rows
+         (bounded by free ``MAX_IN_FLIGHT`` room) + flip their status to
+         ``publishing`` in the same statement. The lock + status flip together
+         act as the "claim" so two API workers cannot both pick up a row.
+      2. Publish each claimed post in its own task, to all of its platforms
+         concurrently; every platform call goes through that platform's pool
+         (``publisher.pools``), which bounds concurrency and paces requests
+         under the platform's rate limit.
+      3. Only legs still pending and past their backoff run (``publisher.legs``);
+         published legs are never re-run.
+      4. status=``published`` once every leg is; otherwise rescheduled for the
+         earliest leg retry, or ``failed`` once a leg is out of attempts.
+
+    While a backlog exists (a full batch was claimed) the loop claims again
+    immediately; when in-flight posts fill every slot it waits for one to
+    finish; otherwise it sleeps until the next post is due.
     """
-    logger.info("Publisher loop starting (poll=%ds, max_attempts=%d)", POLL_INTERVAL_SECONDS, MAX_ATTEMPTS)
+    logger.info(
+        "Publisher loop starting (batch=%d, in_flight=%d, max_leg_attempts=%d)",
+        CLAIM_BATCH, MAX_IN_FLIGHT, legs.MAX_LEG_ATTEMPTS,
+    )
+    await wakeups.start_listening()
     while True:
+        claimed = 0
+        room = MAX_IN_FLIGHT - len(_in_flight)
+        swept_at = datetime.utcnow()
         try:
-            await _process_one_due_post()
+            if room > 0:
+                claimed = _claim_due_posts(min(CLAIM_BATCH, room), swept_at)
         except Exception:  # noqa: BLE001
             logger.exception("Publisher loop iteration crashed; continuing")
-        await asyncio.sleep(POLL_INTERVAL_SECONDS)
+
+        if claimed and claimed == min(CLAIM_BATCH, room):
+            await asyncio.sleep(0)
+        elif len(_in_flight) >= MAX_IN_FLIGHT:
+            await asyncio.wait(set(_in_flight), return_when=asyncio.FIRST_COMPLETED)
+        else:
+            _post_timer.pop_due(swept_at)
+            await _post_timer.sleep_until_due()
 
 
-async def _process_one_due_post() -> None:
+def _load_post_due_times() -> list[tuple[int, datetime]]:
+    db = get_session_local()()
+    try:
+        return [
+            (row.id, row.scheduled_at)
+            for row in db.query(ScheduledPostModel.id, ScheduledPostModel.scheduled_at)
+            .filter(
+                ScheduledPostModel.status == STATUS_SCHEDULED,
+                ScheduledPostModel.scheduled_at.isnot(None),
+                ScheduledPostModel.deleted_at.is_(None),
+            )
+            .all()
+        ]
+    finally:
+        db.close()
+
+
+_post_timer = wakeups.register_timer(wakeups.DueTimer("scheduled_posts", _load_post_due_times))
+
+
+def _claim_due_posts(limit: int, now: datetime) -> int:
+    """Claim up to ``limit`` posts due by ``now`` and start a publish task for
+    each. Returns how many were claimed.
+
+    ``now`` is the app clock the loop swept at — the same cutoff the timer
+    forgets entries by — so a row the timer woke for is never skipped over
+    because the database clock lags behind."""
     db = get_session_local()()
-    post: ScheduledPostModel | None = None
     try:
-        # Atomic claim — single row update returning the row we picked.
         sql = sql_text(
             """
             UPDATE scheduled_posts
                SET status = :publishing,
                    updated_at = now()
-             WHERE id = (
+             WHERE id IN (
                 SELECT id FROM scheduled_posts
                  WHERE status = :scheduled
                    AND scheduled_at IS NOT NULL
-                   AND scheduled_at <= now()
+                   AND scheduled_at <= :now
                    AND deleted_at IS NULL
                  ORDER BY scheduled_at ASC
                  FOR UPDATE SKIP LOCKED
-                 LIMIT 1
+                 LIMIT :limit
              )
-            RETURNING id
+            RETURNING id, scheduled_at
             """
         )
-        row = db.execute(sql, {"publishing": STATUS_PUBLISHING, "scheduled": STATUS_SCHEDULED}).first()
-        if not row:
-            db.commit()
-            return
+        rows = db.execute(
+            sql,
+            {"publishing": STATUS_PUBLISHING, "scheduled": STATUS_SCHEDULED, "now": now, "limit": limit},
+        ).all()
         db.commit()
+    finally:
+        db.close()
+
+    claimed_at = datetime.utcnow()
+    for row in sorted(rows, key=lambda r: r.scheduled_at):
+        _stats.record_claim((claimed_at - row.scheduled_at).total_seconds())
+        task = asyncio.create_task(_process_claimed_post(row.id))
+        _in_flight.add(task)
+        task.add_done_callback(_in_flight.discard)
+    return len(rows)
+
+
+@dataclass
+class _ClaimedPost:
+    """Everything publishing a claimed post needs, read up front so no
+    database connection is held across platform calls, pool waits or pacing
+    sleeps. Media rows and platform sessions are detached copies."""
+
+    post_id: int
+    post_legs: dict[str, legs.Leg]
+    targets: list[str]
+    texts: dict[str, str]
+    media: list[MediaAssetModel]
+    sessions: dict[str, Any]
 
+
+async def _process_claimed_post(post_id: int) -> None:
+    try:
+        claimed = await asyncio.to_thread(_begin_post, post_id)
+        if claimed is None:
+            return
+        await _publish_post(claimed)
+    except Exception:  # noqa: BLE001
+        logger.exception("Publishing post %d crashed", post_id)
+
+
+def _begin_post(post_id: int) -> _ClaimedPost | None:
+    """Commit every due leg as ``publishing`` under its idempotency key
+    before any platform call, so an interrupted call is never blindly
+    retried; then load what the legs need."""
+    db = get_session_local()()
+    try:
         post = (
             db.query(ScheduledPostModel)
-            .filter(ScheduledPostModel.id == row.id)
+            .filter(ScheduledPostModel.id == post_id)
             .first()
         )
         if not post:
-            return
+            return None
+        now = datetime.utcnow()
+        post_legs = legs.load_legs(post)
+        targets = legs.due_platforms(post, post_legs, now)
+        for platform in targets:
+            legs.begin(post_legs[platform], post.id, platform)
+        post.platform_legs_json = {p: dict(leg) for p, leg in post_legs.items()}
+        db.commit()
 
-        await _publish_post(db, post)
+        # ``content`` stays deferred: bytes are read from storage when
+        # uploading (videos in chunks).
+        asset_ids = post.media_asset_ids_json or []
+        media = (
+            db.query(MediaAssetModel)
+            .options(defer(MediaAssetModel.content))
+            .filter(
+                MediaAssetModel.id.in_(asset_ids),
+                MediaAssetModel.deleted_at.is_(None),
+            )
+            .all()
+        )
+        media_map = {a.id: a for a in media}
+        per_platform = post.per_platform_payload_json or {}
+        claimed = _ClaimedPost(
+            post_id=post.id,
+            post_legs=post_legs,
+            targets=targets,
+            texts={p: (per_platform.get(p) or {}).get("text") or post.text for p in targets},
+            media=[media_map[i] for i in asset_ids if i in media_map],
+            sessions={p: _platform_session(db, p, post.brand_id) for p in targets},
+        )
+        db.expunge_all()
+        return claimed
     finally:
         db.close()
 
 
-async def _publish_post(db, post: ScheduledPostModel) -> None:
-    media = (
-        db.query(MediaAssetModel)
-        .filter(
-            MediaAssetModel.id.in_(post.media_asset_ids_json or []),
-            MediaAssetModel.deleted_at.is_(None),
-        )
-        .all()
-    )
-    media_map = {a.id: a for a in media}
-    ordered_media = [media_map[i] for i in (post.media_asset_ids_json or []) if i in media_map]
+def _platform_session(db, platform: str, brand_id: int) -> Any:
+    if platform == "facebook":
+        return FacebookSessionRepository(db).get_by_brand_id(brand_id)
+    if platform == "instagram":
+        return InstagramSessionRepository(db).get_by_brand_id(brand_id)
+    if platform == "tiktok":
+        return TikTokSessionRepository(db).get_by_brand_id(brand_id)
+    return None
 
-    platform_post_ids: dict[str, str] = post.platform_post_ids_json or {}
-    errors: list[str] = []
 
-    for platform in post.platforms_json or []:
-        per = (post.per_platform_payload_json or {}).get(platform) or {}
-        text = per.get("text") or post.text
-        try:
-            if platform == "facebook":
-                pid = await _publish_facebook(db, post.brand_id, text, ordered_media)
-            elif platform == "instagram":
-                pid = await _publish_instagram(db, post.brand_id, text, ordered_media)
-            elif platform == "tiktok":
-                pid = await _publish_tiktok(db, post.brand_id, text, ordered_media)
-            else:
-                raise ValueError(f"Unsupported platform: {platform}")
-            platform_post_ids[platform] = pid
-        except Exception as exc:  # noqa: BLE001
-            logger.warning("Publish to %s failed for post %d: %s", platform, post.id, exc)
-            errors.append(f"{platform}: {exc}")
-
-    post.platform_post_ids_json = platform_post_ids
-    post.attempt_count = (post.attempt_count or 0) + 1
-    if errors:
-        post.error_message = "; ".join(errors)
-        if post.attempt_count >= MAX_ATTEMPTS:
-            post.status = STATUS_FAILED
+async def _publish_post(claimed: _ClaimedPost) -> None:
+    # One leg per due platform, all at once — each waits only on its own
+    # platform's pool.
+    async def leg(platform: str) -> str:
+        async with pools.pool_for(platform).slot():
+            return await _publish_to(
+                platform, claimed.sessions[platform], claimed.texts[platform], claimed.media,
+            )
+
+    outcomes = await asyncio.gather(*(leg(p) for p in claimed.targets), return_exceptions=True)
+    now = datetime.utcnow()
+    for platform, outcome in zip(claimed.targets, outcomes):
+        if isinstance(outcome, BaseException):
+            if not isinstance(outcome, Exception):
+                raise outcome
+            logger.warning(
+                "Publish to %s failed for post %d (leg %s): %s",
+                platform, claimed.post_id, claimed.post_legs[platform]["idempotency_key"], outcome,
+            )
+            legs.fail(claimed.post_legs[platform], str(outcome), now)
         else:
-            # Reschedule with exponential backoff.
-            post.status = STATUS_SCHEDULED
-            post.scheduled_at = datetime.utcnow() + timedelta(minutes=2 ** post.attempt_count)
-    else:
-        post.status = STATUS_PUBLISHED
-        post.published_at = datetime.utcnow()
-        post.error_message = None
-    db.commit()
-
-
-async def _publish_facebook(db, brand_id: int, text: str, media: list[MediaAssetModel]) -> str:
-    fb_session = FacebookSessionRepository(db).get_by_brand_id(brand_id)
+            legs.succeed(claimed.post_legs[platform], outcome)
+
+    status = await asyncio.to_thread(_settle_post, claimed.post_id, claimed.post_legs, now)
+    if status is not None:
+        _stats.record_outcome(status)
+
+
+def _settle_post(post_id: int, post_legs: dict[str, legs.Leg], now: datetime) -> str | None:
+    db = get_session_local()()
+    try:
+        post = (
+            db.query(ScheduledPostModel)
+            .filter(ScheduledPostModel.id == post_id)
+            .first()
+        )
+        if not post:
+            return None
+        post.attempt_count = (post.attempt_count or 0) + 1
+        legs.settle(post, post_legs, now)
+        db.commit()
+        return post.status
+    finally:
+        db.close()
+
+
+async def _publish_to(platform: str, session: Any, text: str, media: list[MediaAssetModel]) -> str:
+    if platform == "facebook":
+        return await _publish_facebook(session, text, media)
+    if platform == "instagram":
+        return await _publish_instagram(session, text, media)
+    if platform == "tiktok":
+        return await _publish_tiktok(session, text, media)
+    raise ValueError(f"Unsupported platform: {platform}")
+
+
+async def _publish_facebook(fb_session, text: str, media: list[MediaAssetModel]) -> str:
     if not fb_session:
         raise RuntimeError("Facebook not connected")
     user_token = fb_session.access_token
@@ -182,32 +361,31 @@ async def _publish_facebook(db, brand_id: int, text: str, media: list[MediaAsset
     )
 
 
-async def _publish_instagram(db, brand_id: int, text: str, media: list[MediaAssetModel]) -> str:
-    ig_session = InstagramSessionRepository(db).get_by_brand_id(brand_id)
+async def _publish_instagram(ig_session, text: str, media: list[MediaAssetModel]) -> str:
     if not ig_session:
         raise RuntimeError("Instagram not connected")
     if not media:
         raise RuntimeError("Instagram requires a media asset")
-    asset = media[0]
-    public_url = getattr(asset, "public_url", None)
-    if not public_url:
+    items = [(getattr(asset, "public_url", None), asset.kind == "video") for asset in media]
+    if not all(url for url, _ in items):
         # Without an external URL we cannot publish to IG. Surface a clear error so
         # the FE can prompt the user to set the public host.
         raise RuntimeError(
             "Instagram needs a publicly reachable media URL. Set BRAND_PUBLIC_HOST and "
             "ensure /publish/media/{id}/raw is reachable from the public internet."
         )
+    public_url, is_video = items[0]
     return await platforms.publish_to_instagram(
         ig_user_id=ig_session.ig_user_id,
         access_token=ig_session.access_token,
         text=text,
         media_url=public_url,
-        is_video=(asset.kind == "video"),
+        is_video=is_video,
+        carousel=items if len(items) > 1 else None,
     )
 
 
-async def _publish_tiktok(db, brand_id: int, text: str, media: list[MediaAssetModel]) -> str:
-    tt_session = TikTokSessionRepository(db).get_by_brand_id(brand_id)
+async def _publish_tiktok(tt_session, text: str, media: list[MediaAssetModel]) -> str:
     if not tt_session:
         raise RuntimeError("TikTok not connected")
     return await platforms.publish_to_tiktok(
@@ -217,36 +395,111 @@ async def _publish_tiktok(db, brand_id: int, text: str, media: list[MediaAssetMo
     )
 
 
+def publisher_metrics() -> dict:
+    """Backlog (due rows still waiting, across all workers) and lag behind
+    ``scheduled_at``, plus this process's in-flight posts, outcome counters
+    platform pools and chunked uploads."""
+    now = datetime.utcnow()
+    db = get_session_local()()
+    try:
+        backlog, oldest_due = db.execute(
+            sql_text(
+                """
+                SELECT count(*), min(scheduled_at) FROM scheduled_posts
+                 WHERE status = :scheduled
+                   AND scheduled_at IS NOT NULL
+                   AND scheduled_at <= :now
+                   AND deleted_at IS NULL
+                """
+            ),
+            {"scheduled": STATUS_SCHEDULED, "now": now},
+        ).one()
+        db.commit()
+    finally:
+        db.close()
+
+    return {
+        "backlog": backlog,
+        "oldest_due_lag_seconds": (
+            (now - oldest_due).total_seconds() if oldest_due else 0.0
+        ),
+        "in_flight": len(_in_flight),
+        "claimed": _stats.claimed,
+        "published": _stats.published,
+        "retried": _stats.retried,
+        "failed": _stats.failed,
+        "last_claim_lag_seconds": _stats.last_lag_seconds,
+        "max_claim_lag_seconds": _stats.max_lag_seconds,
+        "platforms": pools.pool_stats(),
+        "uploads": platforms.upload_stats(),
+    }
+
+
 # ── Scheduled report loop ───────────────────────────────────────────────────
 
 async def send_due_reports_loop() -> None:
-    """Poll ``report_schedules`` for due runs, build PDF, email it, advance ``next_sent_at``."""
-    logger.info("Scheduled-report loop starting (poll=%ds)", POLL_INTERVAL_SECONDS)
+    """Send every due ``report_schedules`` run (build PDF, email it, advance
+    ``next_sent_at``), then sleep until the next one is due."""
+    logger.info("Scheduled-report loop starting")
+    await wakeups.start_listening()
     while True:
+        swept_at = datetime.utcnow()
         try:
-            await _process_one_due_report()
+            while await _process_one_due_report(swept_at):
+                pass
         except Exception:  # noqa: BLE001
             logger.exception("Report loop iteration crashed; continuing")
-        await asyncio.sleep(POLL_INTERVAL_SECONDS)
+        _report_timer.pop_due(swept_at)
+        await _report_timer.sleep_until_due()
 
 
-async def _process_one_due_report() -> None:
+def _load_report_due_times() -> list[tuple[int, datetime]]:
+    db = get_session_local()()
+    try:
+        return [
+            (row.id, row.next_sent_at)
+            for row in db.query(ReportScheduleModel.id, ReportScheduleModel.next_sent_at)
+            .filter(ReportScheduleModel.deleted_at.is_(None))
+            .all()
+        ]
+    finally:
+        db.close()
+
+
+_report_timer = wakeups.register_timer(wakeups.DueTimer("report_schedules", _load_report_due_times))
+
+
+async def _process_one_due_report(now: datetime) -> bool:
+    """Send one report due by ``now`` (the loop's sweep time). Returns
+    whether there was one."""
     from app.services.reports.builder import build_pdf
     from app.services.email import send_email_with_attachment
 
     db = get_session_local()()
     try:
+        # Row lock + advancing ``next_sent_at`` in the same commit as the run
+        # row is the claim — every worker wakes at the same instant, so the
+        # loser must skip the row rather than send it again.
         sched: ReportScheduleModel | None = (
             db.query(ReportScheduleModel)
             .filter(
-                ReportScheduleModel.next_sent_at <= datetime.utcnow(),
+                ReportScheduleModel.next_sent_at <= now,
                 ReportScheduleModel.deleted_at.is_(None),
             )
             .order_by(ReportScheduleModel.next_sent_at.asc())
+            .with_for_update(skip_locked=True)
             .first()
         )
         if not sched:
-            return
+            db.commit()
+            return False
+
+        # Advance next_sent_at regardless of success.
+        sched.last_sent_at = datetime.utcnow()
+        if sched.cadence == CADENCE_WEEKLY:
+            sched.next_sent_at = datetime.utcnow() + timedelta(weeks=1)
+        else:
+            sched.next_sent_at = datetime.utcnow() + timedelta(days=30)
 
         period_end = datetime.utcnow()
         window_days = int((sched.template_json or {}).get("window_days") or 30)
@@ -271,9 +524,9 @@ async def _process_one_due_report() -> None:
                 period_end=period_end,
                 sections=(sched.template_json or {}).get("sections") or ["overview"],
             )
-            run.pdf_bytes = pdf
             run.status = RUN_STATUS_READY
             run.generated_at = datetime.utcnow()
+            await storage.store_report_pdf(db, run, pdf)
 
             # Email recipients.
             recipients = [r.strip() for r in (sched.recipients_csv or "").split(",") if r.strip()]
@@ -295,13 +548,8 @@ async def _process_one_due_report() -> None:
             run.error_message = str(exc)
             logger.exception("Report build failed for schedule %d", sched.id)
 
-        # Advance next_sent_at regardless of success.
-        sched.last_sent_at = datetime.utcnow()
-        if sched.cadence == CADENCE_WEEKLY:
-            sched.next_sent_at = datetime.utcnow() + timedelta(weeks=1)
-        elif sched.cadence == CADENCE_MONTHLY:
-            sched.next_sent_at = datetime.utcnow() + timedelta(days=30)
         db.commit()
+        return True
     finally:
         db.close()
 
@@ -310,6 +558,7 @@ async def _process_one_due_report() -> None:
 
 def recover_orphans() -> None:
     """Mark any ``publishing`` rows as ``failed`` — they were interrupted by a restart.
+    Legs caught mid-call are failed too; legs that published stay published.
 
     Same pattern as the existing competitor-analysis recovery in main.py. Called
     synchronously during startup before the loops start.
@@ -327,6 +576,9 @@ def recover_orphans() -> None:
         if not stuck:
             return
         for p in stuck:
+            post_legs = legs.load_legs(p)
+            legs.interrupt(post_legs)
+            p.platform_legs_json = post_legs
             p.status = STATUS_FAILED
             p.error_message = "Server restarted while publishing — please retry."
             p.updated_at = datetime.utcnow()
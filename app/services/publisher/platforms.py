@@ -7,21 +7,115 @@ References:
 - Facebook: ``Docs/facebook/03_pages_api.md``
 - Instagram: ``Docs/instagram/05_content_publishing_api.md`` (two-step container then publish)
 - TikTok: ``Docs/tiktok/05_content_posting_api.md`` (PULL-from-URL or chunked PUSH)
+
+Videos are never loaded whole: they are read from storage a chunk at a time
+(``storage.open_payload``) and sent with Facebook's resumable upload or
+TikTok's chunked FILE_UPLOAD, so publisher memory stays at about one chunk per
+upload whatever the video size. A chunk that fails transiently is re-sent
+from the same offset; progress is exposed through ``upload_stats``.
 """
 from __future__ import annotations
 
 import asyncio
+import functools
 import logging
-from typing import Any
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, TypeVar
 
 import httpx
 
 from app.config import get_settings
 from app.models.media_asset import MediaAssetModel
+from app.services import storage
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+T = TypeVar("T")
+
+
+async def gather_limited(calls: list[Callable[[], Awaitable[T]]], limit: int) -> list[T]:
+    """Run ``calls`` concurrently, at most ``limit`` at a time, returning
+    results in order. The first failure cancels the rest and is raised."""
+    slots = asyncio.Semaphore(max(1, limit))
+
+    async def run(call: Callable[[], Awaitable[T]]) -> T:
+        async with slots:
+            return await call()
+
+    tasks = [asyncio.ensure_future(run(call)) for call in calls]
+    try:
+        return list(await asyncio.gather(*tasks))
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+
+
+# ── Chunked uploads ─────────────────────────────────────────────────────────
+
+UPLOAD_CHUNK_BYTES = 8 * 1024 * 1024
+CHUNK_RETRIES = 4
+
+
+@dataclass(eq=False)
+class UploadProgress:
+    platform: str
+    asset_id: int
+    total_bytes: int
+    sent_bytes: int = 0
+    retries: int = 0
+    started_at: datetime = field(default_factory=datetime.utcnow)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "platform": self.platform,
+            "asset_id": self.asset_id,
+            "sent_bytes": self.sent_bytes,
+            "total_bytes": self.total_bytes,
+            "retries": self.retries,
+            "started_at": self.started_at.isoformat(),
+        }
+
+
+# Uploads in progress in this process, for ``publisher_metrics``.
+_uploads: set[UploadProgress] = set()
+
+
+def upload_stats() -> list[dict[str, Any]]:
+    return [u.stats() for u in _uploads]
+
+
+def _is_transient(exc: Exception) -> bool:
+    if isinstance(exc, httpx.TransportError):
+        return True
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code == 429 or exc.response.status_code >= 500
+    return False
+
+
+async def _send_chunk(send: Callable[[], Awaitable[httpx.Response]], progress: UploadProgress) -> httpx.Response:
+    """Send one chunk, re-sending it with backoff after transient failures."""
+    delay = 1.0
+    attempt = 0
+    while True:
+        try:
+            r = await send()
+            r.raise_for_status()
+            return r
+        except (httpx.TransportError, httpx.HTTPStatusError) as exc:
+            attempt += 1
+            if not _is_transient(exc) or attempt > CHUNK_RETRIES:
+                raise
+            progress.retries += 1
+            logger.warning(
+                "%s upload of asset %d: chunk at %d failed (%s); retrying in %.0fs",
+                progress.platform, progress.asset_id, progress.sent_bytes, exc, delay,
+            )
+            await asyncio.sleep(delay)
+            delay *= 2
+
 
 # ── Facebook ────────────────────────────────────────────────────────────────
 
@@ -48,7 +142,8 @@ async def publish_to_facebook(
     # Single image.
     if len(media) == 1 and media[0].kind == "image":
         async with httpx.AsyncClient(timeout=60) as c:
-            files = {"source": (media[0].filename, media[0].content, media[0].mime)}
+            content, mime, filename = await storage.read_for_platform(media[0], "facebook")
+            files = {"source": (filename, content, mime)}
             r = await c.post(
                 f"{base}/photos",
                 data={"caption": text, "access_token": page_token},
@@ -58,30 +153,28 @@ async def publish_to_facebook(
             data = r.json()
             return data.get("post_id") or data.get("id")
 
-    # Single video.
+    # Single video — resumable, chunked upload.
     if len(media) == 1 and media[0].kind == "video":
         async with httpx.AsyncClient(timeout=120) as c:
-            files = {"source": (media[0].filename, media[0].content, media[0].mime)}
-            r = await c.post(
-                f"{base}/videos",
-                data={"description": text, "access_token": page_token},
-                files=files,
-            )
-            r.raise_for_status()
-            return r.json()["id"]
+            return await _facebook_video_upload(c, base, page_token, text, media[0])
 
-    # Multi-image carousel: upload each as unpublished, then attach.
+    # Multi-image carousel: upload each as unpublished (in parallel), then attach.
     async with httpx.AsyncClient(timeout=120) as c:
-        media_fbids: list[str] = []
-        for asset in media:
-            files = {"source": (asset.filename, asset.content, asset.mime)}
+        async def upload(asset: MediaAssetModel) -> str:
+            content, mime, filename = await storage.read_for_platform(asset, "facebook")
+            files = {"source": (filename, content, mime)}
             r = await c.post(
                 f"{base}/photos",
                 data={"published": "false", "access_token": page_token},
                 files=files,
             )
             r.raise_for_status()
-            media_fbids.append(r.json()["id"])
+            return r.json()["id"]
+
+        media_fbids = await gather_limited(
+            [functools.partial(upload, asset) for asset in media],
+            settings.publisher_upload_concurrency,
+        )
         attached = [{"media_fbid": mid} for mid in media_fbids]
         r = await c.post(
             f"{base}/feed",
@@ -95,6 +188,60 @@ async def publish_to_facebook(
         return r.json()["id"]
 
 
+async def _facebook_video_upload(
+    c: httpx.AsyncClient,
+    base: str,
+    page_token: str,
+    text: str,
+    asset: MediaAssetModel,
+) -> str:
+    """start → transfer (the offsets Facebook asks for) → finish."""
+    url = f"{base}/videos"
+    r = await c.post(url, data={
+        "upload_phase": "start",
+        "file_size": str(asset.size_bytes),
+        "access_token": page_token,
+    })
+    r.raise_for_status()
+    session = r.json()
+    session_id, video_id = session["upload_session_id"], session["video_id"]
+    start, end = int(session["start_offset"]), int(session["end_offset"])
+
+    payload = await storage.open_payload_async(asset.id)
+    progress = UploadProgress("facebook", asset.id, asset.size_bytes)
+    _uploads.add(progress)
+    try:
+        while start < end:
+            chunk = await payload.read(start, end - start)
+
+            def send(offset: int = start, chunk: bytes = chunk) -> Awaitable[httpx.Response]:
+                return c.post(
+                    url,
+                    data={
+                        "upload_phase": "transfer",
+                        "upload_session_id": session_id,
+                        "start_offset": str(offset),
+                        "access_token": page_token,
+                    },
+                    files={"video_file_chunk": (asset.filename, chunk, asset.mime)},
+                )
+
+            r = await _send_chunk(send, progress)
+            progress.sent_bytes = end
+            start, end = int(r.json()["start_offset"]), int(r.json()["end_offset"])
+    finally:
+        _uploads.discard(progress)
+
+    r = await c.post(url, data={
+        "upload_phase": "finish",
+        "upload_session_id": session_id,
+        "description": text,
+        "access_token": page_token,
+    })
+    r.raise_for_status()
+    return video_id
+
+
 # ── Instagram ───────────────────────────────────────────────────────────────
 
 async def publish_to_instagram(
@@ -104,45 +251,64 @@ async def publish_to_instagram(
     text: str,
     media_url: str | None,  # IG requires PUBLICLY accessible URL — see note below
     is_video: bool = False,
+    carousel: list[tuple[str, bool]] | None = None,
 ) -> str:
     """Two-step publish: create container → publish container.
 
+    ``carousel`` — two or more ``(media_url, is_video)`` items — publishes a
+    carousel instead: child containers are created in parallel, then a
+    ``CAROUSEL`` parent container referencing them is published.
+
     NOTE — Instagram's API requires media to be hosted at a public URL it can fetch.
     Since we store bytes in Postgres, the FE/server must first expose the asset via
     ``/publish/media/{id}/raw`` over a public hostname (or a temporary signed URL via
     a tunnel like ngrok in dev). This function takes the resolved ``media_url`` to
     keep the publish step pure.
     """
-    if not media_url:
+    if carousel is not None and len(carousel) < 2:
+        media_url, is_video = carousel[0] if carousel else (None, False)
+        carousel = None
+    if not media_url and not carousel:
         raise ValueError("Instagram requires a media_url; text-only posts are not supported")
 
     base = f"https://graph.instagram.com/v22.0/{ig_user_id}"
     async with httpx.AsyncClient(timeout=60) as c:
-        # Step 1: create container.
-        container_params = {"access_token": access_token, "caption": text}
-        if is_video:
-            container_params["media_type"] = "VIDEO"
-            container_params["video_url"] = media_url
+        async def create_container(params: dict[str, str], is_video: bool) -> str:
+            r = await c.post(f"{base}/media", params={"access_token": access_token, **params})
+            r.raise_for_status()
+            creation_id = r.json()["id"]
+            # Poll until the container is ready (only really needed for videos).
+            if is_video:
+                await _wait_for_ig_container(c, creation_id, access_token)
+            return creation_id
+
+        def media_params(url: str, is_video: bool) -> dict[str, str]:
+            if is_video:
+                return {"media_type": "VIDEO", "video_url": url}
+            return {"image_url": url}
+
+        # Step 1 (+2): create the container — for a carousel, every child in
+        # parallel and then the parent.
+        if carousel:
+            children = await gather_limited(
+                [
+                    functools.partial(
+                        create_container,
+                        {**media_params(url, video), "is_carousel_item": "true"},
+                        video,
+                    )
+                    for url, video in carousel
+                ],
+                settings.publisher_upload_concurrency,
+            )
+            creation_id = await create_container(
+                {"media_type": "CAROUSEL", "caption": text, "children": ",".join(children)},
+                False,
+            )
         else:
-            container_params["image_url"] = media_url
-        r = await c.post(f"{base}/media", params=container_params)
-        r.raise_for_status()
-        creation_id = r.json()["id"]
-
-        # Step 2: poll until container is ready (only really needed for videos).
-        if is_video:
-            for _ in range(30):
-                status_r = await c.get(
-                    f"https://graph.instagram.com/v22.0/{creation_id}",
-                    params={"access_token": access_token, "fields": "status_code"},
-                )
-                status_r.raise_for_status()
-                code = status_r.json().get("status_code")
-                if code == "FINISHED":
-                    break
-                if code == "ERROR":
-                    raise RuntimeError("Instagram media upload failed")
-                await asyncio.sleep(2)
+            creation_id = await create_container(
+                {"caption": text, **media_params(media_url, is_video)}, is_video,
+            )
 
         # Step 3: publish.
         r = await c.post(
@@ -153,6 +319,21 @@ async def publish_to_instagram(
         return r.json()["id"]
 
 
+async def _wait_for_ig_container(c: httpx.AsyncClient, creation_id: str, access_token: str) -> None:
+    for _ in range(30):
+        status_r = await c.get(
+            f"https://graph.instagram.com/v22.0/{creation_id}",
+            params={"access_token": access_token, "fields": "status_code"},
+        )
+        status_r.raise_for_status()
+        code = status_r.json().get("status_code")
+        if code == "FINISHED":
+            return
+        if code == "ERROR":
+            raise RuntimeError("Instagram media upload failed")
+        await asyncio.sleep(2)
+
+
 # ── TikTok ──────────────────────────────────────────────────────────────────
 
 async def publish_to_tiktok(
@@ -161,12 +342,11 @@ async def publish_to_tiktok(
     text: str,
     media: list[MediaAssetModel],
 ) -> str:
-    """Direct Post a video to TikTok using the Content Posting API (PULL_FROM_URL flavor).
+    """Direct Post a video to TikTok using the Content Posting API.
 
-    NOTE — like Instagram, TikTok requires a publicly fetchable URL for the video.
-    For an in-process publisher with no S3, the FE serves the asset via
-    ``/publish/media/{id}/raw`` over the brand's public host. This function takes the
-    resolved URL via ``media[0].public_url`` set by the loop.
+    If the loop resolved a public URL (``media[0].public_url``), TikTok pulls
+    the video itself (PULL_FROM_URL, needs a verified domain). Otherwise the
+    video is pushed from storage in chunks (FILE_UPLOAD).
     """
     if not media:
         raise ValueError("TikTok requires a video media asset")
@@ -174,10 +354,22 @@ async def publish_to_tiktok(
     if asset.kind != "video":
         raise ValueError("TikTok only supports video posts")
     public_url = getattr(asset, "public_url", None)
-    if not public_url:
-        raise ValueError("Asset has no public_url resolved by the loop")
 
-    async with httpx.AsyncClient(timeout=60) as c:
+    if public_url:
+        source_info = {"source": "PULL_FROM_URL", "video_url": public_url}
+    else:
+        # Chunks must be 5–64 MB except the last, which absorbs the remainder;
+        # smaller videos go up as a single chunk.
+        size = asset.size_bytes
+        chunk_size = min(UPLOAD_CHUNK_BYTES, size)
+        source_info = {
+            "source": "FILE_UPLOAD",
+            "video_size": size,
+            "chunk_size": chunk_size,
+            "total_chunk_count": max(1, size // chunk_size),
+        }
+
+    async with httpx.AsyncClient(timeout=120) as c:
         # Init the post.
         r = await c.post(
             "https://open.tiktokapis.com/v2/post/publish/video/init/",
@@ -193,12 +385,44 @@ async def publish_to_tiktok(
                     "disable_comment": False,
                     "disable_stitch": False,
                 },
-                "source_info": {
-                    "source": "PULL_FROM_URL",
-                    "video_url": public_url,
-                },
+                "source_info": source_info,
             },
         )
         r.raise_for_status()
-        publish_id = r.json()["data"]["publish_id"]
-        return publish_id
+        data = r.json()["data"]
+        if not public_url:
+            await _tiktok_chunked_upload(c, data["upload_url"], asset, source_info)
+        return data["publish_id"]
+
+
+async def _tiktok_chunked_upload(
+    c: httpx.AsyncClient,
+    upload_url: str,
+    asset: MediaAssetModel,
+    source_info: dict[str, Any],
+) -> None:
+    size, chunk_size = source_info["video_size"], source_info["chunk_size"]
+    count = source_info["total_chunk_count"]
+    payload = await storage.open_payload_async(asset.id)
+    progress = UploadProgress("tiktok", asset.id, size)
+    _uploads.add(progress)
+    try:
+        for index in range(count):
+            first = index * chunk_size
+            last = size - 1 if index == count - 1 else first + chunk_size - 1
+            chunk = await payload.read(first, last - first + 1)
+
+            def send(first: int = first, last: int = last, chunk: bytes = chunk) -> Awaitable[httpx.Response]:
+                return c.put(
+                    upload_url,
+                    content=chunk,
+                    headers={
+                        "Content-Type": asset.mime,
+                        "Content-Range": f"bytes {first}-{last}/{size}",
+                    },
+                )
+
+            await _send_chunk(send, progress)
+            progress.sent_bytes = last + 1
+    finally:
+        _uploads.discard(progress)
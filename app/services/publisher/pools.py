@@ -0,0 +1,92 @@
+"""Per-platform publish worker pools.
+
+Each platform gets a bounded number of concurrent publish calls and an evenly
+paced request rate, so a burst of due posts drains in parallel without
+tripping platform rate limits. The limits are per process; with several
+uvicorn workers each worker paces itself.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass(frozen=True)
+class PlatformLimit:
+    concurrency: int
+    per_minute: int
+
+
+# Conservative against the documented app-level limits; Instagram and TikTok
+# publishing are also capped per account per day, which the platforms enforce.
+PLATFORM_LIMITS: dict[str, PlatformLimit] = {
+    "facebook": PlatformLimit(concurrency=4, per_minute=60),
+    "instagram": PlatformLimit(concurrency=2, per_minute=20),
+    "tiktok": PlatformLimit(concurrency=2, per_minute=6),
+}
+DEFAULT_LIMIT = PlatformLimit(concurrency=1, per_minute=10)
+
+
+class PlatformPool:
+    """Concurrency slots plus request pacing for one platform."""
+
+    def __init__(self, platform: str, limit: PlatformLimit):
+        self.platform = platform
+        self.limit = limit
+        self._slots = asyncio.Semaphore(max(1, limit.concurrency))
+        self._interval = 60.0 / max(1, limit.per_minute)
+        self._next_at = 0.0
+        self.active = 0
+        self.waiting = 0
+        self.calls = 0
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        try:
+            await self._pace()
+            self.active += 1
+            self.calls += 1
+            try:
+                yield
+            finally:
+                self.active -= 1
+        finally:
+            self._slots.release()
+
+    async def _pace(self) -> None:
+        now = asyncio.get_running_loop().time()
+        start = max(now, self._next_at)
+        self._next_at = start + self._interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "concurrency": self.limit.concurrency,
+            "per_minute": self.limit.per_minute,
+            "active": self.active,
+            "waiting": self.waiting,
+            "calls": self.calls,
+        }
+
+
+_pools: dict[str, PlatformPool] = {}
+
+
+def pool_for(platform: str) -> PlatformPool:
+    pool = _pools.get(platform)
+    if pool is None:
+        pool = _pools[platform] = PlatformPool(platform, PLATFORM_LIMITS.get(platform, DEFAULT_LIMIT))
+    return pool
+
+
+def pool_stats() -> dict[str, dict[str, Any]]:
+    return {platform: pool.stats() for platform, pool in _pools.items()}
@@ -0,0 +1,178 @@
+"""Exact wake-ups for the publisher and report loops.
+
+Postgres triggers on ``scheduled_posts`` and ``report_schedules`` send a
+``schedule_changes`` notification whenever a row's due time appears, moves or
+goes away (insert, reschedule, publish claim, cancel, delete). Each loop keeps
+a ``DueTimer`` — a heap of upcoming due times fed by those notifications — and
+sleeps exactly until the earliest one, so posts go out on time and an idle
+loop issues no queries.
+
+The heap is loaded from the table on start, after a lost LISTEN connection
+and every ``RESYNC_SECONDS`` as a safety net. While the listener is down — or
+if the triggers' migration hasn't been applied — the loops fall back to
+polling every ``FALLBACK_POLL_SECONDS``.
+"""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import logging
+from datetime import datetime
+from typing import Any, Callable
+
+from sqlalchemy import text
+
+from app.database import get_session_local
+from app.services.pg_listener import PgListener
+
+logger = logging.getLogger(__name__)
+
+
+CHANNEL = "schedule_changes"
+TRIGGERS = ("scheduled_posts_notify_change", "report_schedules_notify_change")
+RESYNC_SECONDS = 15 * 60
+FALLBACK_POLL_SECONDS = 30
+
+
+class DueTimer:
+    """Upcoming due times of one table's rows. Heap entries are invalidated
+    lazily: only the ``(at, id)`` pair matching ``_due_at[id]`` is live."""
+
+    def __init__(self, table: str, load: Callable[[], list[tuple[int, datetime]]]):
+        self.table = table
+        self._load = load
+        self._heap: list[tuple[datetime, int]] = []
+        self._due_at: dict[int, datetime] = {}
+        self._changed = asyncio.Event()
+        self._stale = True
+        self._loaded_at = 0.0
+
+    def set(self, row_id: int, at: datetime | None) -> None:
+        """Record a row's new due time (``None``: no longer due)."""
+        if at is None:
+            self._due_at.pop(row_id, None)
+        else:
+            self._due_at[row_id] = at
+            heapq.heappush(self._heap, (at, row_id))
+        self._changed.set()
+
+    def invalidate(self) -> None:
+        """Reload from the table before the next wait."""
+        self._stale = True
+        self._changed.set()
+
+    def next_due(self) -> datetime | None:
+        while self._heap:
+            at, row_id = self._heap[0]
+            if self._due_at.get(row_id) == at:
+                return at
+            heapq.heappop(self._heap)
+        return None
+
+    def pop_due(self, now: datetime) -> None:
+        """Forget entries due by ``now`` once the loop has swept them, so a
+        row the sweep didn't pick up can't make the loop spin. ``now`` must be
+        the cutoff the sweep claimed with (app clock, bound into the query),
+        so only rows it actually saw as due are dropped. Rows that stay due
+        come back with the next resync."""
+        while (at := self.next_due()) is not None and at <= now:
+            _, row_id = heapq.heappop(self._heap)
+            self._due_at.pop(row_id, None)
+
+    async def sleep_until_due(self) -> None:
+        """Return once the earliest row is due. Change notifications that
+        don't bring anything due forward just re-arm the sleep."""
+        loop = asyncio.get_running_loop()
+        while True:
+            if self._stale or loop.time() - self._loaded_at >= RESYNC_SECONDS:
+                if not await self._reload():
+                    await asyncio.sleep(FALLBACK_POLL_SECONDS)
+                    return
+            self._changed.clear()
+
+            notified = _listener.connected and _triggers_installed
+            timeout = RESYNC_SECONDS if notified else FALLBACK_POLL_SECONDS
+            at = self.next_due()
+            if at is not None:
+                until_due = (at - datetime.utcnow()).total_seconds()
+                if until_due <= 0:
+                    return
+                timeout = min(timeout, until_due)
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                if not notified:
+                    self._stale = True
+                    return
+
+    async def _reload(self) -> bool:
+        try:
+            rows = await asyncio.to_thread(self._load)
+        except Exception:  # noqa: BLE001
+            logger.exception("Loading due times for %s failed", self.table)
+            return False
+        self._stale = False
+        self._due_at = dict(rows)
+        self._heap = [(at, row_id) for row_id, at in rows]
+        heapq.heapify(self._heap)
+        self._loaded_at = asyncio.get_running_loop().time()
+        return True
+
+
+_timers: dict[str, DueTimer] = {}
+
+
+def register_timer(timer: DueTimer) -> DueTimer:
+    _timers[timer.table] = timer
+    return timer
+
+
+_triggers_installed = False
+
+
+async def start_listening() -> None:
+    global _triggers_installed
+    if not _triggers_installed:
+        try:
+            _triggers_installed = await asyncio.to_thread(_check_triggers)
+        except Exception:  # noqa: BLE001
+            logger.exception("Could not check the schedule-change triggers")
+        if not _triggers_installed:
+            logger.warning(
+                "Schedule-change triggers missing (run `alembic upgrade head`); "
+                "publisher falls back to polling every %ds", FALLBACK_POLL_SECONDS,
+            )
+    await _listener.start()
+
+
+def _check_triggers() -> bool:
+    db = get_session_local()()
+    try:
+        found = db.execute(
+            text("SELECT count(*) FROM pg_trigger WHERE tgname = ANY(:names)"),
+            {"names": list(TRIGGERS)},
+        ).scalar()
+        return found == len(TRIGGERS)
+    finally:
+        db.close()
+
+
+def _on_change(event: dict[str, Any]) -> None:
+    timer = _timers.get(event.get("table"))
+    if timer is None:
+        return
+    try:
+        row_id = int(event["id"])
+        at = datetime.fromisoformat(event["at"]) if event.get("at") else None
+    except (KeyError, TypeError, ValueError):
+        timer.invalidate()
+        return
+    timer.set(row_id, at)
+
+
+def _on_resync() -> None:
+    for timer in _timers.values():
+        timer.invalidate()
+
+
+_listener = PgListener(CHANNEL, _on_change, _on_resync)
@@ -5,8 +5,8 @@ renders a one-page PDF using ``reportlab``. The KPI numbers come from the same d
 functions that drive the analytics dashboard so a report and the live page show
 identical numbers for the same window.
 
-PDF + CSV bytes are returned to the caller; persistence in ``report_runs.pdf_bytes`` /
-``csv_bytes`` is the caller's responsibility.
+PDF + CSV bytes are returned to the caller; persisting them
+(``storage.store_report_pdf``) is the caller's responsibility.
 """
 from __future__ import annotations
 
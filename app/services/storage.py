@@ -1,19 +1,49 @@
-"""Postgres-backed media storage — replaces an S3 / MinIO layer.
+"""Media storage — replaces an S3 / MinIO layer.
 
 Per the deployment constraint (no Redis / MinIO / S3, only API + frontend + Postgres),
-file payloads live as ``BYTEA`` on the ``media_assets.content`` column. This module is
-the only place that touches that column directly so size limits, mime sniffing, and
-quota enforcement are centralised.
+file payloads live as ``BYTEA`` in Postgres by default, or as files on a local
+or mounted volume (``blob_backends``). This module is the only place the rest
+of the app goes through for payloads, so size limits, mime sniffing, and quota
+enforcement are centralised.
+
+Storage is content-addressed: payloads live on ``media_blobs``, one row per
+SHA-256, and every ``media_assets`` row with those bytes points at it (legacy
+rows may still carry their own ``content``). Uploads are hashed in a first pass
+over the spooled file; if the blob already exists the upload only bumps its
+``ref_count`` and no bytes are written. Otherwise the configured backend
+ingests the file in chunks, in the same transaction as the blob row — the API
+process never holds more than one chunk of an upload, however large the file.
+Readers go through ``open_payload``, which resolves the backend of each blob.
+Blobs no live asset references are removed by ``purge_media_blobs_loop``.
+
+Generated report PDFs are stored the same way (``store_report_pdf``):
+``report_runs.pdf_sha256`` points at their blob, read with ``open_blob``.
 """
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import io
 import logging
-from typing import IO
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import IO, Callable
 
 from fastapi import UploadFile
-from sqlalchemy.orm import Session
+from sqlalchemy import case, delete, func, select, update
+from sqlalchemy.orm import Session, defer
 
-from app.models.media_asset import KIND_IMAGE, KIND_VIDEO, MediaAssetModel
+from app.database import get_session_local
+from app.models.media_asset import (
+    KIND_IMAGE,
+    KIND_VIDEO,
+    MediaAssetModel,
+    MediaBlobModel,
+    MediaRenditionModel,
+)
+from app.models.report_run import ReportRunModel
+from app.services import blob_backends
+from app.services.byte_serving import RangeReader, column_range_reader, sha256_sql
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +53,13 @@ logger = logging.getLogger(__name__)
 MAX_IMAGE_BYTES = 10 * 1024 * 1024     # 10 MiB
 MAX_VIDEO_BYTES = 100 * 1024 * 1024    # 100 MiB
 
+INGEST_CHUNK_BYTES = 4 * 1024 * 1024
+
+# Unreferenced blobs are kept this long (a deleted asset's bytes come back
+# for free if re-uploaded meanwhile), and purged this often.
+BLOB_PURGE_GRACE = timedelta(days=1)
+BLOB_PURGE_INTERVAL_SECONDS = 60 * 60
+
 _IMAGE_MIMES: frozenset[str] = frozenset({
     "image/jpeg", "image/png", "image/gif", "image/webp",
 })
@@ -55,16 +92,23 @@ async def store(
     upload: UploadFile,
     uploader_user_id: int | None = None,
 ) -> MediaAssetModel:
-    """Persist an uploaded file as a row in ``media_assets`` and return the row."""
+    """Persist an uploaded file as a row in ``media_assets`` — sharing the blob
+    of any identical earlier upload — and return the row."""
     mime = (upload.content_type or "").lower()
     kind = kind_for(mime)
     cap = MAX_VIDEO_BYTES if kind == KIND_VIDEO else MAX_IMAGE_BYTES
 
-    raw = await upload.read()
-    if len(raw) == 0:
+    # Pass 1: size-check and hash the spooled upload without touching the DB.
+    digest = hashlib.sha256()
+    size = 0
+    while chunk := await upload.read(INGEST_CHUNK_BYTES):
+        size += len(chunk)
+        if size > cap:
+            raise StorageError(f"File exceeds the {cap // (1024 * 1024)} MiB limit for {kind}s")
+        digest.update(chunk)
+    if size == 0:
         raise StorageError("Empty file")
-    if len(raw) > cap:
-        raise StorageError(f"File exceeds the {cap // (1024 * 1024)} MiB limit for {kind}s")
+    sha256 = digest.hexdigest()
 
     asset = MediaAssetModel(
         brand_id=brand_id,
@@ -72,17 +116,72 @@ async def store(
         kind=kind,
         filename=upload.filename or "upload",
         mime=mime,
-        size_bytes=len(raw),
-        content=raw,
+        size_bytes=size,
+        sha256=sha256,
     )
-    db.add(asset)
-    db.commit()
+    # Pass 2 (bytes only written if not stored yet).
+    await _commit_with_blob(db, upload, sha256, size, lambda: db.add(asset))
     db.refresh(asset)
     return asset
 
 
+async def store_report_pdf(db: Session, run: ReportRunModel, pdf: bytes) -> None:
+    """Store a generated report's PDF as a blob on the configured backend and
+    point ``run`` at it. Commits ``db``, with whatever else the caller changed
+    on ``run``."""
+    sha256 = hashlib.sha256(pdf).hexdigest()
+
+    def attach() -> None:
+        run.pdf_sha256 = sha256
+        run.pdf_bytes = None
+
+    await _commit_with_blob(db, UploadFile(io.BytesIO(pdf)), sha256, len(pdf), attach)
+
+
+async def _commit_with_blob(
+    db: Session,
+    upload: UploadFile,
+    sha256: str,
+    size: int,
+    attach: Callable[[], None],
+) -> None:
+    """Reference the blob for ``sha256`` — ingesting ``upload`` if it isn't
+    stored yet — stage the row pointing at it (``attach``) and commit, all in
+    one transaction."""
+    ingested_to = None
+    try:
+        if not await asyncio.to_thread(_reference_blob, db, sha256):
+            await upload.seek(0)
+            ingested_to = blob_backends.default_backend()
+            await ingested_to.ingest(db, upload, sha256, size)
+        attach()
+        db.commit()
+    except BaseException:
+        db.rollback()
+        if ingested_to is not None:
+            # The blob row is gone with the rollback; drop any bytes the
+            # backend already stored outside the transaction (a placed file).
+            try:
+                blob_backends.discard_copy(ingested_to, sha256)
+            except Exception:  # noqa: BLE001
+                logger.exception("Discarding the copy of rolled-back blob %s failed", sha256)
+        raise
+
+
+def _reference_blob(db: Session, sha256: str) -> bool:
+    """Take a reference on an existing blob. The row lock also orders this
+    against a concurrent purge: whichever commits first wins."""
+    return db.execute(
+        update(MediaBlobModel)
+        .where(MediaBlobModel.sha256 == sha256)
+        .values(ref_count=MediaBlobModel.ref_count + 1, unreferenced_since=None)
+        .returning(MediaBlobModel.id)
+    ).first() is not None
+
+
 def read(db: Session, asset_id: int, brand_id: int) -> MediaAssetModel | None:
-    """Fetch the asset row including its bytes, scoped to the brand."""
+    """Fetch the asset row, scoped to the brand. Bytes are read separately
+    (``open_payload``)."""
     return (
         db.query(MediaAssetModel)
         .filter(
@@ -94,6 +193,128 @@ def read(db: Session, asset_id: int, brand_id: int) -> MediaAssetModel | None:
     )
 
 
+def read_meta(db: Session, asset_id: int, brand_id: int) -> MediaAssetModel | None:
+    """Like ``read`` but with ``content`` deferred, and ``sha256`` filled in
+    (hashed in Postgres) for assets stored before digests were recorded."""
+    asset = (
+        db.query(MediaAssetModel)
+        .options(defer(MediaAssetModel.content))
+        .filter(
+            MediaAssetModel.id == asset_id,
+            MediaAssetModel.brand_id == brand_id,
+            MediaAssetModel.deleted_at.is_(None),
+        )
+        .first()
+    )
+    if asset is not None and not asset.sha256:
+        asset.sha256 = db.execute(
+            update(MediaAssetModel)
+            .where(MediaAssetModel.id == asset_id)
+            .values(sha256=sha256_sql(MediaAssetModel.content))
+            .returning(MediaAssetModel.sha256)
+        ).scalar()
+        db.commit()
+    return asset
+
+
+@dataclass(frozen=True)
+class Payload:
+    """An asset's bytes, wherever they live: ``read`` slices them and
+    ``path`` is the file holding them, if the backend stores files."""
+
+    read: RangeReader
+    path: str | None = None
+    size: int | None = None
+
+
+def open_payload(db: Session, asset_id: int) -> Payload:
+    """Resolve which backend holds an asset's bytes. Callers reading many
+    ranges open the payload once and reuse it."""
+    row = db.execute(
+        select(MediaBlobModel.backend, MediaAssetModel.sha256)
+        .select_from(MediaAssetModel)
+        .outerjoin(MediaBlobModel, MediaBlobModel.sha256 == MediaAssetModel.sha256)
+        .where(MediaAssetModel.id == asset_id)
+    ).first()
+    if row is None:
+        raise StorageError(f"Asset {asset_id} not found")
+    backend_name, sha256 = row
+    if backend_name is None:
+        # Written before blobs existed: the bytes are on the asset row.
+        return Payload(column_range_reader(MediaAssetModel.content, MediaAssetModel.id, asset_id))
+    backend = blob_backends.get_backend(backend_name)
+    return Payload(backend.reader(sha256), backend.local_path(sha256))
+
+
+def open_blob(db: Session, sha256: str) -> Payload | None:
+    """The bytes of the blob ``sha256`` (with its size), or ``None`` if there
+    is no such blob."""
+    row = db.execute(
+        select(MediaBlobModel.backend, MediaBlobModel.size_bytes).where(MediaBlobModel.sha256 == sha256)
+    ).first()
+    if row is None:
+        return None
+    backend = blob_backends.get_backend(row.backend)
+    return Payload(backend.reader(sha256), backend.local_path(sha256), row.size_bytes)
+
+
+async def open_payload_async(asset_id: int) -> Payload:
+    """``open_payload`` on its own short-lived session, off the event loop."""
+    def run() -> Payload:
+        db = get_session_local()()
+        try:
+            return open_payload(db, asset_id)
+        finally:
+            db.close()
+
+    return await asyncio.to_thread(run)
+
+
+async def read_range_async(asset_id: int, offset: int, length: int) -> bytes:
+    """Bytes ``[offset, offset + length)`` of an asset's payload. Only the
+    range is transferred and held in memory."""
+    payload = await open_payload_async(asset_id)
+    return await payload.read(offset, length)
+
+
+def find_rendition(db: Session, source_sha256: str | None, variant: str) -> MediaRenditionModel | None:
+    """A ``media_pipeline`` rendition of the given payload (``content`` deferred)."""
+    if not source_sha256:
+        return None
+    return (
+        db.query(MediaRenditionModel)
+        .options(defer(MediaRenditionModel.content))
+        .filter(
+            MediaRenditionModel.source_sha256 == source_sha256,
+            MediaRenditionModel.variant == variant,
+        )
+        .first()
+    )
+
+
+def rendition_reader(rendition_id: int) -> RangeReader:
+    return column_range_reader(MediaRenditionModel.content, MediaRenditionModel.id, rendition_id)
+
+
+async def read_for_platform(asset: MediaAssetModel, platform: str) -> tuple[bytes, str, str]:
+    """``(bytes, mime, filename)`` to upload an image to ``platform``: its
+    optimised rendition when the pipeline made one, else the original."""
+    def lookup() -> tuple[int, int, str] | None:
+        db = get_session_local()()
+        try:
+            rendition = find_rendition(db, asset.sha256, platform)
+            return (rendition.id, rendition.size_bytes, rendition.mime) if rendition else None
+        finally:
+            db.close()
+
+    found = await asyncio.to_thread(lookup)
+    if found is None:
+        return await read_range_async(asset.id, 0, asset.size_bytes), asset.mime, asset.filename
+    rendition_id, size, mime = found
+    stem = asset.filename.rsplit(".", 1)[0]
+    return await rendition_reader(rendition_id)(0, size), mime, f"{stem}.{mime.split('/')[-1]}"
+
+
 def list_for_brand(
     db: Session,
     brand_id: int,
@@ -118,8 +339,69 @@ def soft_delete(db: Session, asset_id: int, brand_id: int) -> bool:
     asset = read(db, asset_id, brand_id)
     if not asset:
         return False
-    from datetime import datetime
-    asset.deleted_at = datetime.utcnow()
-    asset.updated_at = datetime.utcnow()
+    now = datetime.utcnow()
+    asset.deleted_at = now
+    asset.updated_at = now
+    if asset.sha256:
+        db.execute(
+            update(MediaBlobModel)
+            .where(MediaBlobModel.sha256 == asset.sha256)
+            .values(
+                ref_count=func.greatest(MediaBlobModel.ref_count - 1, 0),
+                unreferenced_since=case((MediaBlobModel.ref_count <= 1, now), else_=None),
+            )
+        )
     db.commit()
     return True
+
+
+def purge_unreferenced_blobs(db: Session, now: datetime) -> int:
+    """Delete blobs unreferenced for longer than ``BLOB_PURGE_GRACE``, with
+    their renditions and stored files. A blob a live asset still points at is
+    kept even if its count drifted to zero."""
+    live = select(MediaAssetModel.id).where(
+        MediaAssetModel.sha256 == MediaBlobModel.sha256,
+        MediaAssetModel.deleted_at.is_(None),
+    )
+    purged = db.execute(
+        delete(MediaBlobModel)
+        .where(
+            MediaBlobModel.ref_count <= 0,
+            MediaBlobModel.unreferenced_since < now - BLOB_PURGE_GRACE,
+            ~live.exists(),
+        )
+        .returning(MediaBlobModel.sha256, MediaBlobModel.backend)
+    ).all()
+    if purged:
+        db.execute(delete(MediaRenditionModel).where(
+            MediaRenditionModel.source_sha256.in_([sha256 for sha256, _ in purged])
+        ))
+    db.commit()
+    # Files go after the rows are gone; a hash re-uploaded meanwhile keeps
+    # its file (``discard`` re-checks under the hash's lock).
+    for sha256, backend_name in purged:
+        if backend_name != blob_backends.BACKEND_POSTGRES:
+            blob_backends.get_backend(backend_name).discard(db, sha256)
+            db.commit()
+    return len(purged)
+
+
+async def purge_media_blobs_loop() -> None:
+    """Forever-loop that deletes unreferenced media blobs."""
+    logger.info("Media blob purge loop starting (interval=%ds)", BLOB_PURGE_INTERVAL_SECONDS)
+    while True:
+        try:
+            purged = await asyncio.to_thread(_purge_once)
+            if purged:
+                logger.info("Purged %d unreferenced media blob(s)", purged)
+        except Exception:  # noqa: BLE001
+            logger.exception("Media blob purge iteration crashed; continuing")
+        await asyncio.sleep(BLOB_PURGE_INTERVAL_SECONDS)
+
+
+def _purge_once() -> int:
+    db = get_session_local()()
+    try:
+        return purge_unreferenced_blobs(db, datetime.utcnow())
+    finally:
+        db.close()
@@ -162,6 +162,9 @@ async def on_startup():
     import app.models.competitor_analysis_result    # noqa: ensure ORM model is registered
     import app.models.competitor_target              # noqa: ensure ORM model is registered
     import app.models.apify_run                       # noqa: ensure ORM model is registered
+    import app.models.apify_usage                     # noqa: ensure ORM model is registered
+    import app.models.competitor_metric               # noqa: ensure ORM model is registered
+    import app.models.competitor_media                # noqa: ensure ORM model is registered
     import app.models.campaign_tag                    # noqa
     import app.models.media_asset                     # noqa
     import app.models.scheduled_post                  # noqa
@@ -231,9 +234,17 @@ async def on_startup():
             JOB_STATUS_PENDING,
             JOB_STATUS_RUNNING,
         )
+        from app.models.competitor_analysis_result import CompetitorAnalysisResultModel
+        from app.repositories.competitor_analysis_result import resumable_checkpoint
         cutoff = datetime.utcnow() - timedelta(seconds=30)
         db = get_session_local()()
         try:
+            # Checkpointed Apify runs keep going across restarts — the resume
+            # loop re-attaches to them, so leave those jobs/results running.
+            resumable_jobs = db.query(CompetitorAnalysisResultModel.job_id).filter(
+                resumable_checkpoint(),
+                CompetitorAnalysisResultModel.job_id.isnot(None),
+            )
             stuck = (
                 db.query(CompetitorAnalysisJobModel)
                 .filter(
@@ -242,9 +253,11 @@ async def on_startup():
                         [JOB_STATUS_PENDING, JOB_STATUS_RUNNING]
                     ),
                     CompetitorAnalysisJobModel.created_at < cutoff,
+                    CompetitorAnalysisJobModel.id.notin_(resumable_jobs),
                 )
                 .all()
             )
+            from app.services.competitor_analysis.events import notify as notify_scrape_event
             now = datetime.utcnow()
             for job in stuck:
                 job.status = JOB_STATUS_FAILED
@@ -254,6 +267,7 @@ async def on_startup():
                 )
                 job.finished_at = now
                 job.updated_at = now
+                notify_scrape_event(db, job_id=job.id, result_id=None, status=JOB_STATUS_FAILED)
             if stuck:
                 db.commit()
                 logger.info("Recovered %d orphaned competitor-analysis job(s)", len(stuck))
@@ -275,6 +289,7 @@ async def on_startup():
                         [RESULT_STATUS_PENDING, RESULT_STATUS_RUNNING]
                     ),
                     CompetitorAnalysisResultModel.created_at < cutoff,
+                    ~resumable_checkpoint(),
                 )
                 .all()
             )
@@ -286,6 +301,7 @@ async def on_startup():
                 )
                 r.finished_at = now
                 r.updated_at = now
+                notify_scrape_event(db, job_id=r.job_id, result_id=r.id, status=RESULT_STATUS_FAILED)
             if stuck_results:
                 db.commit()
                 logger.info("Recovered %d orphaned competitor-analysis result(s)", len(stuck_results))
@@ -311,6 +327,44 @@ async def on_startup():
     except Exception as exc:  # noqa: BLE001
         logger.warning("Publisher loops failed to start: %s", exc)
 
+    # Recurring competitor refresh — same in-process task model as the loops above.
+    if settings.competitor_refresh_enabled:
+        try:
+            from app.services.competitor_analysis.refresh import refresh_due_targets_loop
+            import asyncio as _asyncio_for_refresh
+            _asyncio_for_refresh.create_task(refresh_due_targets_loop())
+            logger.info("Competitor refresh loop started")
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Competitor refresh loop failed to start: %s", exc)
+
+    # Re-attach to Apify runs a previous worker left checkpointed mid-flight.
+    try:
+        from app.services.competitor_analysis.resume import resume_interrupted_runs_loop
+        import asyncio as _asyncio_for_resume
+        _asyncio_for_resume.create_task(resume_interrupted_runs_loop())
+        logger.info("Competitor run resume loop started")
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("Competitor run resume loop failed to start: %s", exc)
+
+    # Drop media blobs no asset references any more.
+    try:
+        from app.services.storage import purge_media_blobs_loop
+        import asyncio as _asyncio_for_purge
+        _asyncio_for_purge.create_task(purge_media_blobs_loop())
+        logger.info("Media blob purge loop started")
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("Media blob purge loop failed to start: %s", exc)
+
+    # Dimensions, previews and platform renditions for uploaded media.
+    if settings.media_pipeline_enabled:
+        try:
+            from app.services.media_pipeline import media_pipeline_loop
+            import asyncio as _asyncio_for_media
+            _asyncio_for_media.create_task(media_pipeline_loop())
+            logger.info("Media pipeline started")
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Media pipeline failed to start: %s", exc)
+
     logger.info("Server ready")
 
 
@@ -320,7 +374,9 @@ async def on_shutdown():
 
     Background tasks get cancelled at shutdown — without this the rows stay at
     ``running`` until the next start-up reaper sweep, which delays the failure
-    surfaced to the user. Best-effort: if it crashes we just log and move on.
+    surfaced to the user. Scrapes with a checkpointed Apify run are left
+    running for the resume loop to pick up. Best-effort: if it crashes we just
+    log and move on.
     """
     try:
         from datetime import datetime
@@ -338,9 +394,16 @@ async def on_shutdown():
             RESULT_STATUS_RUNNING,
         )
 
+        from app.repositories.competitor_analysis_result import resumable_checkpoint
+        from app.services.competitor_analysis.events import notify as notify_scrape_event
+
         db = get_session_local()()
         try:
             now = datetime.utcnow()
+            resumable_jobs = db.query(CompetitorAnalysisResultModel.job_id).filter(
+                resumable_checkpoint(),
+                CompetitorAnalysisResultModel.job_id.isnot(None),
+            )
             interrupted_msg = (
                 "Run interrupted — the server was stopped or restarted before "
                 "this scraper finished. Run the scraper again to retry."
@@ -353,6 +416,7 @@ async def on_shutdown():
                     CompetitorAnalysisJobModel.status.in_(
                         [JOB_STATUS_PENDING, JOB_STATUS_RUNNING]
                     ),
+                    CompetitorAnalysisJobModel.id.notin_(resumable_jobs),
                 )
                 .all()
             )
@@ -361,6 +425,7 @@ async def on_shutdown():
                 j.error_message = interrupted_msg
                 j.finished_at = now
                 j.updated_at = now
+                notify_scrape_event(db, job_id=j.id, result_id=None, status=JOB_STATUS_FAILED)
 
             results = (
                 db.query(CompetitorAnalysisResultModel)
@@ -369,6 +434,7 @@ async def on_shutdown():
                     CompetitorAnalysisResultModel.status.in_(
                         [RESULT_STATUS_PENDING, RESULT_STATUS_RUNNING]
                     ),
+                    ~resumable_checkpoint(),
                 )
                 .all()
             )
@@ -377,6 +443,7 @@ async def on_shutdown():
                 r.error = interrupted_msg
                 r.finished_at = now
                 r.updated_at = now
+                notify_scrape_event(db, job_id=r.job_id, result_id=r.id, status=RESULT_STATUS_FAILED)
 
             if jobs or results:
                 db.commit()
@@ -0,0 +1,225 @@
+"""Benchmark the compiled Facebook Ads normalizer against the alias-per-field original.
+
+``normalize_facebook_ads`` now compiles its key aliases once per dataset
+(``competitor_analysis.extractors``). This script keeps the previous
+implementation as the reference, checks that both produce byte-identical JSON
+for every dataset, and times them.
+
+Run from project root:
+    python ad-sync-py/scripts/benchmark_normalizers.py
+    python ad-sync-py/scripts/benchmark_normalizers.py recorded_ads_1.json recorded_ads_2.json
+
+Dataset files are recorded Apify dataset items (the JSON array returned by
+``GET /datasets/{id}/items``). Without files, synthetic datasets are generated
+in each key dialect plus a mixed one. Exits non-zero if any output differs.
+
+The normalizer only reads the first 60 ads, so timings don't grow with
+dataset size; ``--repeat`` controls how many runs the best time is taken from.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+# Make the app package importable when run from project root or scripts dir.
+HERE = Path(__file__).resolve()
+sys.path.insert(0, str(HERE.parents[1]))
+
+from app.services.competitor_analysis.normalizers import (  # noqa: E402
+    NormalizedResult,
+    _clean_ad_body,
+    _to_iso_date,
+    _truncate,
+    normalize_facebook_ads,
+)
+
+
+# ── Reference implementation (pre-compilation, kept verbatim) ─────────────────
+
+def _pick(d: dict[str, Any], *keys: str) -> Any:
+    """Return the first non-empty value among the given keys."""
+    for k in keys:
+        v = d.get(k)
+        if v not in (None, "", [], {}):
+            return v
+    return None
+
+
+def reference_facebook_ads(
+    items: list[dict[str, Any]],
+    brand_name: str | None = None,
+) -> NormalizedResult:
+    ads: list[dict[str, Any]] = []
+    for raw in items[:60]:
+        snap = raw.get("snapshot") or {}
+
+        body_text = _pick(
+            snap, "body"
+        )
+        if isinstance(body_text, dict):
+            body_text = body_text.get("text") or body_text.get("markup")
+        body_text = body_text or _pick(raw, "ad_creative_body", "body", "adCreativeBody")
+        body_text = _clean_ad_body(body_text, brand_name)
+
+        media: list[dict[str, str]] = []
+
+        for c in (snap.get("cards") or [])[:3]:
+            url = _pick(
+                c,
+                "video_preview_image_url", "videoPreviewImageUrl",
+                "resized_image_url", "resizedImageUrl",
+                "original_image_url", "originalImageUrl",
+            )
+            if url:
+                has_video = bool(_pick(c, "video_hd_url", "videoHdUrl", "video_sd_url", "videoSdUrl"))
+                media.append({"url": url, "type": "video" if has_video else "image"})
+
+        if not media:
+            for v in (snap.get("videos") or [])[:1]:
+                url = _pick(
+                    v,
+                    "video_preview_image_url", "videoPreviewImageUrl",
+                    "video_hd_url", "videoHdUrl",
+                )
+                if url:
+                    media.append({"url": url, "type": "video"})
+            for i in (snap.get("images") or [])[:2]:
+                url = _pick(
+                    i,
+                    "resized_image_url", "resizedImageUrl",
+                    "original_image_url", "originalImageUrl",
+                )
+                if url:
+                    media.append({"url": url, "type": "image"})
+
+        page_name = _pick(
+            raw, "page_name", "pageName"
+        ) or _pick(snap, "page_name", "pageName")
+
+        page_url = _pick(raw, "page_url", "pageUrl") or _pick(snap, "page_profile_uri", "pageProfileUri")
+
+        ad_entry = {
+            "id": _pick(raw, "ad_archive_id", "adArchiveId", "id"),
+            "page_name": page_name,
+            "page_url": page_url,
+            "body": _truncate(body_text, 600),
+            "cta": _pick(snap, "cta_text", "ctaText") or _pick(raw, "cta_text", "ctaText"),
+            "link_url": _pick(snap, "link_url", "linkUrl") or _pick(raw, "link_url", "linkUrl"),
+            "start_date": _to_iso_date(_pick(raw, "start_date", "startDate", "start_date_string")),
+            "end_date": _to_iso_date(_pick(raw, "end_date", "endDate", "end_date_string")),
+            "is_active": raw.get("is_active") if raw.get("is_active") is not None else raw.get("isActive"),
+            "platforms": _pick(raw, "publisher_platform", "publisherPlatform", "publisher_platforms") or [],
+            "regions": _pick(raw, "regions", "eu_total_reach_breakdown") or [],
+            "media": media,
+        }
+
+        # Drop ads with no usable signal: no page name AND no media AND no body.
+        if not (ad_entry["page_name"] or ad_entry["media"] or ad_entry["body"]):
+            continue
+        ads.append(ad_entry)
+
+    active = sum(1 for a in ads if a.get("is_active"))
+    page_names = sorted({a["page_name"] for a in ads if a.get("page_name")})
+
+    return ads, {
+        "ads_total": len(ads),
+        "ads_active": active,
+        "pages": page_names[:5],
+    }
+
+
+# ── Synthetic datasets ────────────────────────────────────────────────────────
+
+def _maybe(rng: random.Random, value: Any, p_empty: float = 0.15) -> Any:
+    """Mostly ``value``, sometimes one of the empty shapes the aliases skip."""
+    return rng.choice([None, "", [], {}]) if rng.random() < p_empty else value
+
+
+def _facebook_ad(rng: random.Random, i: int, camel: bool) -> dict[str, Any]:
+    k = (lambda snake, cam: cam) if camel else (lambda snake, cam: snake)
+    card = {
+        k("resized_image_url", "resizedImageUrl"): _maybe(rng, f"https://cdn.example/{i}.jpg"),
+        k("video_hd_url", "videoHdUrl"): _maybe(rng, f"https://cdn.example/{i}.mp4", 0.6),
+    }
+    return {
+        k("ad_archive_id", "adArchiveId"): str(10_000 + i),
+        k("page_name", "pageName"): _maybe(rng, f"Brand {i % 7}"),
+        k("start_date", "startDate"): 1_735_603_200 + i * 86_400,
+        k("end_date", "endDate"): _maybe(rng, 1_736_603_200 + i * 86_400),
+        "is_active": rng.random() < 0.5,
+        k("publisher_platform", "publisherPlatform"): ["facebook", "instagram"],
+        "snapshot": {
+            "body": _maybe(rng, {"text": f"Offer {i} for {{{{product.brand}}}} fans"}),
+            k("cta_text", "ctaText"): _maybe(rng, "Shop now"),
+            k("link_url", "linkUrl"): f"https://shop.example/{i}",
+            "cards": [card] * rng.randint(0, 3),
+            "images": [{k("original_image_url", "originalImageUrl"): f"https://cdn.example/{i}-o.jpg"}],
+        },
+    }
+
+
+def _synthetic_datasets(size: int) -> list[tuple[str, list[dict[str, Any]]]]:
+    rng = random.Random(42)
+    return [
+        ("snake_case", [_facebook_ad(rng, i, False) for i in range(size)]),
+        ("camelCase", [_facebook_ad(rng, i, True) for i in range(size)]),
+        # Both dialects in one dataset — every alias stays live.
+        ("mixed", [_facebook_ad(rng, i, bool(i % 2)) for i in range(size)]),
+    ]
+
+
+# ── Runner ────────────────────────────────────────────────────────────────────
+
+def _encode(result: Any) -> bytes:
+    return json.dumps(result, ensure_ascii=False, default=str).encode("utf-8")
+
+
+def _best_of(fn: Callable[..., Any], items: list[dict[str, Any]], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(items)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("datasets", nargs="*", type=Path, help="recorded Apify dataset JSON files")
+    parser.add_argument("--size", type=int, default=60, help="items per synthetic dataset")
+    parser.add_argument("--repeat", type=int, default=200, help="timing runs per dataset (best is kept)")
+    args = parser.parse_args()
+
+    if args.datasets:
+        datasets = [
+            (path.name, json.loads(path.read_text(encoding="utf-8")))
+            for path in args.datasets
+        ]
+    else:
+        datasets = _synthetic_datasets(args.size)
+
+    mismatches = 0
+    print(f"{'dataset':28s} {'items':>7s} {'reference':>11s} {'compiled':>11s} {'speedup':>8s}  output")
+    for label, items in datasets:
+        identical = _encode(reference_facebook_ads(items)) == _encode(normalize_facebook_ads(items))
+        mismatches += not identical
+        ref_s = _best_of(reference_facebook_ads, items, args.repeat)
+        new_s = _best_of(normalize_facebook_ads, items, args.repeat)
+        print(
+            f"{label:28s} {len(items):7d} {ref_s * 1000:9.3f}ms {new_s * 1000:9.3f}ms "
+            f"{ref_s / new_s if new_s else float('inf'):7.2f}x  {'identical' if identical else 'DIFFERS'}"
+        )
+
+    if mismatches:
+        print(f"\n{mismatches} dataset(s) produced different output", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
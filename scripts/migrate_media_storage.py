@@ -0,0 +1,81 @@
+"""Move stored media blobs to another storage backend, without downtime.
+
+Set ``MEDIA_STORAGE_BACKEND`` to the target (and ``MEDIA_STORAGE_ROOT`` for the
+filesystem backend) on every API process first, so new uploads land there;
+then copy the existing blobs:
+
+Run from project root:
+    python ad-sync-py/scripts/migrate_media_storage.py --to filesystem
+    python ad-sync-py/scripts/migrate_media_storage.py --to filesystem --limit 500
+
+Each blob is copied, verified against its SHA-256 and switched over while the
+app keeps serving it (``app.services.blob_migration``). The old copies are kept
+until a later run with ``--finalize``, which drops those switched more than
+``--grace-minutes`` ago:
+
+    python ad-sync-py/scripts/migrate_media_storage.py --finalize
+
+Report PDFs generated before they were stored as blobs sit inline in
+``report_runs.pdf_bytes``; ``--report-pdfs`` moves them onto the configured
+backend:
+
+    python ad-sync-py/scripts/migrate_media_storage.py --report-pdfs
+
+Exits non-zero if any copy failed verification.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Make the app package importable when run from project root or scripts dir.
+HERE = Path(__file__).resolve()
+sys.path.insert(0, str(HERE.parents[1]))
+
+from app.services import blob_backends, blob_migration  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--to",
+        choices=[blob_backends.BACKEND_POSTGRES, blob_backends.BACKEND_FILESYSTEM],
+        help="backend to move blobs to",
+    )
+    parser.add_argument("--limit", type=int, default=None, help="move at most this many blobs")
+    parser.add_argument("--finalize", action="store_true", help="drop old copies of moved blobs")
+    parser.add_argument(
+        "--report-pdfs", action="store_true", help="move inline report PDFs to the configured backend",
+    )
+    parser.add_argument(
+        "--grace-minutes",
+        type=int,
+        default=int(blob_migration.FINALIZE_GRACE.total_seconds() // 60),
+        help="only finalize blobs moved at least this long ago",
+    )
+    args = parser.parse_args()
+    if not args.to and not args.finalize and not args.report_pdfs:
+        parser.error("pass --to, --finalize and/or --report-pdfs")
+
+    failed = 0
+    if args.to:
+        report = asyncio.run(blob_migration.migrate(args.to, limit=args.limit))
+        failed = len(report.failed)
+        print(f"moved {report.moved}, skipped {report.skipped}, failed {failed} blob(s) to {args.to}")
+        for sha256 in report.failed:
+            print(f"  copy does not match: {sha256}")
+    if args.report_pdfs:
+        moved = asyncio.run(blob_migration.move_report_pdfs(limit=args.limit))
+        print(f"moved {moved} report PDF(s) to {blob_backends.default_backend().name}")
+    if args.finalize:
+        grace = timedelta(minutes=args.grace_minutes)
+        finalized = blob_migration.finalize(datetime.utcnow(), grace)
+        print(f"dropped old copies of {finalized} blob(s)")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
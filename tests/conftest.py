@@ -0,0 +1,52 @@
+"""Shared fixtures.
+
+Tests that need Postgres (``DISTINCT ON``, JSONB) run against
+``TEST_DATABASE_URL`` and are skipped when it isn't set. Each test runs inside
+a transaction that is rolled back, tables included.
+"""
+from __future__ import annotations
+
+import importlib
+import os
+import pkgutil
+
+import pytest
+
+# Settings are read at import time; give the required ones harmless defaults.
+os.environ.setdefault("SECRET_KEY", "test")
+os.environ.setdefault("SESSION_STORAGE", "test")
+os.environ.setdefault("DATABASE_URL", os.environ.get("TEST_DATABASE_URL", "postgresql://localhost/test"))
+
+
+@pytest.fixture
+def pg_connection():
+    url = os.environ.get("TEST_DATABASE_URL")
+    if not url:
+        pytest.skip("TEST_DATABASE_URL not set")
+
+    from sqlalchemy import create_engine
+
+    import app.models
+    from app.database import Base
+
+    for module in pkgutil.iter_modules(app.models.__path__):
+        importlib.import_module(f"app.models.{module.name}")
+
+    engine = create_engine(url)
+    connection = engine.connect()
+    transaction = connection.begin()
+    Base.metadata.create_all(connection)
+    try:
+        yield connection
+    finally:
+        transaction.rollback()
+        connection.close()
+        engine.dispose()
+
+
+@pytest.fixture
+def session_factory(pg_connection):
+    """Sessions on the test transaction; their commits become savepoints."""
+    from sqlalchemy.orm import sessionmaker
+
+    return sessionmaker(bind=pg_connection, join_transaction_mode="create_savepoint")
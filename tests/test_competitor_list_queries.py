@@ -0,0 +1,84 @@
+"""``list_competitors`` issues a fixed number of queries, however many
+competitors the brand has (no per-competitor job / summary / target lookups)."""
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from sqlalchemy import event
+
+from app.models.brand import BrandModel
+from app.models.competitor import CompetitorModel
+from app.models.competitor_analysis_job import JOB_STATUS_COMPLETED, CompetitorAnalysisJobModel
+from app.models.competitor_analysis_result import (
+    ACTOR_INSTAGRAM,
+    RESULT_STATUS_COMPLETED,
+    CompetitorAnalysisResultModel,
+)
+from app.models.competitor_target import TARGET_TYPE_HANDLE, CompetitorTargetModel
+from app.routers.competitors import router as competitors_router
+
+
+def _seed_brand(db, competitors: int) -> int:
+    brand = BrandModel(name="Brand")
+    db.add(brand)
+    db.flush()
+    base = datetime(2026, 1, 1)
+    for i in range(competitors):
+        comp = CompetitorModel(brand_id=brand.id, name=f"Competitor {i}", slug=f"competitor-{i}")
+        db.add(comp)
+        db.flush()
+        db.add(CompetitorTargetModel(
+            competitor_id=comp.id, brand_id=brand.id, actor_key=ACTOR_INSTAGRAM,
+            target_value=f"@competitor{i}", target_type=TARGET_TYPE_HANDLE,
+        ))
+        for age in (2, 1):
+            job = CompetitorAnalysisJobModel(
+                competitor_id=comp.id, brand_id=brand.id, status=JOB_STATUS_COMPLETED,
+                actors_total=1, actors_done=1, created_at=base - timedelta(days=age),
+            )
+            db.add(job)
+            db.flush()
+            db.add(CompetitorAnalysisResultModel(
+                job_id=job.id, competitor_id=comp.id, brand_id=brand.id,
+                actor_key=ACTOR_INSTAGRAM, status=RESULT_STATUS_COMPLETED,
+                summary={"job_id": job.id},
+            ))
+    db.commit()
+    return brand.id
+
+
+def _count_list_queries(monkeypatch, session_factory, pg_connection, brand_id: int) -> tuple[int, dict]:
+    monkeypatch.setattr(competitors_router, "get_session_local", lambda: session_factory)
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(pg_connection, "before_cursor_execute", record)
+    try:
+        response = asyncio.run(competitors_router.list_competitors(brand=SimpleNamespace(id=brand_id)))
+    finally:
+        event.remove(pg_connection, "before_cursor_execute", record)
+    # Savepoint bookkeeping isn't a query the endpoint makes.
+    return len([s for s in statements if "SAVEPOINT" not in s.upper()]), response
+
+
+def test_list_competitors_query_count_is_constant(monkeypatch, session_factory, pg_connection):
+    db = session_factory()
+    one = _seed_brand(db, competitors=1)
+    many = _seed_brand(db, competitors=25)
+    db.close()
+
+    count_one, response_one = _count_list_queries(monkeypatch, session_factory, pg_connection, one)
+    count_many, response_many = _count_list_queries(monkeypatch, session_factory, pg_connection, many)
+
+    # Competitors, latest jobs, their summaries, targets.
+    assert count_one == count_many == 4
+    assert response_one["data"]["total"] == 1
+    assert response_many["data"]["total"] == 25
+    for competitor in response_many["data"]["competitors"]:
+        last_job = competitor["last_job"]
+        assert competitor["summaries"] == {ACTOR_INSTAGRAM: {"job_id": last_job["id"]}}
+        assert [t["actor_key"] for t in competitor["targets"]] == [ACTOR_INSTAGRAM]
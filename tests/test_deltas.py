@@ -0,0 +1,93 @@
+"""Pure delta helpers: ``compute_delta`` / ``apply_delta`` round-trip the
+payloads they diff, and ``should_checkpoint`` / ``checkpoint_summary`` decide
+what a completed run stores."""
+from __future__ import annotations
+
+from app.services.competitor_analysis.deltas import (
+    CHECKPOINT_EVERY,
+    apply_delta,
+    checkpoint_added_rows,
+    checkpoint_summary,
+    compute_delta,
+    is_checkpoint_summary,
+    should_checkpoint,
+)
+
+
+def _instagram(posts: list[dict], **context) -> dict:
+    return {"profile": {"username": "acme"}, **context, "posts": posts}
+
+
+def test_compute_delta_records_added_removed_changed_and_dropped():
+    previous = _instagram([
+        {"id": 1, "likes": 10, "caption": "a"},
+        {"id": 2, "likes": 5},
+        {"id": 3, "likes": 1, "pinned": True},
+    ])
+    current = _instagram([
+        {"id": 3, "likes": 4},
+        {"id": 1, "likes": 10, "caption": "a"},
+        {"id": 4, "likes": 0},
+    ])
+
+    delta = compute_delta("instagram", previous, current)
+
+    assert delta["order"] == ["3", "1", "4"]
+    assert delta["added"] == [{"id": 4, "likes": 0}]
+    assert delta["removed"] == ["2"]
+    assert delta["changed"] == {"3": {"likes": 4}}
+    assert delta["dropped"] == {"3": ["pinned"]}
+    assert delta["context"] == {"profile": {"username": "acme"}}
+
+
+def test_apply_delta_rebuilds_the_current_payload():
+    previous = _instagram([{"id": 1, "likes": 10}, {"id": 2, "likes": 5, "pinned": True}])
+    current = _instagram(
+        [{"id": 2, "likes": 6}, {"id": 5, "likes": 0}],
+        profile={"username": "acme", "followers": 12},
+    )
+
+    delta = compute_delta("instagram", previous, current)
+
+    assert apply_delta("instagram", previous, delta) == current
+
+
+def test_apply_delta_on_list_payloads_keyed_by_url():
+    previous = [{"url": "https://a", "title": "A"}, {"url": "https://b", "title": "B"}]
+    current = [{"url": "https://b", "title": "B2"}, {"url": "https://c", "title": "C"}]
+
+    delta = compute_delta("website", previous, current)
+
+    assert delta["removed"] == ["https://a"]
+    assert apply_delta("website", previous, delta) == current
+
+
+def test_compute_delta_gives_up_on_unkeyed_rows():
+    assert compute_delta("instagram", _instagram([{"id": 1}]), _instagram([{"likes": 3}])) is None
+    assert compute_delta("instagram", _instagram([{"id": 1}, {"id": 1}]), _instagram([])) is None
+
+
+def test_should_checkpoint():
+    rows = [{"id": i, "caption": "x" * 50} for i in range(20)]
+    full = _instagram(rows)
+    small = compute_delta("instagram", full, _instagram(rows + [{"id": 99}]))
+    large = compute_delta("instagram", _instagram([]), full)
+
+    assert should_checkpoint(None, full, 0)
+    assert not should_checkpoint(small, full, 0)
+    assert should_checkpoint(small, full, CHECKPOINT_EVERY - 1)
+    assert should_checkpoint(large, full, 0)
+
+
+def test_checkpoint_summary_keeps_only_ids():
+    previous = _instagram([{"id": 1, "likes": 1}, {"id": 2}])
+    current = _instagram([{"id": 1, "likes": 2}, {"id": 3, "caption": "new"}])
+    delta = compute_delta("instagram", previous, current)
+
+    summary = checkpoint_summary("instagram", delta)
+
+    assert summary == {"v": 1, "added_ids": ["3"], "removed": ["2"]}
+    assert is_checkpoint_summary(summary)
+    assert not is_checkpoint_summary(delta)
+    assert checkpoint_summary("instagram", None) is None
+    assert checkpoint_added_rows("instagram", summary, current) == [{"id": 3, "caption": "new"}]
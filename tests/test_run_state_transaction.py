@@ -0,0 +1,53 @@
+"""A transition's ``notify`` — issued after its last repository commit — is
+committed with the rest of ``transaction()``, not rolled back with the
+savepoint the session opened for it (Postgres drops notifications sent in a
+rolled-back subtransaction)."""
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import create_engine, event
+
+from app.services.competitor_analysis import run_state
+from app.services.competitor_analysis.events import notify
+
+
+@pytest.fixture
+def traced_engine(monkeypatch):
+    engine = create_engine("sqlite://")
+
+    @event.listens_for(engine, "connect")
+    def connect(dbapi_connection, _):
+        # Let SQLAlchemy emit BEGIN / SAVEPOINT itself (pysqlite otherwise
+        # manages transactions on its own), and stand in for pg_notify.
+        dbapi_connection.isolation_level = None
+        dbapi_connection.create_function("pg_notify", 2, lambda channel, payload: None)
+
+    @event.listens_for(engine, "begin")
+    def begin(connection):
+        connection.exec_driver_sql("BEGIN")
+
+    statements: list[str] = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def trace(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    @event.listens_for(engine, "commit")
+    def commit(conn):
+        statements.append("COMMIT")
+
+    monkeypatch.setattr(run_state, "get_engine", lambda: engine)
+    yield statements
+    engine.dispose()
+
+
+def test_notify_after_last_commit_is_kept(traced_engine):
+    with run_state.transaction() as db:
+        db.commit()  # as a repository does at the end of its write
+        notify(db, job_id=1, result_id=2, status="running")
+
+    sent = next(i for i, s in enumerate(traced_engine) if "pg_notify" in s)
+    after = traced_engine[sent + 1:]
+    assert not any(s.startswith("ROLLBACK TO SAVEPOINT") for s in after)
+    assert after[0].startswith("RELEASE SAVEPOINT")
+    assert after[-1] == "COMMIT"